@@ -0,0 +1,88 @@
+import typing
+from collections import Counter, deque
+
+
+class ScamClassifier:
+    """
+    Match message content against every scam keyword in a single pass.
+
+    The keywords from all categories are compiled into one Aho-Corasick automaton,
+    so classifying a message costs one walk over its characters no matter how many
+    keywords there are. Matching is plain substring matching, the same as
+    `keyword in content`, and overlapping keywords are all counted.
+    """
+
+    def __init__(self, categories: typing.Mapping[str, typing.Iterable[str]]) -> None:
+        self.order = list(categories)
+        # goto transitions, failure links and the categories ending at each state
+        self._goto: typing.List[typing.Dict[str, int]] = [{}]
+        self._fail: typing.List[int] = [0]
+        self._out: typing.List[typing.Tuple[str, ...]] = [()]
+        # (category, keyword) pairs so every distinct keyword counts as its own hit
+        outputs: typing.List[typing.Set[typing.Tuple[str, str]]] = [set()]
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if not keyword:
+                    continue
+                state = 0
+                for char in keyword:
+                    nxt = self._goto[state].get(char)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[state][char] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        outputs.append(set())
+                    state = nxt
+                outputs[state].add((category, keyword))
+        self._build_failure_links(outputs)
+
+    def _build_failure_links(self, outputs: typing.List[typing.Set[typing.Tuple[str, str]]]) -> None:
+        # breadth first so every failure target is finished before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                outputs[nxt] |= outputs[self._fail[nxt]]
+        self._out = [tuple(category for category, _ in o) for o in outputs]
+
+    def scan(self, content: str) -> typing.Counter[str]:
+        """Return how many keyword hits each category had in the content."""
+        hits: typing.Counter[str] = Counter()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for char in content.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                hits.update(out[state])
+        return hits
+
+    def classify(
+        self, content: str, weights: typing.Optional[typing.Mapping[str, float]] = None
+    ) -> typing.Tuple[typing.Optional[str], typing.Counter[str]]:
+        """
+        Pick the matching category for the content along with every category's hits.
+
+        Without weights the first matching category in declaration order wins, which
+        is how the honeypot has always picked a scam type. With weights categories
+        are scored by hit count times their weight, ties going to the earlier one.
+        Returns `None` as the category when nothing matched.
+        """
+        hits = self.scan(content)
+        if not hits:
+            return None, hits
+        if weights is None:
+            return next(c for c in self.order if c in hits), hits
+        best = max(
+            hits,
+            key=lambda c: (hits[c] * weights.get(c, 1.0), -self.order.index(c)),
+        )
+        return best, hits
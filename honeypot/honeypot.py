@@ -4,7 +4,63 @@ import typing
 import os
 from datetime import timedelta
 import asyncio
+import heapq
 import random
+import time
+from collections import Counter
+
+from .classifier import ScamClassifier
+
+STATS_FLUSH_INTERVAL = 60  # Seconds between writing batched scam stats to config
+# Seconds between runs of each per-guild maintenance job
+MAINTENANCE_JOBS = {
+    "rename": 4 * 60 * 60,
+    "warning": 24 * 60 * 60,
+}
+MAINTENANCE_CONCURRENCY = 3  # Maintenance jobs allowed to run at the same time
+MAINTENANCE_CATCHUP_SPREAD = 15 * 60  # Window overdue jobs are spread over after a restart
+
+HONEYPOT_CHANNEL_NAMES = (
+    "level-up", "boss-fight", "loot-box", "quest", "avatar", "guild", "raid", 
+    "dungeon", "pvp", "pve", "respawn", "checkpoint", "leaderboard", "achievement", 
+    "skill-tree", "power-up", "gamepad", "joystick", "console", "arcade", "multiplayer", 
+    "singleplayer", "sandbox", "open-world", "rpg", "fps", "mmo", "strategy", 
+    "simulation", "platformer", "indie", "esports", "tournament", "speedrun", 
+    "modding", "patch", "update", "expansion", "dlc", "beta", "alpha", "early-access", 
+    "game-jam", "pixel-art", "retro", "8-bit", "16-bit", "soundtrack", "cutscene", 
+    "npc", "ai", "game-engine", "physics", "graphics", "rendering", "animation", 
+    "storyline", "narrative", "dialogue", "character-design", "level-design", 
+    "gameplay", "mechanics", "balance", "difficulty", "tutorial", "walkthrough", 
+    "cheat-code", "easter-egg", "glitch", "bug", "patch-notes", "server", "lag", 
+    "ping", "fps-drop", "frame-rate", "resolution", "texture", "shader", "voxel", 
+    "polygon", "vertex", "mesh", "rigging", "skinning", "motion-capture", "voice-acting", 
+    "sound-effects", "ambient-sound", "background-music", "game-theory", "game-design", 
+    "user-interface", "hud", "cross-platform", "cloud-gaming", "streaming", "vr", 
+    "ar", "mixed-reality", "haptic-feedback", "game-economy", "microtransactions", 
+    "in-game-currency", "loot-crate", "battle-pass", "season-pass", "skins", "cosmetics", 
+    "emotes", "dance", "taunt", "clan", "faction", "alliance", "team", "co-op", 
+    "competitive", "ranked", "casual", "hardcore", "permadeath", "roguelike", "metroidvania",
+    "tourist", "sightseeing", "landmark", "itinerary", "excursion", "souvenir", 
+    "travel-guide", "backpacking", "adventure", "resort", "cruise", "destination", 
+    "vacation", "holiday", "tour", "expedition", "journey", "exploration", "getaway",
+    "passport", "visa", "airfare", "luggage", "hostel", "hotel", "motel", "bed-and-breakfast",
+    "road-trip", "car-rental", "flight", "layover", "stopover", "jetlag", "travel-agency",
+    "tour-operator", "safari", "trekking", "hiking", "camping", "beach", "island", 
+    "mountain", "valley", "canyon", "waterfall", "national-park", "wildlife", "culture",
+    "heritage", "festival", "cuisine", "local", "tradition", "custom", "language", 
+    "currency-exchange", "travel-insurance", "backpacker", "globetrotter", "wanderlust",
+    "classroom", "homework", "assignment", "teacher", "student", "principal", "vice-principal", "counselor", "nurse", "janitor",
+    "cafeteria", "lunchbox", "recess", "playground", "blackboard", "whiteboard", "chalk", "marker", "eraser", "desk",
+    "chair", "locker", "hallway", "bell", "schedule", "timetable", "subject", "math", "science", "history",
+    "geography", "english", "literature", "reading", "writing", "spelling", "grammar", "vocabulary", "quiz", "test",
+    "exam", "midterm", "finals", "report-card", "grade", "score", "pass", "fail", "study", "notebook",
+    "textbook", "worksheet", "project", "presentation", "group-work", "partner", "classmate", "friend", "bully", "detention",
+    "library", "librarian", "computer-lab", "science-lab", "experiment", "field-trip", "bus", "uniform", "dress-code", "assembly",
+    "auditorium", "gym", "gymnasium", "coach", "sports", "soccer", "basketball", "baseball", "track", "swimming",
+    "music", "band", "choir", "art", "painting", "drawing", "sculpture", "theater", "drama", "performance",
+    "club", "debate", "student-council", "yearbook", "graduation", "cap-and-gown", "valedictorian", "honor-roll", "scholarship", "tuition"
+
+)
 
 class Honeypot(commands.Cog, name="Honeypot"):
     """Create a channel at the top of the server to attract self bots/scammers and notify/mute/kick/ban them immediately!"""
@@ -134,6 +190,9 @@ class Honeypot(commands.Cog, name="Honeypot"):
         "other": []
     }
 
+    # Every keyword above compiled into one automaton, built once at import
+    SCAM_CLASSIFIER = ScamClassifier(SCAM_TYPES)
+
     def __init__(self, bot: commands.Bot) -> None:
         super().__init__()
         self.bot = bot
@@ -150,6 +209,7 @@ class Honeypot(commands.Cog, name="Honeypot"):
             "scam_stats": scam_stats_default.copy(),
             "honeypot_message_id": None,  # Track the honeypot warning message for reaction triggers
             "timeout_days": 7,  # Default timeout duration in days, now configurable
+            "maintenance_next": {},  # Next run timestamp of each maintenance job
         }
         default_global = {
             "global_scam_stats": scam_stats_default.copy(),
@@ -158,9 +218,85 @@ class Honeypot(commands.Cog, name="Honeypot"):
         self.config.register_guild(**default_guild)
         self.config.register_global(**default_global)
         self.global_scam_stats = None
+        # In-memory view of each guild's honeypot settings so the listeners can
+        # bail out with a single dict lookup for traffic outside the honeypot
+        self._guild_states: typing.Dict[int, dict] = {}
+        self._channel_index: typing.Dict[int, dict] = {}
+        self._message_index: typing.Dict[int, dict] = {}
+        # Scam stats are counted in memory and written out periodically
+        self._pending_stats: typing.Dict[int, Counter] = {}
+        self._pending_global_stats: Counter = Counter()
         self.bot.loop.create_task(self.initialize_global_scam_stats())
-        self.bot.loop.create_task(self.randomize_honeypot_name())
-        self.bot.loop.create_task(self.refresh_honeypot_warning_messages())
+        self.stats_flush_task = self.bot.loop.create_task(self.flush_scam_stats_periodically())
+        # Heap of (due timestamp, guild id, job name) for channel maintenance
+        self._maintenance_queue: typing.List[typing.Tuple[float, int, str]] = []
+        self._maintenance_due: typing.Dict[typing.Tuple[int, str], float] = {}
+        self._maintenance_wakeup = asyncio.Event()
+        # Maintenance jobs in progress, kept so unloading can cancel them
+        self._maintenance_jobs: typing.Set[asyncio.Task] = set()
+        self.maintenance_task = self.bot.loop.create_task(self.run_maintenance())
+
+    async def cog_load(self) -> None:
+        for guild_id, config in (await self.config.all_guilds()).items():
+            self._index_guild(guild_id, config)
+
+    def _index_guild(self, guild_id: int, config: dict) -> None:
+        old = self._guild_states.pop(guild_id, None)
+        if old is not None:
+            if self._channel_index.get(old.get("honeypot_channel")) is old:
+                del self._channel_index[old["honeypot_channel"]]
+            if self._message_index.get(old.get("honeypot_message_id")) is old:
+                del self._message_index[old["honeypot_message_id"]]
+        if not config.get("enabled") or not config.get("honeypot_channel"):
+            return
+        self._guild_states[guild_id] = config
+        self._channel_index[config["honeypot_channel"]] = config
+        if config.get("honeypot_message_id"):
+            self._message_index[config["honeypot_message_id"]] = config
+
+    async def refresh_guild_cache(self, guild: discord.Guild) -> None:
+        """Reload a guild's honeypot settings into the listener lookup maps."""
+        config = await self.config.guild(guild).all()
+        self._index_guild(guild.id, config)
+        if config.get("honeypot_channel"):
+            # Newly created honeypots join the maintenance schedule
+            now = time.time()
+            for job, interval in MAINTENANCE_JOBS.items():
+                if (guild.id, job) not in self._maintenance_due:
+                    self.schedule_maintenance(guild.id, job, now + random.uniform(0, interval))
+
+    def cog_unload(self):
+        self.stats_flush_task.cancel()
+        self.maintenance_task.cancel()
+        for task in self._maintenance_jobs:
+            task.cancel()
+        self.bot.loop.create_task(self.flush_scam_stats())
+
+    def count_scam(self, guild_id: int, scam_type: str) -> None:
+        self._pending_stats.setdefault(guild_id, Counter())[scam_type] += 1
+        self._pending_global_stats[scam_type] += 1
+
+    async def flush_scam_stats_periodically(self):
+        while True:
+            await asyncio.sleep(STATS_FLUSH_INTERVAL)
+            try:
+                await self.flush_scam_stats()
+            except Exception:
+                pass
+
+    async def flush_scam_stats(self):
+        """Write the scam stats counted since the last flush to config."""
+        pending, self._pending_stats = self._pending_stats, {}
+        pending_global, self._pending_global_stats = self._pending_global_stats, Counter()
+        for guild_id, counts in pending.items():
+            async with self.config.guild_from_id(guild_id).scam_stats() as scam_stats:
+                for stype, count in counts.items():
+                    scam_stats[stype] = scam_stats.get(stype, 0) + count
+        if pending_global:
+            async with self.config.global_scam_stats() as global_stats:
+                for stype, count in pending_global.items():
+                    global_stats[stype] = global_stats.get(stype, 0) + count
+                self.global_scam_stats = dict(global_stats)
 
     async def initialize_global_scam_stats(self):
         self.global_scam_stats = await self.config.global_scam_stats()
@@ -170,155 +306,161 @@ class Honeypot(commands.Cog, name="Honeypot"):
                 self.global_scam_stats[scam_type] = 0
         await self.config.global_scam_stats.set(self.global_scam_stats)
 
-    async def randomize_honeypot_name(self):
+    async def run_maintenance(self):
+        """
+        Rename honeypot channels and refresh their warning messages.
+
+        Each guild's jobs are spread across their interval instead of walking every
+        guild at once, run with bounded concurrency, and their next run time is
+        saved so a restart carries on with the existing schedule.
+        """
         await self.bot.wait_until_ready()
+        now = time.time()
+        for guild_id, config in (await self.config.all_guilds()).items():
+            if not config.get("honeypot_channel"):
+                continue
+            next_runs = config.get("maintenance_next") or {}
+            for job, interval in MAINTENANCE_JOBS.items():
+                due = next_runs.get(job)
+                if due is None:
+                    # Never scheduled, pick a random slot in the interval
+                    due = now + random.uniform(0, interval)
+                elif due <= now:
+                    # Overdue while the bot was offline, catch up gradually
+                    due = now + random.uniform(0, MAINTENANCE_CATCHUP_SPREAD)
+                self.schedule_maintenance(guild_id, job, due)
+
+        semaphore = asyncio.Semaphore(MAINTENANCE_CONCURRENCY)
         while not self.bot.is_closed():
-            for guild in self.bot.guilds:
-                config = await self.config.guild(guild).all()
-                honeypot_channel_id = config.get("honeypot_channel")
-                honeypot_channel = guild.get_channel(honeypot_channel_id) if honeypot_channel_id else None
-
-                if honeypot_channel:
-                    dictionary_words = [
-                        "level-up", "boss-fight", "loot-box", "quest", "avatar", "guild", "raid", 
-                        "dungeon", "pvp", "pve", "respawn", "checkpoint", "leaderboard", "achievement", 
-                        "skill-tree", "power-up", "gamepad", "joystick", "console", "arcade", "multiplayer", 
-                        "singleplayer", "sandbox", "open-world", "rpg", "fps", "mmo", "strategy", 
-                        "simulation", "platformer", "indie", "esports", "tournament", "speedrun", 
-                        "modding", "patch", "update", "expansion", "dlc", "beta", "alpha", "early-access", 
-                        "game-jam", "pixel-art", "retro", "8-bit", "16-bit", "soundtrack", "cutscene", 
-                        "npc", "ai", "game-engine", "physics", "graphics", "rendering", "animation", 
-                        "storyline", "narrative", "dialogue", "character-design", "level-design", 
-                        "gameplay", "mechanics", "balance", "difficulty", "tutorial", "walkthrough", 
-                        "cheat-code", "easter-egg", "glitch", "bug", "patch-notes", "server", "lag", 
-                        "ping", "fps-drop", "frame-rate", "resolution", "texture", "shader", "voxel", 
-                        "polygon", "vertex", "mesh", "rigging", "skinning", "motion-capture", "voice-acting", 
-                        "sound-effects", "ambient-sound", "background-music", "game-theory", "game-design", 
-                        "user-interface", "hud", "cross-platform", "cloud-gaming", "streaming", "vr", 
-                        "ar", "mixed-reality", "haptic-feedback", "game-economy", "microtransactions", 
-                        "in-game-currency", "loot-crate", "battle-pass", "season-pass", "skins", "cosmetics", 
-                        "emotes", "dance", "taunt", "clan", "faction", "alliance", "team", "co-op", 
-                        "competitive", "ranked", "casual", "hardcore", "permadeath", "roguelike", "metroidvania",
-                        "tourist", "sightseeing", "landmark", "itinerary", "excursion", "souvenir", 
-                        "travel-guide", "backpacking", "adventure", "resort", "cruise", "destination", 
-                        "vacation", "holiday", "tour", "expedition", "journey", "exploration", "getaway",
-                        "passport", "visa", "airfare", "luggage", "hostel", "hotel", "motel", "bed-and-breakfast",
-                        "road-trip", "car-rental", "flight", "layover", "stopover", "jetlag", "travel-agency",
-                        "tour-operator", "safari", "trekking", "hiking", "camping", "beach", "island", 
-                        "mountain", "valley", "canyon", "waterfall", "national-park", "wildlife", "culture",
-                        "heritage", "festival", "cuisine", "local", "tradition", "custom", "language", 
-                        "currency-exchange", "travel-insurance", "backpacker", "globetrotter", "wanderlust",
-                        "classroom", "homework", "assignment", "teacher", "student", "principal", "vice-principal", "counselor", "nurse", "janitor",
-                        "cafeteria", "lunchbox", "recess", "playground", "blackboard", "whiteboard", "chalk", "marker", "eraser", "desk",
-                        "chair", "locker", "hallway", "bell", "schedule", "timetable", "subject", "math", "science", "history",
-                        "geography", "english", "literature", "reading", "writing", "spelling", "grammar", "vocabulary", "quiz", "test",
-                        "exam", "midterm", "finals", "report-card", "grade", "score", "pass", "fail", "study", "notebook",
-                        "textbook", "worksheet", "project", "presentation", "group-work", "partner", "classmate", "friend", "bully", "detention",
-                        "library", "librarian", "computer-lab", "science-lab", "experiment", "field-trip", "bus", "uniform", "dress-code", "assembly",
-                        "auditorium", "gym", "gymnasium", "coach", "sports", "soccer", "basketball", "baseball", "track", "swimming",
-                        "music", "band", "choir", "art", "painting", "drawing", "sculpture", "theater", "drama", "performance",
-                        "club", "debate", "student-council", "yearbook", "graduation", "cap-and-gown", "valedictorian", "honor-roll", "scholarship", "tuition"
-                    ]
-                    random_name = random.choice(dictionary_words)
-                    # Only change the name if it's different to avoid double API calls
-                    if honeypot_channel.name != random_name:
-                        try:
-                            await honeypot_channel.edit(name=random_name, reason="Changing channel name to impede honeypot evasion efforts")
-                        except discord.HTTPException:
-                            pass
-
-            await asyncio.sleep(4 * 60 * 60)  # Wait for 4 hours
-
-    async def refresh_honeypot_warning_messages(self):
-        """On cog load, delete the pre-existing honeypot warning message and send a fresh copy. Do this slowly to avoid rate limits."""
-        await self.bot.wait_until_ready()
-        await asyncio.sleep(10)  # Give a little time for cache to warm up
-        for guild in self.bot.guilds:
-            try:
-                config = await self.config.guild(guild).all()
-                honeypot_channel_id = config.get("honeypot_channel")
-                if not honeypot_channel_id:
-                    continue
-                honeypot_channel = guild.get_channel(honeypot_channel_id)
-                if not honeypot_channel:
+            now = time.time()
+            while self._maintenance_queue and self._maintenance_queue[0][0] <= now:
+                due, guild_id, job = heapq.heappop(self._maintenance_queue)
+                if self._maintenance_due.get((guild_id, job)) != due:
                     continue
+                del self._maintenance_due[(guild_id, job)]
+                task = asyncio.create_task(self._run_maintenance_job(semaphore, guild_id, job))
+                self._maintenance_jobs.add(task)
+                task.add_done_callback(self._maintenance_jobs.discard)
+            self._maintenance_wakeup.clear()
+            delay = self._maintenance_queue[0][0] - time.time() if self._maintenance_queue else None
+            try:
+                await asyncio.wait_for(self._maintenance_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
 
-                # Try to find the bot's own honeypot warning message (by embed title or image)
-                honeypot_message_id = None
-                async for msg in honeypot_channel.history(limit=10, oldest_first=True):
-                    if (
-                        msg.author == guild.me
-                        and msg.embeds
-                        and (
-                            (msg.embeds[0].title and "This channel is a security honeypot" in msg.embeds[0].title)
-                            or (msg.embeds[0].image and msg.embeds[0].image.url and "do_not_post_here" in msg.embeds[0].image.url)
-                        )
-                    ):
-                        try:
-                            await msg.delete()
-                            await asyncio.sleep(2)  # Slow down to avoid rate limits
-                        except Exception:
-                            pass
-                        break  # Only delete one warning message
-
-                # Now send a fresh warning message
-                icon_url = None
-                if guild.icon:
-                    try:
-                        icon_url = guild.icon.url
-                    except Exception:
-                        icon_url = None
-
-                # Determine the configured action for this guild
-                action = config.get("action")
-                timeout_days = config.get("timeout_days", 7)
-                action_descriptions = {
-                    "timeout": f"You will be timed out and unable to interact for {timeout_days} day{'s' if timeout_days != 1 else ''}.",
-                    "kick": "You will be kicked from the server immediately.",
-                    "ban": "You will be banned from the server immediately.",
-                    None: "Server staff will be notified of your suspicious activity."
-                }
-                action_text = action_descriptions.get(action, "Server staff will be notified of your suspicious activity.")
+    def schedule_maintenance(self, guild_id: int, job: str, due: float) -> None:
+        self._maintenance_due[(guild_id, job)] = due
+        heapq.heappush(self._maintenance_queue, (due, guild_id, job))
+        self._maintenance_wakeup.set()
 
-                embed = discord.Embed(
-                    title="This channel is a security honeypot",
-                    description="A honeypot is a cybersecurity mechanism that uses a manufactured (fake) attack target to lure attackers away from legitimate, potentially vulnerable targets. In the same sense, this channel exists solely to bait spam, advertisements, and rule-breaking content from compromised and automated Discord accounts.\n- Real users (accounts not automated or stolen) are able to read the instructions below and follow them.\n- \"Fake\" users (stolen and automated accounts) won't be able to reliably recognize this isn't a real channel and will send messages in it, triggering the honeypot.",
-                    color=0xff4545,
-                ).add_field(
-                    name="What not to do?",
-                    value="- **Do not speak in this channel**\n- **Do not send images in this channel**\n- **Do not send files in this channel**\n- **Do not react to this message**",
-                    inline=False,
-                ).add_field(
-                    name="What will happen if I do?",
-                    value=action_text,
-                    inline=False,
-                ).set_footer(text=guild.name, icon_url=icon_url).set_image(url="attachment://do_not_post_here.png").set_thumbnail(url="attachment://stop.png")
-
-                file_path = os.path.join(os.path.dirname(__file__), "do_not_post_here.png")
-                stop_file_path = os.path.join(os.path.dirname(__file__), "stop.png")
-                files = []
-                # Always try to send both images if they exist
-                if os.path.isfile(file_path):
-                    files.append(discord.File(file_path))
-                if os.path.isfile(stop_file_path):
-                    files.append(discord.File(stop_file_path))
+    async def _run_maintenance_job(self, semaphore: asyncio.Semaphore, guild_id: int, job: str) -> None:
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        config = await self.config.guild(guild).all()
+        if not config.get("honeypot_channel"):
+            # The honeypot was removed, stop scheduling this guild
+            return
+        honeypot_channel = guild.get_channel(config["honeypot_channel"])
+        if honeypot_channel is not None:
+            async with semaphore:
                 try:
-                    sent_msg = await honeypot_channel.send(embed=embed, files=files)
-                    honeypot_message_id = sent_msg.id
-                    await self.config.guild(guild).honeypot_message_id.set(honeypot_message_id)
-                    await asyncio.sleep(2)
+                    if job == "rename":
+                        await self.randomize_honeypot_name(honeypot_channel)
+                    elif job == "warning":
+                        await self.refresh_honeypot_warning_message(guild, honeypot_channel, config)
                 except Exception:
                     pass
+        due = time.time() + MAINTENANCE_JOBS[job]
+        async with self.config.guild(guild).maintenance_next() as next_runs:
+            next_runs[job] = due
+        self.schedule_maintenance(guild_id, job, due)
+
+    async def randomize_honeypot_name(self, honeypot_channel: discord.TextChannel):
+        random_name = random.choice(HONEYPOT_CHANNEL_NAMES)
+        # Only change the name if it's different to avoid double API calls
+        if honeypot_channel.name != random_name:
+            try:
+                await honeypot_channel.edit(name=random_name, reason="Changing channel name to impede honeypot evasion efforts")
+            except discord.HTTPException:
+                pass
+
+    async def refresh_honeypot_warning_message(self, guild: discord.Guild, honeypot_channel: discord.TextChannel, config: dict):
+        """Delete the pre-existing honeypot warning message and send a fresh copy."""
+        # Try to find the bot's own honeypot warning message (by embed title or image)
+        honeypot_message_id = None
+        async for msg in honeypot_channel.history(limit=10, oldest_first=True):
+            if (
+                msg.author == guild.me
+                and msg.embeds
+                and (
+                    (msg.embeds[0].title and "This channel is a security honeypot" in msg.embeds[0].title)
+                    or (msg.embeds[0].image and msg.embeds[0].image.url and "do_not_post_here" in msg.embeds[0].image.url)
+                )
+            ):
+                try:
+                    await msg.delete()
+                except Exception:
+                    pass
+                break  # Only delete one warning message
+
+        # Now send a fresh warning message
+        icon_url = None
+        if guild.icon:
+            try:
+                icon_url = guild.icon.url
             except Exception:
-                continue
-            await asyncio.sleep(2)  # Slow down between guilds
+                icon_url = None
+
+        # Determine the configured action for this guild
+        action = config.get("action")
+        timeout_days = config.get("timeout_days", 7)
+        action_descriptions = {
+            "timeout": f"You will be timed out and unable to interact for {timeout_days} day{'s' if timeout_days != 1 else ''}.",
+            "kick": "You will be kicked from the server immediately.",
+            "ban": "You will be banned from the server immediately.",
+            None: "Server staff will be notified of your suspicious activity."
+        }
+        action_text = action_descriptions.get(action, "Server staff will be notified of your suspicious activity.")
+
+        embed = discord.Embed(
+            title="This channel is a security honeypot",
+            description="A honeypot is a cybersecurity mechanism that uses a manufactured (fake) attack target to lure attackers away from legitimate, potentially vulnerable targets. In the same sense, this channel exists solely to bait spam, advertisements, and rule-breaking content from compromised and automated Discord accounts.\n- Real users (accounts not automated or stolen) are able to read the instructions below and follow them.\n- \"Fake\" users (stolen and automated accounts) won't be able to reliably recognize this isn't a real channel and will send messages in it, triggering the honeypot.",
+            color=0xff4545,
+        ).add_field(
+            name="What not to do?",
+            value="- **Do not speak in this channel**\n- **Do not send images in this channel**\n- **Do not send files in this channel**\n- **Do not react to this message**",
+            inline=False,
+        ).add_field(
+            name="What will happen if I do?",
+            value=action_text,
+            inline=False,
+        ).set_footer(text=guild.name, icon_url=icon_url).set_image(url="attachment://do_not_post_here.png").set_thumbnail(url="attachment://stop.png")
+
+        file_path = os.path.join(os.path.dirname(__file__), "do_not_post_here.png")
+        stop_file_path = os.path.join(os.path.dirname(__file__), "stop.png")
+        files = []
+        # Always try to send both images if they exist
+        if os.path.isfile(file_path):
+            files.append(discord.File(file_path))
+        if os.path.isfile(stop_file_path):
+            files.append(discord.File(stop_file_path))
+        try:
+            sent_msg = await honeypot_channel.send(embed=embed, files=files)
+            honeypot_message_id = sent_msg.id
+            await self.config.guild(guild).honeypot_message_id.set(honeypot_message_id)
+            await self.refresh_guild_cache(guild)
+        except Exception:
+            pass
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
         if not message.guild or message.author.bot:
             return
 
-        config = await self.config.guild(message.guild).all()
+        config = self._channel_index.get(message.channel.id)
+        if config is None:
+            return
         honeypot_channel_id = config.get("honeypot_channel")
         logs_channel_id = config.get("logs_channel")
         logs_channel = message.guild.get_channel(logs_channel_id) if logs_channel_id else None
@@ -347,32 +489,10 @@ class Honeypot(commands.Cog, name="Honeypot"):
         except discord.HTTPException:
             pass
 
-        # Track scam type based on message content
-        scam_type = "other"
-        content_lower = message.content.lower()
-        for stype, keywords in self.SCAM_TYPES.items():
-            if stype == "other":
-                continue
-            if any(word in content_lower for word in keywords):
-                scam_type = stype
-                break
-
-        # Update scam stats
-        scam_stats = config.get("scam_stats", {})
-        # Ensure all scam types are present
-        for stype in self.SCAM_TYPES:
-            scam_stats.setdefault(stype, 0)
-        scam_stats[scam_type] += 1
-
-        # Fix: self.global_scam_stats may not be initialized yet
-        if self.global_scam_stats is None:
-            self.global_scam_stats = await self.config.global_scam_stats()
-        for stype in self.SCAM_TYPES:
-            self.global_scam_stats.setdefault(stype, 0)
-        self.global_scam_stats[scam_type] += 1
-
-        await self.config.guild(message.guild).scam_stats.set(scam_stats)
-        await self.config.global_scam_stats.set(self.global_scam_stats)
+        # Track scam type based on message content, every keyword is checked in one pass
+        scam_type, scam_hits = self.SCAM_CLASSIFIER.classify(message.content)
+        scam_type = scam_type or "other"
+        self.count_scam(message.guild.id, scam_type)
 
         action = config["action"]
         timeout_days = config.get("timeout_days", 7)
@@ -392,6 +512,12 @@ class Honeypot(commands.Cog, name="Honeypot"):
             value=f"{scam_type_vanity} (`{scam_type}`)",
             inline=True
         )
+        if len(scam_hits) > 1:
+            embed.add_field(
+                name="Keyword matches",
+                value=", ".join(f"`{stype}` ×{count}" for stype, count in scam_hits.most_common()),
+                inline=True
+            )
 
         failed = None
         if action:
@@ -434,12 +560,12 @@ class Honeypot(commands.Cog, name="Honeypot"):
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         if not payload.guild_id or not payload.channel_id or not payload.message_id:
             return
+        config = self._message_index.get(payload.message_id)
+        if config is None:
+            return
         guild = self.bot.get_guild(payload.guild_id)
         if not guild:
             return
-        config = await self.config.guild(guild).all()
-        if not config.get("enabled"):
-            return
         honeypot_channel_id = config.get("honeypot_channel")
         honeypot_message_id = config.get("honeypot_message_id")
         logs_channel_id = config.get("logs_channel")
@@ -474,19 +600,7 @@ class Honeypot(commands.Cog, name="Honeypot"):
 
         # Use "other" as scam type for reactions
         scam_type = "other"
-        scam_stats = config.get("scam_stats", {})
-        for stype in self.SCAM_TYPES:
-            scam_stats.setdefault(stype, 0)
-        scam_stats[scam_type] += 1
-
-        if self.global_scam_stats is None:
-            self.global_scam_stats = await self.config.global_scam_stats()
-        for stype in self.SCAM_TYPES:
-            self.global_scam_stats.setdefault(stype, 0)
-        self.global_scam_stats[scam_type] += 1
-
-        await self.config.guild(guild).scam_stats.set(scam_stats)
-        await self.config.global_scam_stats.set(self.global_scam_stats)
+        self.count_scam(guild.id, scam_type)
 
         action = config["action"]
         timeout_days = config.get("timeout_days", 7)
@@ -651,6 +765,7 @@ class Honeypot(commands.Cog, name="Honeypot"):
             )
             await self.config.guild(ctx.guild).honeypot_channel.set(honeypot_channel.id)
             await self.config.guild(ctx.guild).honeypot_message_id.set(sent_msg.id)
+            await self.refresh_guild_cache(ctx.guild)
             embed = discord.Embed(
                 title="Honeypot created",
                 description=(
@@ -671,6 +786,7 @@ class Honeypot(commands.Cog, name="Honeypot"):
         """
         async with ctx.typing():
             await self.config.guild(ctx.guild).enabled.set(True)
+            await self.refresh_guild_cache(ctx.guild)
             embed = discord.Embed(
                 title="Honeypot enabled",
                 description="Honeypot functionality has been enabled.",
@@ -688,6 +804,7 @@ class Honeypot(commands.Cog, name="Honeypot"):
         """
         async with ctx.typing():
             await self.config.guild(ctx.guild).enabled.set(False)
+            await self.refresh_guild_cache(ctx.guild)
             embed = discord.Embed(
                 title="Honeypot disabled",
                 description="Honeypot functionality has been disabled.",
@@ -735,6 +852,7 @@ class Honeypot(commands.Cog, name="Honeypot"):
                 await ctx.send(embed=embed)
 
             await self.config.guild(ctx.guild).enabled.set(False)
+            await self.refresh_guild_cache(ctx.guild)
 
     @commands.admin_or_permissions(manage_guild=True)
     @honeypot.command()
@@ -754,6 +872,7 @@ class Honeypot(commands.Cog, name="Honeypot"):
                 await ctx.send(embed=embed)
                 return
             await self.config.guild(ctx.guild).action.set(action)
+            await self.refresh_guild_cache(ctx.guild)
             embed = discord.Embed(
                 title="Action set",
                 description=f"Action has been set to {action}.",
@@ -775,6 +894,7 @@ class Honeypot(commands.Cog, name="Honeypot"):
                 await ctx.send("Timeout days must be between 1 and 28.")
                 return
             await self.config.guild(ctx.guild).timeout_days.set(days)
+            await self.refresh_guild_cache(ctx.guild)
             embed = discord.Embed(
                 title="Timeout duration set",
                 description=f"Timeout duration has been set to {days} day{'s' if days != 1 else ''}.",
@@ -792,6 +912,7 @@ class Honeypot(commands.Cog, name="Honeypot"):
         """
         async with ctx.typing():
             await self.config.guild(ctx.guild).logs_channel.set(channel.id)
+            await self.refresh_guild_cache(ctx.guild)
             embed = discord.Embed(
                 title="Logs set",
                 description=f"Logs channel has been set to {channel.mention}.",
@@ -837,9 +958,11 @@ class Honeypot(commands.Cog, name="Honeypot"):
             config = await self.config.guild(ctx.guild).all()
             global_stats = await self.config.global_scam_stats()
             scam_stats = config.get('scam_stats', {})
+            pending = self._pending_stats.get(ctx.guild.id, Counter())
             for stype in self.SCAM_TYPES:
-                scam_stats.setdefault(stype, 0)
-                global_stats.setdefault(stype, 0)
+                # Include detections that haven't been flushed to config yet
+                scam_stats[stype] = scam_stats.get(stype, 0) + pending[stype]
+                global_stats[stype] = global_stats.get(stype, 0) + self._pending_global_stats[stype]
 
             # Prepare server stats lines
             server_lines = []
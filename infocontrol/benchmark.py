@@ -0,0 +1,359 @@
+"""
+Offline benchmark and false positive report for the InfoControl patterns.
+
+Builds a seeded synthetic corpus of ordinary chat, code snippets, timestamps,
+Discord markup and realistic looking PII, then reports:
+
+- per pattern search time, how often it fires on harmless messages and how
+  often it finds the PII it is meant to catch
+- the slowest adversarial inputs found for each pattern and how their cost
+  grows with input length, to catch catastrophic backtracking
+- the old per-pattern `re.search` loop against the combined scanner
+
+It does not need Red or discord.py, run it from the repository root with:
+
+    python infocontrol/benchmark.py --messages 20000
+"""
+
+import argparse
+import math
+import random
+import re
+import string
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .patterns import DEFAULT_PATTERNS
+    from .scanner import MAX_SCAN_LENGTH, PATTERN_REWRITES, PIIScanner, luhn_valid, strip_ignored
+except ImportError:
+    # Run as a script, the package __init__ needs Red so import the modules directly
+    from patterns import DEFAULT_PATTERNS
+    from scanner import MAX_SCAN_LENGTH, PATTERN_REWRITES, PIIScanner, luhn_valid, strip_ignored
+
+BENIGN = ("chat", "code", "timestamps", "discord")
+
+WORDS = (
+    "the", "a", "is", "you", "me", "we", "lol", "gg", "anyone", "playing", "tonight",
+    "server", "update", "patch", "just", "got", "new", "level", "raid", "boss", "drop",
+    "what", "time", "is", "it", "brb", "idk", "thanks", "nice", "ok", "wait", "for",
+    "round", "match", "team", "score", "points", "won", "lost", "ranked", "season",
+    "Hello", "Good", "morning", "FIFA", "NASA", "GPU", "RTX", "USB", "HDMI", "OK",
+)
+
+
+def _digits(rng: random.Random, count: int) -> str:
+    return "".join(rng.choice(string.digits) for _ in range(count))
+
+
+def _hex(rng: random.Random, count: int) -> str:
+    return "".join(rng.choice("0123456789abcdef") for _ in range(count))
+
+
+def _luhn_number(rng: random.Random, length: int = 16) -> str:
+    body = rng.choice("3456") + _digits(rng, length - 2)
+    for check in string.digits:
+        if luhn_valid(body + check):
+            return body + check
+    return body + "0"
+
+
+def chat_message(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(2, 18))]
+    extras = (
+        f"I have {rng.randint(1, 999)} hours in it",
+        f"room {rng.randint(100, 9999)}",
+        f"lvl {rng.randint(1, 120)}",
+        f"score was {rng.randint(10000, 99999)}",
+        f"{rng.randint(1, 12)} players needed",
+        f"top {rng.randint(1, 500)} this season",
+        f"it costs ${rng.randint(1, 99)}.{rng.randint(10, 99)}",
+        f"my ping is {rng.randint(10, 300)}ms",
+        f"{rng.randint(1, 99)} {rng.choice(WORDS)} {rng.choice(WORDS)}",
+        "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(3, 10))),
+    )
+    if rng.random() < 0.5:
+        words.insert(rng.randint(0, len(words)), rng.choice(extras))
+    return " ".join(words)
+
+
+def code_message(rng: random.Random) -> str:
+    snippets = (
+        f"for i in range({rng.randint(1, 100000)}):",
+        f"x = 0x{_hex(rng, 8).upper()}",
+        f"commit {_hex(rng, 40)}",
+        f"git checkout {_hex(rng, 7)}",
+        f"{_hex(rng, 8)}-{_hex(rng, 4)}-{_hex(rng, 4)}-{_hex(rng, 4)}-{_hex(rng, 12)}",
+        f"version {rng.randint(0, 9)}.{rng.randint(0, 20)}.{rng.randint(0, 99)}.{rng.randint(0, 255)}",
+        f"HTTP/1.1 {rng.choice((200, 404, 500))} after {rng.randint(1, 5000)}ms",
+        f"color: #{_hex(rng, 6)};",
+        f"SELECT * FROM users WHERE id = {rng.randint(1, 10 ** 6)};",
+        f"ERROR {_digits(rng, 5)} at line {rng.randint(1, 999)}",
+        f"pip install package=={rng.randint(0, 9)}.{rng.randint(0, 9)}.{rng.randint(0, 9)}",
+        f"const TOKEN_ID = '{''.join(rng.choice(string.ascii_uppercase + string.digits) for _ in range(rng.choice((8, 9, 17))))}'",
+        f"docker run -p {rng.randint(1000, 9999)}:{rng.randint(1000, 9999)} image",
+        f"sha256 {_hex(rng, 64)}",
+    )
+    return "```" + rng.choice(snippets) + "```" if rng.random() < 0.3 else rng.choice(snippets)
+
+
+def timestamp_message(rng: random.Random) -> str:
+    year, month, day = rng.randint(2000, 2030), rng.randint(1, 12), rng.randint(1, 28)
+    epoch = rng.randint(1_500_000_000, 1_900_000_000)
+    stamps = (
+        f"{year}-{month:02}-{day:02} {rng.randint(0, 23):02}:{rng.randint(0, 59):02}:{rng.randint(0, 59):02}",
+        f"event at {day:02}/{month:02}/{year}",
+        f"<t:{epoch}:R>",
+        f"unix {epoch}",
+        f"{epoch}{_digits(rng, 3)}",
+        f"it's {rng.randint(1, 12)}:{rng.randint(0, 59):02} pm",
+        f"deadline {month}/{day}",
+        f"log [{rng.randint(0, 23):02}:{rng.randint(0, 59):02}:{rng.randint(0, 59):02}.{_digits(rng, 3)}] ok",
+    )
+    return rng.choice(stamps)
+
+
+def discord_message(rng: random.Random) -> str:
+    snowflake = lambda: str(rng.randint(10 ** 16, 10 ** 19 - 1))  # noqa: E731
+    parts = (
+        f"<@{snowflake()}> check this",
+        f"<@!{snowflake()}>",
+        f"see <#{snowflake()}>",
+        f"<:{rng.choice(WORDS)}:{snowflake()}>",
+        f"https://discord.com/channels/{snowflake()}/{snowflake()}/{snowflake()}",
+        f"user id {snowflake()}",
+        f"[click here](https://example.com/{_hex(rng, 10)})",
+        f"https://cdn.discordapp.com/attachments/{snowflake()}/{snowflake()}/image.png",
+        f"<@&{snowflake()}> ping",
+    )
+    return " ".join(rng.choice(parts) for _ in range(rng.randint(1, 3)))
+
+
+PII_GENERATORS: Dict[str, Callable[[random.Random], str]] = {
+    "email": lambda rng: f"{rng.choice(WORDS).lower()}.{rng.randint(1, 99)}@example{rng.choice(('.com', '.org', '.co.uk'))}",
+    "ssn": lambda rng: f"{_digits(rng, 3)}-{_digits(rng, 2)}-{_digits(rng, 4)}",
+    "bankcard": lambda rng: " ".join(_luhn_number(rng)[i:i + 4] for i in range(0, 16, 4)),
+    "phone": lambda rng: f"{_digits(rng, 3)}-{_digits(rng, 3)}-{_digits(rng, 4)}",
+    "phone_no_spaces": lambda rng: _digits(rng, 10),
+    "ipv4": lambda rng: ".".join(str(rng.randint(1, 254)) for _ in range(4)),
+    "ipv6": lambda rng: ":".join(_hex(rng, 4) for _ in range(8)),
+    "creditcard": lambda rng: _luhn_number(rng),
+    "passport": lambda rng: f"{rng.choice('ABCDEFGH')}{rng.randint(1, 9)}{_digits(rng, 5)}{rng.randint(1, 9)}",
+    "iban": lambda rng: f"GB{_digits(rng, 2)}NWBK{_digits(rng, 14)}",
+    "mac_address": lambda rng: ":".join(_hex(rng, 2) for _ in range(6)),
+    "bitcoin_address": lambda rng: "1" + "".join(rng.choice("abcdefghijkmnopqrstuvwxyzABCDEFGHJKLMNPQRSTUVWXYZ123456789") for _ in range(30)),
+    "drivers_license": lambda rng: f"{rng.choice(('CA', 'NY', 'TX'))}-{_digits(rng, 8)}",
+    "vin": lambda rng: "".join(rng.choice("ABCDEFGHJKLMNPRSTUVWXYZ0123456789") for _ in range(17)),
+    "ssn_alternative": lambda rng: f"{_digits(rng, 3)} {_digits(rng, 2)} {_digits(rng, 4)}",
+    "phone_alternative": lambda rng: f"({_digits(rng, 3)}) {_digits(rng, 3)}-{_digits(rng, 4)}",
+    "zip_code": lambda rng: f"{_digits(rng, 5)}-{_digits(rng, 4)}",
+    "street_address": lambda rng: f"{rng.randint(1, 9999)} {rng.choice(('Main', 'Oak', 'Elm', 'Maple'))} {rng.choice(('St', 'Ave', 'Rd'))}",
+    "birthdate": lambda rng: f"{rng.randint(1, 12):02}/{rng.randint(1, 28):02}/{rng.randint(1950, 2010)}",
+    "national_id": lambda rng: "".join(rng.choice(string.ascii_uppercase + string.digits) for _ in range(9)),
+    "tax_id": lambda rng: f"{_digits(rng, 2)}-{_digits(rng, 7)}",
+    "student_id": lambda rng: "".join(rng.choice(string.ascii_uppercase + string.digits) for _ in range(8)),
+}
+
+PII_TEMPLATES = (
+    "my {} is {}",
+    "{}: {}",
+    "send it to {1}",
+    "{1}",
+    "here you go {1} thanks",
+)
+
+BENIGN_GENERATORS = {
+    "chat": chat_message,
+    "code": code_message,
+    "timestamps": timestamp_message,
+    "discord": discord_message,
+}
+
+# (prefix, repeated unit) pairs that tend to make regexes backtrack, the unit is
+# repeated until the message length limit
+ADVERSARIAL_INPUTS = tuple(
+    [("", unit) for unit in (
+        "1", "1 ", "1-", "1.", "a", "a.", "a@", "a@a.", "#", "# ", "a#", "A", "AB12", "1A",
+        "f:", "ff:", "ff-", "(1", "1/", "12/", " ", "\t", "1 #", "Aa1 ",
+    )]
+    + [("1 ", "#"), ("1 ", "a#"), ("a@", "a."), ("AB12", "A"), ("1", " 1"), ("(", "1")]
+)
+
+
+def build_corpus(size: int, seed: int) -> List[Tuple[str, Optional[str], str]]:
+    """(category, expected pattern key or None, message) tuples."""
+    rng = random.Random(seed)
+    corpus = []
+    pii_keys = list(PII_GENERATORS)
+    for index in range(size):
+        if index % 5 == 4:
+            key = pii_keys[(index // 5) % len(pii_keys)]
+            template = rng.choice(PII_TEMPLATES)
+            label = key.replace("_", " ")
+            corpus.append(("pii", key, template.format(label, PII_GENERATORS[key](rng))))
+        else:
+            category = BENIGN[index % len(BENIGN)]
+            corpus.append((category, None, BENIGN_GENERATORS[category](rng)))
+    return corpus
+
+
+def legacy_find(patterns: Dict[str, str], message: str) -> Optional[str]:
+    """The listener as it used to work, five `re.sub` calls then a `re.search` loop."""
+    content = re.sub(r'<@!?[0-9]+>', '', message)
+    content = re.sub(r'<#[0-9]+>', '', content)
+    content = re.sub(r'\[.*?\]\(.*?\)', '', content)
+    content = re.sub(r'https?://\S+', '', content)
+    content = re.sub(r'\b\d{17,19}\b', '', content)
+    for key, pattern in patterns.items():
+        if re.search(pattern, content):
+            return key
+    return None
+
+
+def _timed(func: Callable[[], object]) -> Tuple[float, object]:
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def report_patterns(patterns: Dict[str, str], corpus) -> None:
+    stripped = [(category, key, strip_ignored(message)) for category, key, message in corpus]
+    benign_total = sum(1 for category, _, _ in stripped if category != "pii")
+    expected = Counter(key for _, key, _ in stripped if key)
+
+    print(f"\nPer pattern ({len(stripped)} messages, {benign_total} harmless)")
+    print(f"{'pattern':<20} {'total ms':>9} {'max us':>8} {'fp':>6} {'fp %':>7} {'recall %':>9}  noisiest category")
+    for key, pattern in patterns.items():
+        compiled = re.compile(pattern)
+        total = worst = 0.0
+        false_positives = Counter()
+        found = 0
+        for category, expected_key, content in stripped:
+            elapsed, match = _timed(lambda: compiled.search(content))
+            total += elapsed
+            worst = max(worst, elapsed)
+            if match is None:
+                continue
+            if category != "pii":
+                false_positives[category] += 1
+            elif expected_key == key:
+                found += 1
+        fp = sum(false_positives.values())
+        noisiest = ", ".join(f"{c} {n}" for c, n in false_positives.most_common(2)) or "-"
+        recall = 100 * found / expected[key] if expected[key] else float("nan")
+        print(
+            f"{key:<20} {total * 1000:>9.2f} {worst * 1e6:>8.0f} {fp:>6} "
+            f"{100 * fp / benign_total:>6.2f}% {recall:>8.1f}%  {noisiest}"
+        )
+
+
+def report_deletions(patterns: Dict[str, str], corpus, luhn_check: bool) -> None:
+    scanner = PIIScanner(tuple(patterns.items()), luhn_check)
+    deleted = defaultdict(Counter)
+    totals = Counter()
+    for category, _, message in corpus:
+        totals[category] += 1
+        key = scanner.find(strip_ignored(message))
+        if key:
+            deleted[category][key] += 1
+
+    print(f"\nMessages that would be deleted (Luhn check {'on' if luhn_check else 'off'})")
+    for category in BENIGN + ("pii",):
+        count = sum(deleted[category].values())
+        top = ", ".join(f"{k} {n}" for k, n in deleted[category].most_common(4)) or "-"
+        print(f"{category:<12} {count:>6}/{totals[category]:<6} {100 * count / max(totals[category], 1):>6.2f}%  {top}")
+
+
+def _growth(pattern: re.Pattern, prefix: str, unit: str, limit: float) -> Tuple[int, float, float]:
+    """Largest length tried, its search time and the estimated growth exponent."""
+    length, previous, exponent = 16, None, 1.0
+    elapsed = 0.0
+    while True:
+        text = prefix + (unit * (length // len(unit) + 1))[:length - len(prefix)]
+        elapsed, _ = _timed(lambda: pattern.search(text))
+        if previous and previous > 1e-5 and elapsed > 1e-5:
+            exponent = math.log2(elapsed / previous)
+        if elapsed > limit or length >= MAX_SCAN_LENGTH:
+            return length, elapsed, exponent
+        previous = elapsed
+        length = min(length * 2, MAX_SCAN_LENGTH)
+
+
+def report_worst_cases(patterns: Dict[str, str], top: int, limit: float) -> None:
+    print(f"\nWorst adversarial inputs (up to {MAX_SCAN_LENGTH} characters, stopping at {limit * 1000:.0f}ms)")
+    print(f"{'pattern':<28} {'input':<14} {'length':>6} {'ms':>9} {'growth':>7}")
+    candidates = list(patterns.items())
+    for legacy, replacement in PATTERN_REWRITES.items():
+        for key, pattern in patterns.items():
+            if pattern == replacement:
+                candidates.append((f"{key} (legacy)", legacy))
+    for key, pattern in candidates:
+        compiled = re.compile(pattern)
+        results = sorted(
+            ((prefix + unit + "...",) + _growth(compiled, prefix, unit, limit) for prefix, unit in ADVERSARIAL_INPUTS),
+            key=lambda row: row[2] / row[1],
+            reverse=True,
+        )
+        for shown, length, elapsed, exponent in results[:top]:
+            flag = "  <- superlinear" if exponent > 1.5 and elapsed > 0.001 else ""
+            print(f"{key:<28} {shown!r:<14} {length:>6} {elapsed * 1000:>9.3f} {exponent:>6.1f}x{flag}")
+
+
+def report_comparison(patterns: Dict[str, str], corpus, rounds: int) -> None:
+    messages = [message for _, _, message in corpus]
+    legacy_patterns = {key: next((old for old, new in PATTERN_REWRITES.items() if new == p), p) for key, p in patterns.items()}
+    scanner = PIIScanner(tuple(patterns.items()), luhn_check=False)
+
+    def run_legacy(source: Dict[str, str]) -> List[Optional[str]]:
+        return [legacy_find(source, message) for message in messages]
+
+    def run_scanner() -> List[Optional[str]]:
+        return [scanner.find(strip_ignored(message)) for message in messages]
+
+    print(f"\nLegacy loop vs combined scanner ({len(messages)} messages, best of {rounds})")
+    results = {}
+    for name, func in (
+        ("re.search loop", lambda: run_legacy(patterns)),
+        ("re.search loop, legacy defaults", lambda: run_legacy(legacy_patterns)),
+        ("combined scanner", run_scanner),
+    ):
+        best = math.inf
+        for _ in range(rounds):
+            elapsed, output = _timed(func)
+            best = min(best, elapsed)
+        results[name] = output
+        print(f"{name:<34} {best * 1000:>9.1f} ms  {best / len(messages) * 1e6:>7.1f} us/message")
+    disagreements = sum(a != b for a, b in zip(results["re.search loop"], results["combined scanner"]))
+    print(f"Messages where the two disagree on the matched key: {disagreements}")
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=20000, help="synthetic messages to generate")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed, results are repeatable for a seed")
+    parser.add_argument("--pattern", action="append", help="only include this pattern key, may be repeated")
+    parser.add_argument("--top", type=int, default=2, help="worst adversarial inputs shown per pattern")
+    parser.add_argument("--limit", type=float, default=0.25, help="seconds before an adversarial input stops growing")
+    parser.add_argument("--rounds", type=int, default=3, help="timing rounds for the comparison")
+    parser.add_argument("--skip-worst", action="store_true", help="skip the adversarial input search")
+    args = parser.parse_args(argv)
+
+    patterns = dict(DEFAULT_PATTERNS)
+    if args.pattern:
+        unknown = set(args.pattern) - patterns.keys()
+        if unknown:
+            parser.error(f"unknown pattern(s): {', '.join(sorted(unknown))}")
+        patterns = {key: patterns[key] for key in args.pattern}
+
+    corpus = build_corpus(args.messages, args.seed)
+    report_patterns(patterns, corpus)
+    report_deletions(patterns, corpus, luhn_check=False)
+    report_deletions(patterns, corpus, luhn_check=True)
+    if not args.skip_worst:
+        report_worst_cases(patterns, args.top, args.limit)
+    report_comparison(patterns, corpus, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,15 @@
-import re
 import discord #type: ignore
 import asyncio
+from typing import Dict, Tuple
 from redbot.core import commands, Config #type: ignore
 
+from .patterns import DEFAULT_PATTERNS
+from .scanner import PIIScanner, get_scanner, strip_ignored
+
 class InfoControl(commands.Cog):
     """Detect and remove potentially sensitive information from chat."""
     
-    __version__ = "1.0.8"
+    __version__ = "1.0.9"
 
     def __init__(self, bot):
         self.bot = bot
@@ -15,62 +18,45 @@ class InfoControl(commands.Cog):
             "enabled": False,
             "log_channel": None,
             "moderator_roles": [],
-            "patterns": {
-                "email": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b",
-                "ssn": r"\b\d{3}-\d{2}-\d{4}\b",
-                "bankcard": r"\b\d{4} \d{4} \d{4} \d{4}\b",
-                "phone": r"\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b",
-                "phone_no_spaces": r"\b\d{10}\b",
-                "ipv4": r"\b((25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b",
-                "ipv6": r"\b([0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}\b",
-                "creditcard": r"\b(?:\d[ -]?){13,19}\b",
-                "passport": r"\b[A-PR-WYa-pr-wy][1-9]\d\s?\d{4}[1-9]\b",
-                "iban": r"\b[A-Z]{2}\d{2}[A-Z0-9]{1,30}\b",
-                "mac_address": r"\b([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})\b",
-                "bitcoin_address": r"\b[13][a-km-zA-HJ-NP-Z1-9]{25,34}\b",
-                "drivers_license": r"\b[A-Z]{2}-\d{1,14}\b",
-                "vin": r"\b[A-HJ-NPR-Z0-9]{17}\b",
-                "ssn_alternative": r"\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b",
-                "phone_alternative": r"\b\(\d{3}\)\s?\d{3}[-.\s]?\d{4}\b",
-                "zip_code": r"\b\d{5}(?:[-\s]\d{4})?\b",
-                "street_address": r"\b\d{1,5}\s(?:[A-Za-z0-9#]+\s?){1,5}\b",
-                "birthdate": r"\b\d{2}/\d{2}/\d{4}\b",
-                "national_id": r"\b[A-Z0-9]{9}\b",
-                "tax_id": r"\b\d{2}-\d{7}\b",
-                "student_id": r"\b[A-Z0-9]{8}\b"
-            }
+            "luhn_check": True,  # Only treat card-like numbers with a valid checksum as credit cards
+            "patterns": dict(DEFAULT_PATTERNS),
         }
         self.default_guild.update({f"block_{key}": True for key in self.default_guild["patterns"].keys()})
         self.config.register_guild(**self.default_guild)
+        # Guild id -> (config, scanner for its enabled patterns), dropped whenever a setting changes
+        self._snapshots: Dict[int, Tuple[dict, PIIScanner]] = {}
+
+    async def get_snapshot(self, guild) -> Tuple[dict, PIIScanner]:
+        snapshot = self._snapshots.get(guild.id)
+        if snapshot is None:
+            guild_config = await self.config.guild(guild).all()
+            patterns = tuple(
+                (key, pattern)
+                for key, pattern in guild_config["patterns"].items()
+                if guild_config.get(f"block_{key}", False)
+            )
+            # Guilds with the same settings still share one compiled scanner
+            snapshot = (guild_config, get_scanner(patterns, guild_config.get("luhn_check", True)))
+            self._snapshots[guild.id] = snapshot
+        return snapshot
+
+    def invalidate_snapshot(self, guild) -> None:
+        self._snapshots.pop(guild.id, None)
 
     @commands.Cog.listener()
     async def on_message_without_command(self, message):
         if message.author.bot or not message.guild:
             return
 
-        guild_config = await self.config.guild(message.guild).all()
+        guild_config, scanner = await self.get_snapshot(message.guild)
         if not guild_config["enabled"]:
             return
 
-        # Remove user and channel mentions from the message content
-        content = re.sub(r'<@!?[0-9]+>', '', message.content)  # User mentions
-        content = re.sub(r'<#[0-9]+>', '', content)  # Channel mentions
-
-        # Ignore content inside hyperlinks and URLs
-        def remove_hyperlinks_and_urls(text):
-            text = re.sub(r'\[.*?\]\(.*?\)', '', text)  # Hyperlinks
-            text = re.sub(r'https?://\S+', '', text)  # URLs
-            return text
-
-        content = remove_hyperlinks_and_urls(content)
-
-        # Ignore discord user ID's, message ID's, and channel ID's
-        content = re.sub(r'\b\d{17,19}\b', '', content)  # Discord ID's
-
-        for key, pattern in guild_config["patterns"].items():
-            if guild_config.get(f"block_{key}", False) and re.search(pattern, content):
-                await self.handle_message_deletion(message, key, guild_config)
-                break
+        # Mentions, hyperlinks, URLs and Discord ID's are removed in a single pass
+        content = strip_ignored(message.content)
+        key = scanner.find(content)
+        if key:
+            await self.handle_message_deletion(message, key, guild_config)
 
     async def handle_message_deletion(self, message, key, guild_config):
         try:
@@ -126,6 +112,7 @@ class InfoControl(commands.Cog):
     async def enable(self, ctx):
         """Enable info enforcement"""
         await self.config.guild(ctx.guild).enabled.set(True)
+        self.invalidate_snapshot(ctx.guild)
         await ctx.send("Info enforcement is now enabled.")
 
     @commands.admin_or_permissions()
@@ -133,6 +120,7 @@ class InfoControl(commands.Cog):
     async def disable(self, ctx):
         """Disable info enforcement"""
         await self.config.guild(ctx.guild).enabled.set(False)
+        self.invalidate_snapshot(ctx.guild)
         await ctx.send("Info enforcement is now disabled.")
 
     @commands.admin_or_permissions()
@@ -151,6 +139,7 @@ class InfoControl(commands.Cog):
 
         current = await self.config.guild(ctx.guild).get_raw(f"block_{data_type}")
         await self.config.guild(ctx.guild).set_raw(f"block_{data_type}", value=not current)
+        self.invalidate_snapshot(ctx.guild)
         status = "enabled" if not current else "disabled"
         embed = discord.Embed(
             title="Blocking toggled",
@@ -159,11 +148,27 @@ class InfoControl(commands.Cog):
         )
         await ctx.send(embed=embed)
 
+    @commands.admin_or_permissions()
+    @infocontrol.command()
+    async def luhn(self, ctx):
+        """Toggle requiring a valid card checksum before removing credit card numbers."""
+        current = await self.config.guild(ctx.guild).luhn_check()
+        await self.config.guild(ctx.guild).luhn_check.set(not current)
+        self.invalidate_snapshot(ctx.guild)
+        status = "enabled" if not current else "disabled"
+        embed = discord.Embed(
+            title="Checksum toggled",
+            description=f"Credit card checksum validation is now **{status}**.",
+            color=0x2bbd8e if status == "enabled" else 0xff4545
+        )
+        await ctx.send(embed=embed)
+
     @commands.admin_or_permissions()
     @infocontrol.command()
     async def alerts(self, ctx, channel: discord.TextChannel):
         """Set the log channel for info control deletions."""
         await self.config.guild(ctx.guild).log_channel.set(channel.id)
+        self.invalidate_snapshot(ctx.guild)
         await ctx.send(f"Log channel set to {channel.mention}.")
 
     @commands.admin_or_permissions()
@@ -176,6 +181,7 @@ class InfoControl(commands.Cog):
                 await ctx.send(f"Role {role.mention} added to the list of roles to mention in alerts.")
             else:
                 await ctx.send(f"Role {role.mention} is already in the list of roles to mention in alerts.")
+        self.invalidate_snapshot(ctx.guild)
 
     @commands.admin_or_permissions()
     @infocontrol.command()
@@ -187,6 +193,7 @@ class InfoControl(commands.Cog):
                 await ctx.send(f"Role {role.mention} removed from the list of roles to mention in alerts.")
             else:
                 await ctx.send(f"Role {role.mention} is not in the list of roles to mention in alerts.")
+        self.invalidate_snapshot(ctx.guild)
 
     @infocontrol.command()
     async def settings(self, ctx):
@@ -224,6 +231,7 @@ class InfoControl(commands.Cog):
         log_channel_value = self.bot.get_channel(log_channel_id).mention if log_channel_id and self.bot.get_channel(log_channel_id) else "Not set"
         
         settings_list.append(("Alert channel", log_channel_value))
+        settings_list.append(("Card checksum", "**Active**" if guild_config.get("luhn_check", True) else "Inactive"))
         
         cog_status = "Enabled" if guild_config.get("enabled", False) else "Disabled"
         settings_list.append(("Cog status", cog_status))
@@ -274,5 +282,6 @@ class InfoControl(commands.Cog):
     async def reset(self, ctx):
         """Reset the info control settings to default for this guild."""
         await self.config.guild(ctx.guild).set(self.default_guild)
+        self.invalidate_snapshot(ctx.guild)
         await ctx.send("Info control settings have been reset to default.")
 
@@ -0,0 +1,30 @@
+"""
+The default patterns InfoControl checks messages against.
+
+Kept apart from the cog so the offline benchmark can load them without Red.
+"""
+
+DEFAULT_PATTERNS = {
+    "email": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b",
+    "ssn": r"\b\d{3}-\d{2}-\d{4}\b",
+    "bankcard": r"\b\d{4} \d{4} \d{4} \d{4}\b",
+    "phone": r"\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b",
+    "phone_no_spaces": r"\b\d{10}\b",
+    "ipv4": r"\b((25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b",
+    "ipv6": r"\b([0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}\b",
+    "creditcard": r"\b(?:\d[ -]?){13,19}\b",
+    "passport": r"\b[A-PR-WYa-pr-wy][1-9]\d\s?\d{4}[1-9]\b",
+    "iban": r"\b[A-Z]{2}\d{2}[A-Z0-9]{1,30}\b",
+    "mac_address": r"\b([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})\b",
+    "bitcoin_address": r"\b[13][a-km-zA-HJ-NP-Z1-9]{25,34}\b",
+    "drivers_license": r"\b[A-Z]{2}-\d{1,14}\b",
+    "vin": r"\b[A-HJ-NPR-Z0-9]{17}\b",
+    "ssn_alternative": r"\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b",
+    "phone_alternative": r"\b\(\d{3}\)\s?\d{3}[-.\s]?\d{4}\b",
+    "zip_code": r"\b\d{5}(?:[-\s]\d{4})?\b",
+    "street_address": r"\b\d{1,5}\s[A-Za-z0-9#]+(?:\s[A-Za-z0-9#]+){0,4}\s?\b",
+    "birthdate": r"\b\d{2}/\d{2}/\d{4}\b",
+    "national_id": r"\b[A-Z0-9]{9}\b",
+    "tax_id": r"\b\d{2}-\d{7}\b",
+    "student_id": r"\b[A-Z0-9]{8}\b",
+}
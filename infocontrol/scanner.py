@@ -0,0 +1,129 @@
+import logging
+import re
+from functools import lru_cache
+from time import perf_counter
+from typing import List, Optional, Pattern, Tuple
+
+log = logging.getLogger("red.beehive-cogs.infocontrol")
+
+MAX_SCAN_LENGTH = 4000  # Longest message Discord allows, anything past it is ignored
+SCAN_TIME_BUDGET = 0.05  # Seconds the per-pattern pass may take before giving up
+SCANNER_CACHE_SIZE = 128  # Distinct pattern sets kept compiled at once
+
+# Mentions, hyperlinks, URLs and Discord IDs are never treated as sensitive
+STRIP_PATTERN = re.compile(
+    r"<@!?[0-9]+>"  # User mentions
+    r"|<#[0-9]+>"  # Channel mentions
+    r"|\[.*?\]\(.*?\)"  # Hyperlinks
+    r"|https?://\S+"  # URLs
+    r"|\b\d{17,19}\b"  # Discord user, message and channel IDs
+)
+
+# Earlier defaults that backtrack catastrophically, mapped to versions that match
+# exactly the same messages. Guilds that saved the old defaults with `reset` still
+# have them in config, so they are swapped when compiling.
+PATTERN_REWRITES = {
+    r"\b\d{1,5}\s(?:[A-Za-z0-9#]+\s?){1,5}\b": (
+        r"\b\d{1,5}\s[A-Za-z0-9#]+(?:\s[A-Za-z0-9#]+){0,4}\s?\b"
+    ),
+}
+
+# Keys whose candidates must also pass a Luhn checksum when checksums are enabled
+LUHN_KEYS = frozenset({"creditcard"})
+
+
+def strip_ignored(content: str) -> str:
+    return STRIP_PATTERN.sub("", content)
+
+
+def luhn_valid(candidate: str) -> bool:
+    digits = [int(char) for char in candidate if char.isdigit()]
+    if len(digits) < 13:
+        return False
+    total = 0
+    for index, digit in enumerate(reversed(digits)):
+        if index % 2:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return total % 10 == 0
+
+
+class PIIScanner:
+    """
+    Every enabled pattern of a guild compiled into one alternation.
+
+    Most messages match nothing, and for those a single search over the combined
+    pattern is the whole cost. When something does match, the individual patterns
+    are checked in their configured order so the reported key is the same one the
+    old loop of `re.search` calls would have picked.
+    """
+
+    def __init__(self, patterns: Tuple[Tuple[str, str], ...], luhn_check: bool = True):
+        self.keys: List[str] = []
+        self.patterns: List[Pattern] = []
+        for key, pattern in patterns:
+            pattern = PATTERN_REWRITES.get(pattern, pattern)
+            try:
+                compiled = re.compile(pattern)
+            except re.error:
+                log.warning("Skipping invalid pattern for %s: %r", key, pattern)
+                continue
+            self.keys.append(key)
+            self.patterns.append(compiled)
+        self.luhn_check = luhn_check
+        self.combined: Optional[Pattern] = None
+        if self.patterns:
+            sources = [compiled.pattern for compiled in self.patterns]
+            prefix = ""
+            if all(source.startswith(r"\b") for source in sources):
+                # Hoisting the shared leading \b lets the search skip every position that
+                # isn't a word boundary once, instead of once per branch
+                prefix = r"\b"
+                sources = [source[2:] for source in sources]
+            alternation = "|".join(f"(?P<p{index}>{source})" for index, source in enumerate(sources))
+            try:
+                self.combined = re.compile(f"{prefix}(?:{alternation})")
+            except re.error:
+                # A pattern with its own named groups or inline flags can't be combined,
+                # checking them one by one still works
+                self.combined = None
+
+    def find(self, content: str) -> Optional[str]:
+        """The first configured key that matches the content, or `None`."""
+        if not self.patterns:
+            return None
+        content = content[:MAX_SCAN_LENGTH]
+        hit = None
+        if self.combined is not None:
+            match = self.combined.search(content)
+            if match is None:
+                return None
+            hit = int(match.lastgroup[1:])
+        started = perf_counter()
+        for index, (key, pattern) in enumerate(zip(self.keys, self.patterns)):
+            if self.luhn_check and key in LUHN_KEYS:
+                if any(luhn_valid(m.group(0)) for m in pattern.finditer(content)):
+                    return key
+            elif index == hit or pattern.search(content):
+                return key
+            if perf_counter() - started > SCAN_TIME_BUDGET:
+                log.warning(
+                    "Pattern scan exceeded %.0fms at %s on %d characters, skipping the rest",
+                    SCAN_TIME_BUDGET * 1000,
+                    key,
+                    len(content),
+                )
+                # Fail closed, the combined pattern already found a match even if
+                # its checksum or an earlier pattern could not be confirmed in time
+                if hit is not None:
+                    return self.keys[hit]
+                return None
+        return None
+
+
+@lru_cache(maxsize=SCANNER_CACHE_SIZE)
+def get_scanner(patterns: Tuple[Tuple[str, str], ...], luhn_check: bool = True) -> PIIScanner:
+    """A compiled scanner for the enabled patterns, shared by guilds with the same settings."""
+    return PIIScanner(patterns, luhn_check)
@@ -0,0 +1,144 @@
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+import discord
+
+INVITE_CACHE_SIZE = 2048  # Most invite codes kept at once, least recently used go first
+INVITE_CACHE_TTL = 15 * 60  # Seconds a resolved invite is trusted for
+INVITE_NOT_FOUND_TTL = 5 * 60  # Invalid codes are rechecked sooner in case they were typos
+
+
+class ResolvedInvite:
+    """
+    The parts of an invite the filter needs, kept instead of the full invite object.
+    """
+
+    __slots__ = (
+        "code",
+        "found",
+        "guild_id",
+        "guild_name",
+        "guild_description",
+        "member_count",
+        "presence_count",
+        "error_status",
+    )
+
+    def __init__(
+        self,
+        code: str,
+        found: bool = True,
+        guild_id: Optional[int] = None,
+        guild_name: Optional[str] = None,
+        guild_description: Optional[str] = None,
+        member_count: Optional[int] = None,
+        presence_count: Optional[int] = None,
+        error_status=None,
+    ):
+        self.code = code
+        self.found = found
+        self.guild_id = guild_id
+        self.guild_name = guild_name
+        self.guild_description = guild_description
+        self.member_count = member_count
+        self.presence_count = presence_count
+        # HTTP status of a failed lookup, these results are never cached
+        self.error_status = error_status
+
+    @classmethod
+    def from_invite(cls, code: str, invite: discord.Invite) -> "ResolvedInvite":
+        guild = getattr(invite, "guild", None)
+        return cls(
+            code,
+            guild_id=guild.id if guild else None,
+            guild_name=guild.name if guild else None,
+            guild_description=getattr(guild, "description", None) if guild else None,
+            member_count=getattr(invite, "approximate_member_count", None),
+            presence_count=getattr(invite, "approximate_presence_count", None),
+        )
+
+    def log_fields(self) -> Dict[str, object]:
+        """Embed fields describing the invite for the log channel."""
+        if self.error_status is not None:
+            return {"Invite Fetch Error": f"HTTP Error: {self.error_status}"}
+        if not self.found:
+            return {"Invite Status": "Invalid or Expired"}
+        return {
+            "Server name": self.guild_name or "Unknown (Group DM or Deleted Server)",
+            "Server ID": self.guild_id or "N/A",
+            "Member count": "N/A" if self.member_count is None else self.member_count,
+            "Online now": "N/A" if self.presence_count is None else self.presence_count,
+        }
+
+
+class InviteCache:
+    """
+    A TTL and LRU bounded cache of invite lookups shared by every guild.
+
+    Raids tend to post the same invite over and over, so each code is only
+    fetched once while its entry is fresh, and callers asking for a code that
+    is already being fetched wait on that request instead of starting another.
+    """
+
+    def __init__(
+        self,
+        bot,
+        maxsize: int = INVITE_CACHE_SIZE,
+        ttl: float = INVITE_CACHE_TTL,
+        not_found_ttl: float = INVITE_NOT_FOUND_TTL,
+    ):
+        self.bot = bot
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.not_found_ttl = not_found_ttl
+        # code -> (expiry, result), ordered from least to most recently used
+        self._entries: "OrderedDict[str, Tuple[float, ResolvedInvite]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def get(self, code: str) -> Optional[ResolvedInvite]:
+        """A fresh cached result for the code, without fetching anything."""
+        entry = self._entries.get(code)
+        if entry is None:
+            return None
+        expires, resolved = entry
+        if expires <= monotonic():
+            del self._entries[code]
+            return None
+        self._entries.move_to_end(code)
+        return resolved
+
+    async def resolve(self, code: str) -> ResolvedInvite:
+        resolved = self.get(code)
+        if resolved is not None:
+            return resolved
+        future = self._pending.get(code)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(code))
+            self._pending[code] = future
+            future.add_done_callback(lambda _: self._pending.pop(code, None))
+        # Shield so one cancelled waiter does not cancel the lookup for the others
+        return await asyncio.shield(future)
+
+    async def _fetch(self, code: str) -> ResolvedInvite:
+        try:
+            invite = await self.bot.fetch_invite(code)
+        except discord.NotFound:
+            resolved = ResolvedInvite(code, found=False)
+            self._store(code, resolved, self.not_found_ttl)
+            return resolved
+        except discord.HTTPException as e:
+            return ResolvedInvite(code, found=False, error_status=getattr(e, "status", "Unknown"))
+        resolved = ResolvedInvite.from_invite(code, invite)
+        self._store(code, resolved, self.ttl)
+        return resolved
+
+    def _store(self, code: str, resolved: ResolvedInvite, ttl: float) -> None:
+        self._entries[code] = (monotonic() + ttl, resolved)
+        self._entries.move_to_end(code)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
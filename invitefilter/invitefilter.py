@@ -1,7 +1,59 @@
 import discord
 from redbot.core import commands, Config  # type: ignore
+import asyncio
 import re
 import datetime  # Added for timedelta
+from collections import Counter
+from typing import Dict
+
+from .cache import InviteCache
+
+# Catches variations like ".gg/server" and captures the code part for fetch_invite
+INVITE_PATTERN = re.compile(
+    r"(?:https?://)?(?:www\.)?"
+    r"(?:discord\.(?:gg|io|me|li)|discordapp\.com/invite|dsc\.gg|invite\.gg)/(?P<code>[a-zA-Z0-9\-]+)",
+    re.IGNORECASE,
+)
+# Cheap check for the part every invite link shares, run before anything else
+INVITE_PREFILTER = re.compile(r"(?:\.(?:gg|io|me|li)|/invite)/", re.IGNORECASE)
+MAX_INVITES_CHECKED = 5  # Distinct invite codes looked up per message
+STATS_FLUSH_INTERVAL = 60  # Seconds between writing batched counters to config
+
+
+class GuildSettings:
+    """
+    A read-only snapshot of a guild's filter settings used by the message listener.
+    """
+
+    __slots__ = (
+        "enabled",
+        "whitelisted_channels",
+        "whitelisted_categories",
+        "whitelisted_users",
+        "whitelisted_roles",
+        "logging_channel",
+        "timeout_duration",
+    )
+
+    def __init__(self, config: dict):
+        self.enabled = config["delete_invites"]
+        self.whitelisted_channels = frozenset(config["whitelisted_channels"])
+        self.whitelisted_categories = frozenset(config["whitelisted_categories"])
+        self.whitelisted_users = frozenset(config["whitelisted_users"])
+        self.whitelisted_roles = frozenset(config["whitelisted_roles"])
+        self.logging_channel = config["logging_channel"]
+        self.timeout_duration = config["timeout_duration"]
+
+    def is_whitelisted(self, message: discord.Message) -> bool:
+        if message.channel.id in self.whitelisted_channels:
+            return True
+        category_id = getattr(message.channel, "category_id", None)
+        if category_id and category_id in self.whitelisted_categories:
+            return True
+        if message.author.id in self.whitelisted_users:
+            return True
+        return any(role.id in self.whitelisted_roles for role in message.author.roles)
+
 
 class InviteFilter(commands.Cog):
     """A cog to detect and remove Discord server invites from chat."""
@@ -10,6 +62,12 @@ class InviteFilter(commands.Cog):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=22222222222)
         self._register_config()
+        self.invite_cache = InviteCache(bot)
+        # Settings snapshots keyed by guild id, dropped whenever a setting changes
+        self._settings: Dict[int, GuildSettings] = {}
+        self._pending_stats: Dict[int, Counter] = {}
+        self._pending_total_deleted = 0
+        self.stats_flush_task = self.bot.loop.create_task(self.flush_stats_periodically())
 
     def _register_config(self):
         """Register configuration defaults."""
@@ -29,194 +87,181 @@ class InviteFilter(commands.Cog):
             total_invites_deleted=0
         )
 
+    def cog_unload(self):
+        self.stats_flush_task.cancel()
+        self.bot.loop.create_task(self.flush_stats())
+
+    async def get_settings(self, guild: discord.Guild) -> GuildSettings:
+        settings = self._settings.get(guild.id)
+        if settings is None:
+            settings = GuildSettings(await self.config.guild(guild).all())
+            self._settings[guild.id] = settings
+        return settings
+
+    def invalidate_settings(self, guild: discord.Guild) -> None:
+        self._settings.pop(guild.id, None)
+
+    def count_stats(self, guild: discord.Guild, **counts: int) -> None:
+        self._pending_stats.setdefault(guild.id, Counter()).update(counts)
+
+    async def flush_stats_periodically(self):
+        while True:
+            await asyncio.sleep(STATS_FLUSH_INTERVAL)
+            try:
+                await self.flush_stats()
+            except Exception:
+                pass
+
+    async def flush_stats(self):
+        """Write the counters collected since the last flush to config."""
+        pending, self._pending_stats = self._pending_stats, {}
+        total_deleted, self._pending_total_deleted = self._pending_total_deleted, 0
+        for guild_id, counts in pending.items():
+            guild_config = self.config.guild_from_id(guild_id)
+            for key, count in counts.items():
+                current = await guild_config.get_attr(key)()
+                await guild_config.get_attr(key).set(current + count)
+        if total_deleted:
+            current_total_deleted = await self.config.total_invites_deleted()
+            await self.config.total_invites_deleted.set(current_total_deleted + total_deleted)
+
     @commands.Cog.listener()
     async def on_message(self, message):
         # Ignore bots and DMs
         if message.author.bot or not message.guild:
             return
 
-        guild = message.guild
-        member = message.author  # Use member object for timeout
-
-        # Check if filtering is enabled
-        if not await self.config.guild(guild).delete_invites():
-            return
-
-        # Check channel whitelist
-        whitelisted_channels = await self.config.guild(guild).whitelisted_channels()
-        if message.channel.id in whitelisted_channels:
+        # Most messages contain no invite, so rule them out before touching config
+        if not INVITE_PREFILTER.search(message.content):
             return
 
-        # Check category whitelist
-        whitelisted_categories = await self.config.guild(guild).whitelisted_categories()
-        if message.channel.category_id and message.channel.category_id in whitelisted_categories:
+        # Collect every distinct invite code in a single pass, keeping the text that matched for logging
+        matches = {}
+        for match in INVITE_PATTERN.finditer(message.content):
+            matches.setdefault(match.group("code"), match.group(0))
+            if len(matches) >= MAX_INVITES_CHECKED:
+                break
+        if not matches:
             return
 
-        # Check user whitelist
-        whitelisted_users = await self.config.guild(guild).whitelisted_users()
-        if member.id in whitelisted_users:
-            return
-
-        # Check role whitelist (ensure member object is used)
-        if isinstance(member, discord.Member):  # Ensure it's a member object before checking roles
-            whitelisted_roles = await self.config.guild(guild).whitelisted_roles()
-            # Use member.roles directly
-            if any(role.id in whitelisted_roles for role in member.roles):
-                return
-        else:
+        guild = message.guild
+        member = message.author  # Use member object for timeout
+        if not isinstance(member, discord.Member):
             # This case should ideally not happen in guilds, but safety check
             return
 
-        # Enhanced invite pattern to catch variations like ".gg/server"
-        # Regex needs to capture the code part for fetch_invite if the full URL isn't present
-        # Using a more robust regex to capture various forms and extract the code
-        invite_pattern = r"(?:discord\.(?:gg|io|me|li)|discordapp\.com/invite|dsc\.gg|invite\.gg)[/](?P<code>[a-zA-Z0-9\-]+)"
-        full_url_pattern = r"(?:https?://)?(?:www\.)?" + invite_pattern  # For logging the full match
-
-        match = re.search(invite_pattern, message.content, re.IGNORECASE)
-        full_match = re.search(full_url_pattern, message.content, re.IGNORECASE)
+        # Check if filtering is enabled and whether the channel, category, user or a role is whitelisted
+        settings = await self.get_settings(guild)
+        if not settings.enabled or settings.is_whitelisted(message):
+            return
 
-        if match:
-            invite_code = match.group("code")
-            log_invite_url = full_match.group(0) if full_match else f"discord.gg/{invite_code}"  # Log the matched URL or construct one
+        # Resolve the codes together, repeated codes are answered by the shared cache
+        # Invite details are fetched first so they can be logged even if deletion/timeout fails
+        resolved = await asyncio.gather(*(self.invite_cache.resolve(code) for code in matches))
 
-            actions_taken = []
-            log_fields = {}
-            invite_info = None  # Store invite info for logging
+        # Invites that belong to the current server are ignored, act on the first one that doesn't
+        invite_info = next((info for info in resolved if info.guild_id != guild.id), None)
+        if invite_info is None:
+            return
 
-            # Fetch invite details first (if possible) to log them even if deletion/timeout fails
-            is_own_guild_invite = False
-            try:
-                # Use the extracted code which is more reliable for fetch_invite
-                invite_info = await self.bot.fetch_invite(invite_code)
-                log_fields["Server name"] = invite_info.guild.name if getattr(invite_info, "guild", None) else "Unknown (Group DM or Deleted Server)"
-                log_fields["Server ID"] = invite_info.guild.id if getattr(invite_info, "guild", None) else "N/A"
-                log_fields["Member count"] = getattr(invite_info, 'approximate_member_count', 'N/A')  # Use getattr for safety
-                log_fields["Online now"] = getattr(invite_info, 'approximate_presence_count', 'N/A')
-                # Ignore invites that belong to the current server
-                if getattr(invite_info, "guild", None) and invite_info.guild.id == guild.id:
-                    is_own_guild_invite = True
-            except discord.NotFound:
-                log_fields["Invite Status"] = "Invalid or Expired"
-            except discord.HTTPException as e:
-                log_fields["Invite Fetch Error"] = f"HTTP Error: {getattr(e, 'status', 'Unknown')}"
-            # No except discord.Forbidden here, handle below for specific actions
-
-            # If the invite is for this server, ignore it
-            if is_own_guild_invite:
-                return
+        invite_code = invite_info.code
+        log_invite_url = matches[invite_code]
+        actions_taken = []
+        log_fields = invite_info.log_fields()
+
+        # --- Action: Delete Message ---
+        try:
+            await message.delete()
+            actions_taken.append("Message deleted")
+            # Increment counters only on successful deletion
+            self.count_stats(guild, invites_deleted=1)
+            self._pending_total_deleted += 1
+        except discord.Forbidden:
+            actions_taken.append("Deletion failed (Missing Permissions)")
+        except discord.NotFound:
+            actions_taken.append("Deletion failed (Message already deleted)")
+        except discord.HTTPException as e:
+            actions_taken.append(f"Deletion failed (HTTP Error: {getattr(e, 'status', 'Unknown')})")
+
+        # --- Action: Timeout User ---
+        timeout_duration_minutes = settings.timeout_duration
+        if timeout_duration_minutes > 0 and isinstance(member, discord.Member):  # Check if timeout is enabled and we have a member object
+            # Ensure the bot has permissions higher than the target user
+            if guild.me and guild.me.top_role > member.top_role:
+                try:
+                    # Check if the user is already timed out
+                    # member.timed_out_until is a datetime.datetime or None
+                    now_utc = datetime.datetime.now(datetime.timezone.utc)
+                    timed_out_until = getattr(member, "timed_out_until", None)
+                    if timed_out_until and timed_out_until > now_utc:
+                        # User is already timed out, so extend the timeout by the additional duration
+                        new_timeout_until = timed_out_until + datetime.timedelta(minutes=timeout_duration_minutes)
+                        # Discord's max timeout is 28 days from now
+                        max_timeout_until = now_utc + datetime.timedelta(days=28)
+                        if new_timeout_until > max_timeout_until:
+                            new_timeout_until = max_timeout_until
+                        await member.edit(timeout=new_timeout_until, reason="Sent Discord invite link (timeout extended)")
+                        actions_taken.append(f"Timeout extended by {timeout_duration_minutes} minutes (new expiry: <t:{int(new_timeout_until.timestamp())}:R>)")
+                        # Increment timeout stats on success, only adding the additional minutes
+                        self.count_stats(guild, timeouts_issued=1, total_timeout_minutes=timeout_duration_minutes)
+                    else:
+                        # User is not currently timed out, apply a new timeout
+                        timeout_delta = datetime.timedelta(minutes=timeout_duration_minutes)
+                        await member.timeout(timeout_delta, reason="Sent Discord invite link")
+                        actions_taken.append(f"Timeout issued for {timeout_duration_minutes} minutes")
+                        # Increment timeout stats on success
+                        self.count_stats(guild, timeouts_issued=1, total_timeout_minutes=timeout_duration_minutes)
+                except discord.Forbidden:
+                    actions_taken.append(f"Timeout failed (Missing Permissions or Role Hierarchy)")
+                except discord.HTTPException as e:
+                    actions_taken.append(f"Timeout failed (HTTP Error: {getattr(e, 'status', 'Unknown')})")
+            else:
+                actions_taken.append(f"Timeout skipped (Bot role not high enough)")
+
+        # --- Action: Log Event ---
+        logging_channel_id = settings.logging_channel
+        if logging_channel_id:
+            logging_channel = guild.get_channel(logging_channel_id)
+            if (
+                logging_channel
+                and logging_channel.permissions_for(guild.me).send_messages
+                and logging_channel.permissions_for(guild.me).embed_links
+            ):
+                embed = discord.Embed(
+                    title="Unwanted invite detected",
+                    description="An invite link was detected",
+                    color=0xff4545
+                )
+                embed.add_field(name="Channel", value=message.channel.mention, inline=True)
+                embed.add_field(name="User", value=f"{member.mention} ({member.id})", inline=True)
+                embed.add_field(name="Detected invite", value=f"`{log_invite_url}`", inline=True)  # Use the matched URL
+
+                # Add invite details if fetched
+                for name, value in log_fields.items():
+                    embed.add_field(name=name, value=value, inline=True)
+
+                if invite_info.guild_description:
+                    embed.add_field(
+                        name="Server description",
+                        value=invite_info.guild_description[:1024],  # Discord embed field value limit
+                        inline=False
+                    )
 
-            # --- Action: Delete Message ---
-            try:
-                await message.delete()
-                actions_taken.append("Message deleted")
-                # Increment counters only on successful deletion
-                current_guild_deleted = await self.config.guild(guild).invites_deleted()
-                await self.config.guild(guild).invites_deleted.set(current_guild_deleted + 1)
-                current_total_deleted = await self.config.total_invites_deleted()
-                await self.config.total_invites_deleted.set(current_total_deleted + 1)
-            except discord.Forbidden:
-                actions_taken.append("Deletion failed (Missing Permissions)")
-            except discord.NotFound:
-                actions_taken.append("Deletion failed (Message already deleted)")
-            except discord.HTTPException as e:
-                actions_taken.append(f"Deletion failed (HTTP Error: {getattr(e, 'status', 'Unknown')})")
-
-            # --- Action: Timeout User ---
-            timeout_duration_minutes = await self.config.guild(guild).timeout_duration()
-            if timeout_duration_minutes > 0 and isinstance(member, discord.Member):  # Check if timeout is enabled and we have a member object
-                # Ensure the bot has permissions higher than the target user
-                if guild.me and guild.me.top_role > member.top_role:
-                    try:
-                        # Check if the user is already timed out
-                        # member.timed_out_until is a datetime.datetime or None
-                        now_utc = datetime.datetime.now(datetime.timezone.utc)
-                        timed_out_until = getattr(member, "timed_out_until", None)
-                        if timed_out_until and timed_out_until > now_utc:
-                            # User is already timed out, so extend the timeout by the additional duration
-                            new_timeout_until = timed_out_until + datetime.timedelta(minutes=timeout_duration_minutes)
-                            # Discord's max timeout is 28 days from now
-                            max_timeout_until = now_utc + datetime.timedelta(days=28)
-                            if new_timeout_until > max_timeout_until:
-                                new_timeout_until = max_timeout_until
-                            await member.edit(timeout=new_timeout_until, reason="Sent Discord invite link (timeout extended)")
-                            actions_taken.append(f"Timeout extended by {timeout_duration_minutes} minutes (new expiry: <t:{int(new_timeout_until.timestamp())}:R>)")
-                            # Increment timeout stats on success
-                            current_timeouts = await self.config.guild(guild).timeouts_issued()
-                            await self.config.guild(guild).timeouts_issued.set(current_timeouts + 1)
-                            current_total_minutes = await self.config.guild(guild).total_timeout_minutes()
-                            # Only add the additional minutes, not the full new timeout
-                            await self.config.guild(guild).total_timeout_minutes.set(current_total_minutes + timeout_duration_minutes)
-                        else:
-                            # User is not currently timed out, apply a new timeout
-                            timeout_delta = datetime.timedelta(minutes=timeout_duration_minutes)
-                            await member.timeout(timeout_delta, reason="Sent Discord invite link")
-                            actions_taken.append(f"Timeout issued for {timeout_duration_minutes} minutes")
-                            # Increment timeout stats on success
-                            current_timeouts = await self.config.guild(guild).timeouts_issued()
-                            await self.config.guild(guild).timeouts_issued.set(current_timeouts + 1)
-                            current_total_minutes = await self.config.guild(guild).total_timeout_minutes()
-                            await self.config.guild(guild).total_timeout_minutes.set(current_total_minutes + timeout_duration_minutes)
-                    except discord.Forbidden:
-                        actions_taken.append(f"Timeout failed (Missing Permissions or Role Hierarchy)")
-                    except discord.HTTPException as e:
-                        actions_taken.append(f"Timeout failed (HTTP Error: {getattr(e, 'status', 'Unknown')})")
+                if actions_taken:
+                    embed.add_field(name="Actions taken", value="\n".join(f"- {action}" for action in actions_taken), inline=False)
                 else:
-                    actions_taken.append(f"Timeout skipped (Bot role not high enough)")
-
-            # --- Action: Log Event ---
-            logging_channel_id = await self.config.guild(guild).logging_channel()
-            if logging_channel_id:
-                logging_channel = guild.get_channel(logging_channel_id)
-                if (
-                    logging_channel
-                    and logging_channel.permissions_for(guild.me).send_messages
-                    and logging_channel.permissions_for(guild.me).embed_links
-                ):
-                    embed = discord.Embed(
-                        title="Unwanted invite detected",
-                        description="An invite link was detected",
-                        color=0xff4545
-                    )
-                    embed.add_field(name="Channel", value=message.channel.mention, inline=True)
-                    embed.add_field(name="User", value=f"{member.mention} ({member.id})", inline=True)
-                    embed.add_field(name="Detected invite", value=f"`{log_invite_url}`", inline=True)  # Use the matched URL
-
-                    # Add invite details if fetched
-                    for name, value in log_fields.items():
-                        embed.add_field(name=name, value=value, inline=True)
-
-                    # If the invite_info was fetched and has a guild with a description, show it
-                    if "Server name" in log_fields and "Server ID" in log_fields:
-                        # Try to get the invite_info.guild.description if available
-                        try:
-                            invite_info2 = await self.bot.fetch_invite(invite_code)
-                            if getattr(invite_info2, "guild", None) and getattr(invite_info2.guild, "description", None):
-                                description = invite_info2.guild.description
-                                if description:
-                                    embed.add_field(
-                                        name="Server description",
-                                        value=description[:1024],  # Discord embed field value limit
-                                        inline=False
-                                    )
-                        except Exception:
-                            pass  # Don't break logging if this fails
-
-                    if actions_taken:
-                        embed.add_field(name="Actions taken", value="\n".join(f"- {action}" for action in actions_taken), inline=False)
-                    else:
-                        embed.add_field(name="Actions taken", value="None", inline=False)
+                    embed.add_field(name="Actions taken", value="None", inline=False)
 
-                    embed.set_footer(text=f"Message ID: {message.id}")
-                    embed.timestamp = datetime.datetime.now(datetime.timezone.utc)
+                embed.set_footer(text=f"Message ID: {message.id}")
+                embed.timestamp = datetime.datetime.now(datetime.timezone.utc)
 
-                    try:
-                        await logging_channel.send(embed=embed)
-                    except discord.HTTPException:
-                        # Log failure to send log message (e.g., to console or another fallback)
-                        print(f"Failed to send invite filter log to channel {logging_channel_id} in guild {guild.id}")
-                elif logging_channel:
-                    print(f"Missing Send/Embed permissions for invite filter log channel {logging_channel_id} in guild {guild.id}")
+                try:
+                    await logging_channel.send(embed=embed)
+                except discord.HTTPException:
+                    # Log failure to send log message (e.g., to console or another fallback)
+                    print(f"Failed to send invite filter log to channel {logging_channel_id} in guild {guild.id}")
+            elif logging_channel:
+                print(f"Missing Send/Embed permissions for invite filter log channel {logging_channel_id} in guild {guild.id}")
 
     @commands.guild_only()
     @commands.admin_or_permissions(manage_guild=True)
@@ -241,6 +286,7 @@ class InviteFilter(commands.Cog):
             new_status = on_off
 
         await self.config.guild(guild).delete_invites.set(new_status)
+        self.invalidate_settings(guild)
         status = "enabled" if new_status else "disabled"
         await ctx.send(f"✅ Invite filter is now **{status}**.")
 
@@ -269,6 +315,7 @@ class InviteFilter(commands.Cog):
                 whitelisted_channels.append(channel.id)
                 changelog.append(f"➕ Added channel: {channel.mention}")
 
+        self.invalidate_settings(guild)
         if changelog:
             changelog_message = "\n".join(changelog)
             embed = discord.Embed(title="Whitelist Channel Updated", description=changelog_message, color=discord.Color.blue())
@@ -294,6 +341,7 @@ class InviteFilter(commands.Cog):
                 whitelisted_categories.append(category.id)
                 changelog.append(f"➕ Added category: {category.name}")
 
+        self.invalidate_settings(guild)
         if changelog:
             changelog_message = "\n".join(changelog)
             embed = discord.Embed(title="Whitelist Category Updated", description=changelog_message, color=discord.Color.blue())
@@ -319,6 +367,7 @@ class InviteFilter(commands.Cog):
                 whitelisted_roles.append(role.id)
                 changelog.append(f"➕ Added role: {role.mention}")
 
+        self.invalidate_settings(guild)
         if changelog:
             changelog_message = "\n".join(changelog)
             embed = discord.Embed(title="Whitelist Role Updated", description=changelog_message, color=discord.Color.blue())
@@ -344,6 +393,7 @@ class InviteFilter(commands.Cog):
                 whitelisted_users.append(user.id)
                 changelog.append(f"➕ Added user: {user.mention}")
 
+        self.invalidate_settings(guild)
         if changelog:
             changelog_message = "\n".join(changelog)
             embed = discord.Embed(title="Whitelist User Updated", description=changelog_message, color=discord.Color.blue())
@@ -365,9 +415,11 @@ class InviteFilter(commands.Cog):
                 await ctx.send(f"⚠️ I lack `Send Messages` or `Embed Links` permissions in {channel.mention}. Please grant them for logging to work.")
                 return
             await self.config.guild(guild).logging_channel.set(channel.id)
+            self.invalidate_settings(guild)
             await ctx.send(f"✅ Logging channel set to {channel.mention}.")
         else:
             await self.config.guild(guild).logging_channel.set(None)
+            self.invalidate_settings(guild)
             await ctx.send("✅ Logging channel disabled.")
 
     @commands.admin_or_permissions(manage_guild=True)
@@ -384,6 +436,7 @@ class InviteFilter(commands.Cog):
             return
 
         await self.config.guild(guild).timeout_duration.set(minutes)
+        self.invalidate_settings(guild)
         if minutes > 0:
             await ctx.send(f"✅ Timeout duration set to **{minutes}** minutes.")
         else:
@@ -398,6 +451,12 @@ class InviteFilter(commands.Cog):
         total_timeout_minutes = await self.config.guild(guild).total_timeout_minutes()
         timeout_duration = await self.config.guild(guild).timeout_duration()  # Current setting
         total_invites_deleted = await self.config.total_invites_deleted()
+        # Include counts that haven't been flushed to config yet
+        pending = self._pending_stats.get(guild.id, Counter())
+        invites_deleted += pending["invites_deleted"]
+        timeouts_issued += pending["timeouts_issued"]
+        total_timeout_minutes += pending["total_timeout_minutes"]
+        total_invites_deleted += self._pending_total_deleted
 
         embed = discord.Embed(title="Invite filter statistics", color=0xfffffe)  # Use standard color
 
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# (name, bucket width in seconds, buckets kept), every sample lands in each tier
+TIERS = (
+    ("minute", 60, 1440),  # the last day
+    ("hour", 60 * 60, 1440),  # the last sixty days
+    ("day", 24 * 60 * 60, 1825),  # the last five years
+)
+TIER_INDEX = {name: index for index, (name, _, _) in enumerate(TIERS)}
+
+MAGIC = b"IVGS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHQ")  # magic, format version, data version
+
+
+class GrowthSeries:
+    """
+    A fixed size member count history for one guild.
+
+    Each tier is a ring of buckets indexed by bucket number, storing the last
+    member count seen in that bucket. Recording a join is a constant number of
+    array writes and the whole series is a few tens of kilobytes no matter how
+    many members join.
+    """
+
+    __slots__ = ("ids", "values", "version", "dirty")
+
+    def __init__(self):
+        # bucket number held in each slot, -1 while the slot is empty
+        self.ids = [array("i", [-1]) * size for _, _, size in TIERS]
+        self.values = [array("i", [0]) * size for _, _, size in TIERS]
+        # bumped on every change so rendered charts can be cached per version
+        self.version = 0
+        self.dirty = False
+
+    def record(self, timestamp: float, member_count: int) -> None:
+        for tier, (_, width, size) in enumerate(TIERS):
+            bucket = int(timestamp // width)
+            slot = bucket % size
+            # an older sample never replaces a newer bucket sharing its slot
+            if self.ids[tier][slot] <= bucket:
+                self.ids[tier][slot] = bucket
+                self.values[tier][slot] = member_count
+        self.version += 1
+        self.dirty = True
+
+    def points(self, tier_name: str) -> List[Tuple[int, int]]:
+        """(bucket start timestamp, member count) pairs in time order."""
+        tier = TIER_INDEX[tier_name]
+        _, width, size = TIERS[tier]
+        ids, values = self.ids[tier], self.values[tier]
+        latest = max(ids)
+        if latest < 0:
+            return []
+        return sorted(
+            (bucket * width, values[slot])
+            for slot, bucket in enumerate(ids)
+            if bucket >= 0 and bucket > latest - size
+        )
+
+    def to_bytes(self) -> bytes:
+        parts = [HEADER.pack(MAGIC, FORMAT_VERSION, self.version)]
+        for ids, values in zip(self.ids, self.values):
+            parts.append(ids.tobytes())
+            parts.append(values.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GrowthSeries":
+        series = cls()
+        magic, format_version, version = HEADER.unpack_from(data)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError("Not a member growth series")
+        offset = HEADER.size
+        for tier, (_, _, size) in enumerate(TIERS):
+            for column in (series.ids[tier], series.values[tier]):
+                length = size * column.itemsize
+                column[:] = array(column.typecode, data[offset:offset + length])
+                offset += length
+        series.version = version
+        return series
+
+
+class GrowthStore:
+    """
+    Member growth series for every guild, one binary file each in the cog data path.
+
+    Series are loaded on first use and written back by `flush`, which the cog
+    calls periodically and on unload, so joins only ever touch memory.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._series: Dict[int, GrowthSeries] = {}
+
+    def _file(self, guild_id: int) -> Path:
+        return self.path / f"{guild_id}.bin"
+
+    def get(self, guild_id: int) -> Optional[GrowthSeries]:
+        """The series if it is already loaded."""
+        return self._series.get(guild_id)
+
+    async def load(self, guild_id: int) -> GrowthSeries:
+        series = self._series.get(guild_id)
+        if series is None:
+            series = await asyncio.to_thread(self._read, guild_id)
+            series = self._series.setdefault(guild_id, series)
+        return series
+
+    def _read(self, guild_id: int) -> GrowthSeries:
+        try:
+            return GrowthSeries.from_bytes(self._file(guild_id).read_bytes())
+        except (OSError, ValueError, struct.error):
+            return GrowthSeries()
+
+    async def flush(self) -> None:
+        for guild_id, series in list(self._series.items()):
+            if not series.dirty:
+                continue
+            series.dirty = False
+            data = series.to_bytes()
+            try:
+                await asyncio.to_thread(self._write, guild_id, data)
+            except OSError:
+                series.dirty = True
+
+    def _write(self, guild_id: int, data: bytes) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        target = self._file(guild_id)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+
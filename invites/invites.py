@@ -1,9 +1,16 @@
 import discord  # type: ignore
 from redbot.core import commands, Config, checks  # type: ignore
-import matplotlib.pyplot as plt  # type: ignore
+from redbot.core.data_manager import cog_data_path  # type: ignore
 import io
 import asyncio
 from datetime import datetime
+from typing import Dict, List
+
+from .growth import GrowthSeries, GrowthStore
+from .render import ImageRenderer, render_growth_chart
+
+JOIN_COALESCE_WINDOW = 1.5  # Seconds joins wait so a burst shares one guild.invites() call
+GROWTH_FLUSH_INTERVAL = 60  # Seconds between writing member growth series to disk
 
 class Invites(commands.Cog):
     """
@@ -20,10 +27,49 @@ class Invites(commands.Cog):
             "invites": {},  # {user_id: count}
             "rewards": {},  # {invite_count: role_id}
             "announcement_channel": None,
-            "member_growth": [],  # [(iso_date, member_count)]
+            "member_growth": [],  # Legacy [(iso_date, member_count)], moved to the growth store on first use
         }
         self.config.register_guild(**default_guild)
-        self._cache = {}  # {guild_id: [Invite objects]}
+        self._cache = {}  # {guild_id: {code: Invite}}
+        self._pending_joins: Dict[int, List[discord.Member]] = {}
+        self.growth = GrowthStore(cog_data_path(self) / "growth")
+        self._growth_lock = asyncio.Lock()
+        self.growth_flush_task = self.bot.loop.create_task(self.flush_growth_periodically())
+        self.renderer = ImageRenderer()
+
+    def cog_unload(self):
+        self.growth_flush_task.cancel()
+        self.renderer.close()
+        self.bot.loop.create_task(self.growth.flush())
+
+    async def flush_growth_periodically(self):
+        while True:
+            await asyncio.sleep(GROWTH_FLUSH_INTERVAL)
+            try:
+                await self.growth.flush()
+            except Exception as e:
+                print(f"[Invites] Error saving member growth: {e}")
+
+    async def _growth_series(self, guild) -> GrowthSeries:
+        """The guild's growth series, importing the old Config list the first time."""
+        series = self.growth.get(guild.id)
+        if series is not None:
+            return series
+        async with self._growth_lock:
+            series = self.growth.get(guild.id)
+            if series is not None:
+                return series
+            series = await self.growth.load(guild.id)
+            legacy = await self.config.guild(guild).member_growth()
+            if legacy:
+                for iso, count in legacy:
+                    try:
+                        series.record(datetime.fromisoformat(iso).timestamp(), count)
+                    except (TypeError, ValueError):
+                        continue
+                await self.growth.flush()
+                await self.config.guild(guild).member_growth.clear()
+            return series
 
     async def red_delete_data_for_user(self, *, requester, user_id: int):
         # Remove user invite data for GDPR compliance
@@ -31,72 +77,86 @@ class Invites(commands.Cog):
             async with self.config.guild_from_id(guild_id).invites() as invites:
                 invites.pop(str(user_id), None)
 
+    async def _snapshot(self, guild) -> Dict[str, discord.Invite]:
+        return {invite.code: invite for invite in await guild.invites()}
+
     @commands.Cog.listener()
     async def on_ready(self):
         # Cache invites for all guilds
         for guild in self.bot.guilds:
             try:
-                self._cache[guild.id] = await guild.invites()
+                self._cache[guild.id] = await self._snapshot(guild)
             except Exception:
-                self._cache[guild.id] = []
+                self._cache[guild.id] = {}
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
         try:
-            self._cache[guild.id] = await guild.invites()
+            self._cache[guild.id] = await self._snapshot(guild)
         except Exception:
-            self._cache[guild.id] = []
+            self._cache[guild.id] = {}
 
     @commands.Cog.listener()
     async def on_invite_create(self, invite):
-        # Update cache when new invite is created
-        guild = invite.guild
-        try:
-            self._cache[guild.id] = await guild.invites()
-        except Exception:
-            pass
+        # Patch the cached snapshot instead of refetching every invite
+        if invite.guild is not None and invite.guild.id in self._cache:
+            self._cache[invite.guild.id][invite.code] = invite
 
     @commands.Cog.listener()
     async def on_invite_delete(self, invite):
-        # Update cache when invite is deleted
-        guild = invite.guild
-        try:
-            self._cache[guild.id] = await guild.invites()
-        except Exception:
-            pass
+        if invite.guild is not None and invite.guild.id in self._cache:
+            self._cache[invite.guild.id].pop(invite.code, None)
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
         guild = member.guild
+        pending = self._pending_joins.get(guild.id)
+        if pending is not None:
+            # A fetch for this guild is already scheduled, share it
+            pending.append(member)
+            return
+        self._pending_joins[guild.id] = [member]
+        await asyncio.sleep(JOIN_COALESCE_WINDOW)
+        members = self._pending_joins.pop(guild.id, [])
         try:
-            before = self._cache.get(guild.id, [])
-            after = await guild.invites()
+            before = self._cache.get(guild.id, {})
+            after = await self._snapshot(guild)
             self._cache[guild.id] = after
+        except Exception as e:
+            print(f"[Invites] Error fetching invites in {guild.id}: {e}")
+            return
 
-            used_invite = None
-            for old in before:
-                new = next((i for i in after if i.code == old.code), None)
-                if new and new.uses > old.uses:
-                    used_invite = new
-                    break
-
-            inviter = used_invite.inviter if used_invite else None
+        # One pass over the new snapshot, each used invite repeated once per new use
+        used_invites = []
+        for code, new in after.items():
+            old = before.get(code)
+            if old is not None and new.uses > old.uses:
+                used_invites.extend([new] * (new.uses - old.uses))
+
+        # Several invites used in the same window can't be told apart, so they are
+        # matched to the joins in order. A single invite (the usual raid case) is exact.
+        for index, member in enumerate(members):
+            used_invite = used_invites[index] if index < len(used_invites) else None
+            try:
+                await self._process_join(guild, member, used_invite)
+            except Exception as e:
+                print(f"[Invites] Error processing member join in {guild.id}: {e}")
 
-            # Ignore Disboard bot invites
-            if inviter and inviter.id == self.DISBOARD_BOT_ID:
-                return
+    async def _process_join(self, guild, member, used_invite):
+        inviter = used_invite.inviter if used_invite else None
 
-            if inviter:
-                await self._increment_invite(guild, inviter)
-                await self._announce_invite(guild, member, inviter)
-                await self._check_and_award_rewards(guild, inviter)
+        # Ignore Disboard bot invites
+        if inviter and inviter.id == self.DISBOARD_BOT_ID:
+            return
 
-            # Track member growth
-            async with self.config.guild(guild).member_growth() as growth:
-                growth.append((member.joined_at.isoformat(), guild.member_count))
+        if inviter:
+            await self._increment_invite(guild, inviter)
+            await self._announce_invite(guild, member, inviter)
+            await self._check_and_award_rewards(guild, inviter)
 
-        except Exception as e:
-            print(f"[Invites] Error processing member join in {guild.id}: {e}")
+        # Track member growth
+        series = await self._growth_series(guild)
+        series.record(member.joined_at.timestamp(), guild.member_count)
 
     async def _increment_invite(self, guild, inviter):
         async with self.config.guild(guild).invites() as invites:
@@ -261,29 +321,19 @@ class Invites(commands.Cog):
     @invites_group.command(name="chart")
     async def chart(self, ctx):
         """Show a chart of server member growth."""
-        growth = await self.config.guild(ctx.guild).member_growth()
-        if not growth or len(growth) < 2:
+        series = await self._growth_series(ctx.guild)
+        # Daily points, or finer ones while the server has less than two days of data
+        for tier in ("day", "hour", "minute"):
+            points = series.points(tier)
+            if len(points) >= 2:
+                break
+        else:
             await ctx.send("Not enough data to plot member growth.")
             return
 
-        # Summarize by day
-        daily = {}
-        for iso, count in growth:
-            day = iso.split("T")[0]
-            daily[day] = count
-        days = sorted(daily.keys())
-        counts = [daily[day] for day in days]
-
-        plt.figure(figsize=(8, 4))
-        plt.plot([datetime.strptime(d, "%Y-%m-%d") for d in days], counts, marker="o")
-        plt.title("Server Member Growth")
-        plt.xlabel("Date")
-        plt.ylabel("Member Count")
-        plt.tight_layout()
-        buf = io.BytesIO()
-        plt.savefig(buf, format="png")
-        plt.close()
-        buf.seek(0)
+        # Rendered off the event loop, and only redrawn once new joins change the series
+        image = await self.renderer.render((ctx.guild.id, tier), series.version, render_growth_chart, points)
+        buf = io.BytesIO(image)
         await ctx.send(file=discord.File(buf, filename="growth.png"))
 
     @invites_group.command(name="stats")
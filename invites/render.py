@@ -0,0 +1,75 @@
+import asyncio
+import io
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Hashable, List, Tuple
+
+from matplotlib.figure import Figure  # type: ignore
+
+RENDER_WORKERS = 2  # Images rendered at the same time
+RENDER_CACHE_SIZE = 64  # Rendered images kept, least recently used go first
+
+
+class ImageRenderer:
+    """
+    Renders images in a worker pool and caches them by key and data version.
+
+    Versions are increasing integers, such as a counter bumped whenever the
+    underlying data changes.
+
+    `render` takes any plain function returning image bytes, so the event loop
+    never waits on drawing, and the same key at the same version is only ever
+    drawn once. Concurrent requests for an image that is still being drawn
+    share that render. Render functions must not touch pyplot's global state,
+    build a `Figure` directly instead.
+    """
+
+    def __init__(self, workers: int = RENDER_WORKERS, cache_size: int = RENDER_CACHE_SIZE):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="invites-render")
+        self._cache_size = cache_size
+        # key -> (version, image bytes)
+        self._cache: "OrderedDict[Hashable, Tuple[int, bytes]]" = OrderedDict()
+        self._pending: Dict[Tuple[Hashable, int], asyncio.Future] = {}
+
+    async def render(self, key: Hashable, version: int, func: Callable[..., bytes], *args) -> bytes:
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == version:
+            self._cache.move_to_end(key)
+            return cached[1]
+        future = self._pending.get((key, version))
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, func, *args)
+            self._pending[(key, version)] = future
+            future.add_done_callback(lambda f: self._finish(key, version, f))
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Hashable, version: int, future: asyncio.Future) -> None:
+        self._pending.pop((key, version), None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        # a slower render of an older version never replaces a newer image
+        cached = self._cache.get(key)
+        if cached is None or cached[0] <= version:
+            self._cache[key] = (version, future.result())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+def render_growth_chart(points: List[Tuple[int, int]]) -> bytes:
+    """PNG of member count over time from (timestamp, member count) points."""
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    ax.plot([datetime.fromtimestamp(ts) for ts, _ in points], [count for _, count in points], marker="o")
+    ax.set_title("Server Member Growth")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Member Count")
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
@@ -2,14 +2,22 @@ import discord
 from redbot.core import commands, Config, checks
 from redbot.core.bot import Red
 from datetime import datetime, timedelta, timezone
+from collections import Counter, deque
+from time import monotonic
+from typing import Deque, Dict, List, Tuple
 import asyncio
+import csv
+import io
+
+ALERT_BATCH_WINDOW = 10  # Seconds flagged joins are collected for during a surge
+ALERT_SUMMARY_LINES = 15  # Members listed in a summary embed, the rest are in the CSV
 
 class JoinMonitor(commands.Cog):
     """
     Monitors user joins, applies alert criteria, and responds to join surges.
     """
 
-    __version__ = "1.0.0"
+    __version__ = "1.0.2"
 
     DEFAULT_GUILD = {
         "alerts_channel": None,
@@ -29,7 +37,6 @@ class JoinMonitor(commands.Cog):
         },
         "last_verification_level": None,
         "surge_active_until": None,
-        "join_timestamps": [],
     }
 
     def __init__(self, bot: Red):
@@ -37,10 +44,72 @@ class JoinMonitor(commands.Cog):
         self.config = Config.get_conf(self, identifier=0xAABBCCDD)
         self.config.register_guild(**self.DEFAULT_GUILD)
         self._surge_tasks = {}
+        # Settings snapshots keyed by guild id, dropped whenever a setting changes
+        self._settings: Dict[int, dict] = {}
+        # Monotonic times of the most recent joins per guild, at most `threshold` of them
+        self._join_windows: Dict[int, Deque[float]] = {}
+        # Timestamp each guild's surge ends, mirrors the persisted surge_active_until
+        self._surge_until: Dict[int, float] = {}
+        # Flagged joins waiting to be sent as one summary while a surge is active
+        self._alert_batches: Dict[int, List[Tuple[discord.Member, int, List[str]]]] = {}
+        self._alert_flush_tasks: Dict[int, asyncio.Task] = {}
+
+    async def cog_load(self):
+        self._resume_task = self.bot.loop.create_task(self._resume_surges())
 
     def cog_unload(self):
+        self._resume_task.cancel()
         for task in self._surge_tasks.values():
             task.cancel()
+        for task in self._alert_flush_tasks.values():
+            task.cancel()
+
+    async def _resume_surges(self):
+        """
+        Pick up surges that were active when the cog was unloaded.
+
+        Surges that ended while the bot was offline have their verification level
+        restored straight away, the rest are lowered once their cooldown runs out.
+        """
+        await self.bot.wait_until_ready()
+        now = datetime.now(timezone.utc).timestamp()
+        for guild_id, data in (await self.config.all_guilds()).items():
+            surge_active_until = data.get("surge_active_until")
+            guild = self.bot.get_guild(guild_id)
+            if not surge_active_until or guild is None:
+                continue
+            self._surge_until[guild_id] = surge_active_until
+            conf = self.config.guild(guild)
+            self._surge_tasks[guild_id] = self.bot.loop.create_task(
+                self._lower_verification_later(guild, conf, max(0, surge_active_until - now))
+            )
+
+    async def get_settings(self, guild: discord.Guild) -> dict:
+        settings = self._settings.get(guild.id)
+        if settings is None:
+            conf = self.config.guild(guild)
+            settings = {
+                "alerts_channel": await conf.alerts_channel(),
+                "alert_criteria": await conf.alert_criteria(),
+                "surge": await conf.surge(),
+            }
+            self._settings[guild.id] = settings
+        return settings
+
+    def record_join(self, guild: discord.Guild, threshold: int, interval: float) -> bool:
+        """
+        Record a join and return whether `threshold` joins happened within `interval` seconds.
+
+        Only the last `threshold` joins matter, so each guild keeps a ring buffer of
+        that size and a surge is when the oldest of them is still inside the interval.
+        """
+        window = self._join_windows.get(guild.id)
+        if window is None or window.maxlen != threshold:
+            window = deque(window or (), maxlen=max(threshold, 1))
+            self._join_windows[guild.id] = window
+        now = monotonic()
+        window.append(now)
+        return len(window) >= threshold and now - window[0] <= interval
 
     async def red_delete_data_for_user(self, *, requester, user_id: int):
         # No per-user data stored
@@ -74,6 +143,7 @@ class JoinMonitor(commands.Cog):
             `[p]joinmonitor alerts` (to clear)
         """
         await self.config.guild(ctx.guild).alerts_channel.set(channel.id if channel else None)
+        self._settings.pop(ctx.guild.id, None)
         if channel:
             await ctx.send(f"Alerts channel set to {channel.mention}.")
         else:
@@ -120,6 +190,7 @@ class JoinMonitor(commands.Cog):
                         continue
         current.update(updates)
         await self.config.guild(ctx.guild).alert_criteria.set(current)
+        self._settings.pop(ctx.guild.id, None)
         await ctx.send(f"Updated alert criteria: `{current}`")
 
     @joinmonitor.command()
@@ -166,6 +237,7 @@ class JoinMonitor(commands.Cog):
         if enabled is not None:
             surge["enabled"] = enabled
         await self.config.guild(ctx.guild).surge.set(surge)
+        self._settings.pop(ctx.guild.id, None)
         await ctx.send(f"Surge config updated: `{surge}`")
 
     @commands.Cog.listener()
@@ -178,22 +250,17 @@ class JoinMonitor(commands.Cog):
         """
         guild = member.guild
         conf = self.config.guild(guild)
-        alert_criteria = await conf.alert_criteria()
-        alerts_channel_id = await conf.alerts_channel()
-        surge_conf = await conf.surge()
-        join_timestamps = await conf.join_timestamps()
-
-        now = datetime.now(timezone.utc).timestamp()
-        join_timestamps.append(now)
-        # Keep only recent joins within the interval
-        interval = surge_conf.get("interval_seconds", 30)
-        join_timestamps = [ts for ts in join_timestamps if now - ts <= interval]
-        await conf.join_timestamps.set(join_timestamps)
+        settings = await self.get_settings(guild)
+        alert_criteria = settings["alert_criteria"]
+        alerts_channel_id = settings["alerts_channel"]
+        surge_conf = settings["surge"]
 
-        # Check for surge
+        # Check for surge, joins are only counted in memory
         if surge_conf.get("enabled", True):
             threshold = surge_conf.get("threshold", 5)
-            if len(join_timestamps) >= threshold:
+            interval = surge_conf.get("interval_seconds", 30)
+            if self.record_join(guild, threshold, interval):
+                now = datetime.now(timezone.utc).timestamp()
                 await self._handle_surge(guild, conf, surge_conf, now)
 
         # Evaluate alert criteria
@@ -239,25 +306,101 @@ class JoinMonitor(commands.Cog):
         if reasons and alerts_channel_id:
             channel = guild.get_channel(alerts_channel_id)
             if channel:
-                embed = discord.Embed(
-                    title="Suspicious account joined the server",
-                    description=f"{member.mention} (`{member.id}`) joined.",
-                    color=0xff9144,
-                    timestamp=datetime.now(timezone.utc)
-                )
-                embed.add_field(name="Flags", value="\n".join(reasons), inline=False)
-                embed.add_field(name="Account created", value=f"<t:{int(member.created_at.timestamp())}:F>")
-                embed.set_thumbnail(url=member.display_avatar.url if member.display_avatar else discord.Embed.Empty)
-                await channel.send(embed=embed)
+                if self._surge_until.get(guild.id, 0) > datetime.now(timezone.utc).timestamp():
+                    # Collect alerts during a surge so they don't compete with the surge response
+                    self.queue_alert(guild, channel, member, account_age, reasons)
+                else:
+                    await channel.send(embed=self._member_alert_embed(member, reasons))
+
+    def _member_alert_embed(self, member: discord.Member, reasons: List[str]) -> discord.Embed:
+        embed = discord.Embed(
+            title="Suspicious account joined the server",
+            description=f"{member.mention} (`{member.id}`) joined.",
+            color=0xff9144,
+            timestamp=datetime.now(timezone.utc)
+        )
+        embed.add_field(name="Flags", value="\n".join(reasons), inline=False)
+        embed.add_field(name="Account created", value=f"<t:{int(member.created_at.timestamp())}:F>")
+        embed.set_thumbnail(url=member.display_avatar.url if member.display_avatar else discord.Embed.Empty)
+        return embed
+
+    def queue_alert(self, guild, channel, member, account_age, reasons):
+        """
+        Add a flagged join to the guild's surge batch, starting a flush if none is pending.
+        """
+        self._alert_batches.setdefault(guild.id, []).append((member, account_age, reasons))
+        task = self._alert_flush_tasks.get(guild.id)
+        if task is None or task.done():
+            self._alert_flush_tasks[guild.id] = self.bot.loop.create_task(self._flush_alerts_later(guild, channel))
+
+    async def _flush_alerts_later(self, guild, channel):
+        """
+        Internal: Sends the flagged joins collected over the batch window as a single summary.
+        """
+        try:
+            await asyncio.sleep(ALERT_BATCH_WINDOW)
+        except asyncio.CancelledError:
+            # The cog is unloading, send what was collected instead of dropping it
+            self.bot.loop.create_task(self._send_alert_batch(guild, channel))
+            raise
+        await self._send_alert_batch(guild, channel)
+
+    async def _send_alert_batch(self, guild, channel):
+        """
+        Internal: Sends a guild's collected flagged joins, one embed for a single join or a summary with a CSV.
+        """
+        # Joins flagged while this batch is being sent start a new one
+        self._alert_flush_tasks.pop(guild.id, None)
+        batch = self._alert_batches.pop(guild.id, [])
+        if not batch:
+            return
+        try:
+            if len(batch) == 1:
+                member, _, reasons = batch[0]
+                await channel.send(embed=self._member_alert_embed(member, reasons))
+                return
+
+            # Tally by the kind of flag, "Account age: 1d < 3d" counts as "Account age"
+            flag_counts = Counter(reason.split(":", 1)[0] for _, _, reasons in batch for reason in reasons)
+            lines = [
+                f"{member.mention} (`{member.id}`) - {account_age}d old"
+                for member, account_age, _ in batch[:ALERT_SUMMARY_LINES]
+            ]
+            if len(batch) > ALERT_SUMMARY_LINES:
+                lines.append(f"...and {len(batch) - ALERT_SUMMARY_LINES} more, see the attached file.")
+            embed = discord.Embed(
+                title=f"{len(batch)} suspicious accounts joined during a surge",
+                description="\n".join(lines),
+                color=0xff9144,
+                timestamp=datetime.now(timezone.utc)
+            )
+            embed.add_field(
+                name="Flags",
+                value="\n".join(f"{flag}: {count}" for flag, count in flag_counts.most_common()),
+                inline=False
+            )
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(["user_id", "username", "account_created", "account_age_days", "reasons"])
+            for member, account_age, reasons in batch:
+                writer.writerow([member.id, str(member), member.created_at.isoformat(), account_age, "; ".join(reasons)])
+            file = discord.File(io.BytesIO(buffer.getvalue().encode("utf-8")), filename="suspicious_joins.csv")
+            await channel.send(embed=embed, file=file)
+        except discord.HTTPException:
+            pass
 
     async def _handle_surge(self, guild, conf, surge_conf, now_ts):
         """
         Internal: Handles raising the verification level during a join surge and notifying the alert channel.
         """
         # Only act if not already in surge
-        surge_active_until = await conf.surge_active_until()
+        surge_active_until = self._surge_until.get(guild.id)
         if surge_active_until and now_ts < surge_active_until:
             return
+        cooldown = surge_conf.get("cooldown_seconds", 300)
+        # Claim the surge before awaiting so joins arriving meanwhile don't handle it again
+        self._surge_until[guild.id] = now_ts + cooldown
         # Save current verification level
         try:
             current_level = guild.verification_level
@@ -268,9 +411,9 @@ class JoinMonitor(commands.Cog):
             if current_level != new_level:
                 await guild.edit(verification_level=new_level, reason="JoinMonitor: Surge detected")
         except Exception:
+            self._surge_until.pop(guild.id, None)
             return  # Insufficient permissions or error
 
-        cooldown = surge_conf.get("cooldown_seconds", 300)
         await conf.surge_active_until.set(now_ts + cooldown)
         # Schedule lowering verification level
         if guild.id in self._surge_tasks:
@@ -278,7 +421,7 @@ class JoinMonitor(commands.Cog):
         self._surge_tasks[guild.id] = self.bot.loop.create_task(self._lower_verification_later(guild, conf, cooldown))
 
         # Alert channel
-        alerts_channel_id = await conf.alerts_channel()
+        alerts_channel_id = (await self.get_settings(guild))["alerts_channel"]
         if alerts_channel_id:
             channel = guild.get_channel(alerts_channel_id)
             if channel:
@@ -300,8 +443,9 @@ class JoinMonitor(commands.Cog):
                 except Exception:
                     pass
             await conf.surge_active_until.set(None)
+            self._surge_until.pop(guild.id, None)
             # Alert channel
-            alerts_channel_id = await conf.alerts_channel()
+            alerts_channel_id = (await self.get_settings(guild))["alerts_channel"]
             if alerts_channel_id:
                 channel = guild.get_channel(alerts_channel_id)
                 if channel:
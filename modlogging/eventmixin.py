@@ -1,8 +1,13 @@
 import asyncio
 import datetime
+import gzip
+import html
+import random
+import tempfile
 from collections import deque
 from enum import Enum
-from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple, Union, cast
+from time import monotonic
+from typing import Any, Deque, Dict, List, Optional, Sequence, Set, Tuple, Union, cast
 
 import discord # type: ignore
 from discord.ext import tasks # type: ignore
@@ -20,9 +25,20 @@ from redbot.core.utils.chat_formatting import ( # type: ignore
     pagify,
 )
 
+from .stats import ListenerStats, current_sample, instrumented
+
 _ = i18n.Translator("Logging", __file__)
 logger = getLogger("red.beehive-cogs.Logging")
 
+# seconds between invite snapshot passes
+INVITE_LOOP_INTERVAL = 300
+# how many `guild.invites()` requests may be in flight at once
+INVITE_LOOP_CONCURRENCY = 5
+# refetch a guilds invites at least this often even without invite events
+INVITE_SNAPSHOT_MAX_AGE = 3600
+# bulk delete transcripts are kept in memory up to this size before spilling to disk
+BULK_TRANSCRIPT_SPOOL_SIZE = 1024 * 1024
+
 
 class MemberUpdateEnum(Enum):
     # map config keys to member attributes
@@ -111,6 +127,62 @@ class EventChooser(Converter):
         return result
 
 
+def compress_bulk_transcript(
+    messages: Sequence[discord.Message],
+    channel: Union[discord.abc.GuildChannel, discord.Thread],
+    extension: str = "txt",
+) -> tempfile.SpooledTemporaryFile:
+    """
+    Gzip a bulk delete transcript into a file rewound to the start, run in an executor.
+    """
+    fp = tempfile.SpooledTemporaryFile(max_size=BULK_TRANSCRIPT_SPOOL_SIZE)
+    with gzip.GzipFile(fileobj=fp, mode="wb") as archive:
+        for line in render_bulk_transcript(messages, channel, extension):
+            archive.write(line.encode("utf-8"))
+    fp.seek(0)
+    return fp
+
+
+def render_bulk_transcript(
+    messages: Sequence[discord.Message],
+    channel: Union[discord.abc.GuildChannel, discord.Thread],
+    extension: str = "txt",
+):
+    """
+    Yield a transcript of the deleted messages one chunk at a time.
+
+    This is a generator so large purges are written straight into the archive
+    without building the whole transcript in memory first.
+    """
+    html_mode = extension == "html"
+    if html_mode:
+        yield (
+            "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+            f"<title>#{html.escape(str(channel))}</title></head><body>"
+            f"<h1>#{html.escape(str(channel))} ({channel.id})</h1><table>"
+            "<tr><th>Time</th><th>Author</th><th>Message</th></tr>\n"
+        )
+    else:
+        yield f"Bulk delete in #{channel} ({channel.id})\n\n"
+    for message in messages:
+        created = message.created_at.strftime("%Y-%m-%d %H:%M:%S UTC")
+        author = f"{message.author} ({message.author.id})"
+        files = [a.url for a in message.attachments]
+        if html_mode:
+            content = html.escape(message.content).replace("\n", "<br>")
+            for url in files:
+                content += f'<br><a href="{html.escape(url)}">{html.escape(url)}</a>'
+            yield (
+                f"<tr><td>{created}</td><td>{html.escape(author)}</td><td>{content}</td></tr>\n"
+            )
+        else:
+            yield f"[{created}] {author}: {message.content}\n"
+            for url in files:
+                yield f"    Attachment: {url}\n"
+    if html_mode:
+        yield "</table></body></html>\n"
+
+
 class EventMixin:
     """
     Handles all the on_event data
@@ -122,6 +194,10 @@ class EventMixin:
     _ban_cache: Dict[int, List[int]]
     allowed_mentions: discord.AllowedMentions
     audit_log: Dict[int, Deque[discord.AuditLogEntry]]
+    _invite_dirty: Set[int]
+    _invite_snapshot_times: Dict[int, float]
+    _invite_loop_stats: Dict[str, float]
+    listener_stats: ListenerStats
 
     async def get_event_colour(
         self, guild: discord.Guild, event_type: str, changed_object: Optional[discord.Role] = None
@@ -195,6 +271,7 @@ class EventMixin:
         return channel
 
     @commands.Cog.listener()
+    @instrumented("command")
     async def on_command(self, ctx: commands.Context) -> None:
         guild = ctx.guild
         if guild is None:
@@ -341,7 +418,7 @@ class EventMixin:
             embed.add_field(name=_("User needs"), value=role)
             if i_require:
                 embed.add_field(name=_("Bot needs"), value=i_require)
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
             infomessage = _(
                 "{emoji} {time} {author}(`{a_id}`) used the following command in {channel}\n> {com}"
@@ -353,9 +430,12 @@ class EventMixin:
                 channel=message.channel.mention,
                 com=com_str,
             )
-            await channel.send(infomessage[:2000], allowed_mentions=self.allowed_mentions)
+            await self.send_log(
+                channel, infomessage[:2000], allowed_mentions=self.allowed_mentions
+            )
 
     @commands.Cog.listener(name="on_raw_message_delete")
+    @instrumented("raw_message_delete")
     async def on_raw_message_delete_listener(
         self, payload: discord.RawMessageDeleteEvent, *, check_audit_log: bool = True
     ) -> None:
@@ -404,7 +484,7 @@ class EventMixin:
                 )
                 embed.add_field(name=_("Channel"), value=message_channel.mention)
                 embed.add_field(name=_("Message ID"), value=box(str(payload.message_id)))
-                await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+                await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
             else:
                 infomessage = _(
                     "{emoji} {time} A message ({message_id}) was deleted in {channel}"
@@ -414,7 +494,8 @@ class EventMixin:
                     message_id=box(str(payload.message_id)),
                     channel=message_channel.mention,
                 )
-                await channel.send(
+                await self.send_log(
+                    channel,
                     f"{infomessage}\n> *Message's content unknown.*",
                     allowed_mentions=self.allowed_mentions,
                 )
@@ -511,14 +592,16 @@ class EventMixin:
             if replying:
                 embed.add_field(name=_("Replying to:"), value=replying)
 
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
             clean_msg = message.clean_content[: (1990 - len(infomessage))]
-            await channel.send(
+            await self.send_log(
+                channel,
                 f"{infomessage}\n>>> {clean_msg}", allowed_mentions=self.allowed_mentions
             )
 
     @commands.Cog.listener()
+    @instrumented("raw_bulk_message_delete")
     async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
         guild_id = payload.guild_id
         if guild_id is None:
@@ -552,6 +635,13 @@ class EventMixin:
         await i18n.set_contextual_locales_from_guild(self.bot, guild)
         # set guild level i18n
         message_amount = len(payload.message_ids)
+        transcript_format = settings.get("bulk_transcript")
+        if transcript_format and payload.cached_messages:
+            # The transcript post carries the summary, so there is no separate header
+            if await self._send_bulk_transcript(
+                payload, guild, message_channel, channel, transcript_format, embed_links
+            ):
+                return
         if embed_links:
             embed = discord.Embed(
                 title="Messages deleted in bulk",
@@ -561,17 +651,10 @@ class EventMixin:
             )
             embed.add_field(name=_("Channel"), value=message_channel.mention)
             embed.add_field(name=_("Messages deleted"), value=str(message_amount))
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            infomessage = _(
-                "{emoji} {time} Bulk message delete in {channel}, {amount} messages deleted."
-            ).format(
-                emoji=settings["emoji"],
-                time=datetime.datetime.now(datetime.timezone.utc).strftime("%H:%M:%S"),
-                amount=message_amount,
-                channel=message_channel.mention,
-            )
-            await channel.send(infomessage, allowed_mentions=self.allowed_mentions)
+            infomessage = self._bulk_delete_infomessage(settings, message_channel, message_amount)
+            await self.send_log(channel, infomessage, allowed_mentions=self.allowed_mentions)
         if settings["bulk_individual"]:
             for message in payload.cached_messages:
                 new_payload = discord.RawMessageDeleteEvent(
@@ -583,15 +666,169 @@ class EventMixin:
                 except Exception:
                     pass
 
-    @tasks.loop(seconds=300)
+    @staticmethod
+    def _bulk_delete_infomessage(
+        settings: dict,
+        message_channel: Union[discord.abc.GuildChannel, discord.Thread],
+        message_amount: int,
+    ) -> str:
+        return _(
+            "{emoji} {time} Bulk message delete in {channel}, {amount} messages deleted."
+        ).format(
+            emoji=settings["emoji"],
+            time=datetime.datetime.now(datetime.timezone.utc).strftime("%H:%M:%S"),
+            amount=message_amount,
+            channel=message_channel.mention,
+        )
+
+    async def _send_bulk_transcript(
+        self,
+        payload: discord.RawBulkMessageDeleteEvent,
+        guild: discord.Guild,
+        message_channel: Union[discord.abc.GuildChannel, discord.Thread],
+        channel: discord.TextChannel,
+        transcript_format: str,
+        embed_links: bool,
+    ) -> bool:
+        """
+        Log a bulk delete as one post with its summary and every cached message
+        archived into a compressed attachment.
+
+        Returns whether it was posted, so the caller can fall back to the plain
+        bulk delete log.
+        """
+        if not channel.permissions_for(guild.me).attach_files:
+            logger.warning(
+                "Missing attach files permission in %s for bulk delete transcripts in guild %s",
+                channel.id,
+                guild.id,
+            )
+            return False
+        messages = sorted(payload.cached_messages, key=lambda m: m.id)
+        authors = {m.author.id for m in messages}
+        attachments = sum(len(m.attachments) for m in messages)
+        extension = "html" if transcript_format == "html" else "txt"
+        # Compressing a large purge takes long enough to stall the event loop
+        fp = await asyncio.get_running_loop().run_in_executor(
+            None, compress_bulk_transcript, messages, message_channel, extension
+        )
+        filename = f"bulk-delete-{message_channel.id}-{messages[-1].id}.{extension}.gz"
+        file = discord.File(fp, filename=filename)
+        summary = _(
+            "{cached}/{total} messages archived from {authors} authors, {attachments} attachments."
+        ).format(
+            cached=len(messages),
+            total=len(payload.message_ids),
+            authors=len(authors),
+            attachments=attachments,
+        )
+        try:
+            if embed_links:
+                embed = discord.Embed(
+                    title=_("Messages deleted in bulk"),
+                    description=summary,
+                    colour=await self.get_event_colour(guild, "message_delete"),
+                    timestamp=datetime.datetime.now(datetime.timezone.utc),
+                )
+                embed.add_field(name=_("Channel"), value=message_channel.mention)
+                embed.add_field(name=_("Messages deleted"), value=str(len(payload.message_ids)))
+                await self.send_log(
+                    channel, embed=embed, file=file, allowed_mentions=self.allowed_mentions
+                )
+            else:
+                infomessage = self._bulk_delete_infomessage(
+                    self.settings[guild.id]["message_delete"],
+                    message_channel,
+                    len(payload.message_ids),
+                )
+                await self.send_log(
+                    channel,
+                    f"{infomessage}\n{summary}",
+                    file=file,
+                    allowed_mentions=self.allowed_mentions,
+                )
+        except discord.HTTPException:
+            logger.exception("Error sending bulk delete transcript in guild %s", guild.id)
+            return False
+        finally:
+            fp.close()
+        return True
+
+    @tasks.loop(seconds=INVITE_LOOP_INTERVAL)
     async def invite_links_loop(self) -> None:
-        """Check every 5 minutes for updates to the invite links"""
-        for guild_id in self.settings.keys():
+        """
+        Refresh the stored invite links every 5 minutes.
+
+        Guilds are spread evenly across the interval with a little jitter so the
+        `guild.invites()` calls don't go out in one burst, and at most
+        `INVITE_LOOP_CONCURRENCY` fetches are in flight at once. Guilds whose
+        invites have not changed according to the gateway events are skipped
+        until their snapshot becomes stale.
+        """
+        start = monotonic()
+        now = datetime.datetime.now(datetime.timezone.utc).timestamp()
+        guilds = []
+        skipped = 0
+        for guild_id in list(self.settings.keys()):
             guild = self.bot.get_guild(guild_id)
             if guild is None:
                 continue
-            if self.settings[guild_id]["user_join"]["enabled"]:
-                await self.save_invite_links(guild)
+            if not self.settings[guild_id]["user_join"]["enabled"]:
+                continue
+            shard = self.bot.get_shard(guild.shard_id)
+            if shard is not None and shard.is_closed():
+                # the shard is reconnecting, our view of this guild may be stale
+                skipped += 1
+                continue
+            last_saved = self._invite_snapshot_times.get(guild_id)
+            if (
+                guild_id not in self._invite_dirty
+                and last_saved is not None
+                and now - last_saved < INVITE_SNAPSHOT_MAX_AGE
+            ):
+                skipped += 1
+                continue
+            guilds.append(guild)
+        # keep each shards guilds together so one shard is worked through at a time
+        guilds.sort(key=lambda g: (g.shard_id or 0, g.id))
+
+        semaphore = asyncio.Semaphore(INVITE_LOOP_CONCURRENCY)
+
+        async def _snapshot(guild: discord.Guild) -> bool:
+            async with semaphore:
+                return await self.save_invite_links(guild)
+
+        tasks_: List[asyncio.Task] = []
+        if guilds:
+            slot = (INVITE_LOOP_INTERVAL * 0.9) / len(guilds)
+            for index, guild in enumerate(guilds):
+                due = start + index * slot + random.uniform(0, slot)
+                delay = due - monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks_.append(asyncio.create_task(_snapshot(guild)))
+        results = await asyncio.gather(*tasks_, return_exceptions=True)
+        duration = monotonic() - start
+        self._invite_loop_stats = {
+            "duration": duration,
+            "fetched": sum(1 for r in results if r is True),
+            "failed": sum(1 for r in results if r is not True),
+            "skipped": skipped,
+            "finished": datetime.datetime.now(datetime.timezone.utc).timestamp(),
+        }
+        logger.debug(
+            "Invite snapshot pass took %.2fs (%s fetched, %s failed, %s skipped)",
+            duration,
+            self._invite_loop_stats["fetched"],
+            self._invite_loop_stats["failed"],
+            skipped,
+        )
+        if duration > INVITE_LOOP_INTERVAL:
+            logger.warning(
+                "Invite snapshot pass took %.2fs which is longer than the %ss interval",
+                duration,
+                INVITE_LOOP_INTERVAL,
+            )
 
     @invite_links_loop.before_loop
     async def before_invite_loop(self):
@@ -624,8 +861,15 @@ class EventMixin:
             logger.exception("Error saving invites for guild %s.", guild.id)
             return False
 
+        self._invite_dirty.discard(guild.id)
+        self._invite_snapshot_times[guild.id] = datetime.datetime.now(
+            datetime.timezone.utc
+        ).timestamp()
+        if invites == self.settings[guild.id]["invite_links"]:
+            # nothing changed so there's no reason to write the settings back
+            return True
         self.settings[guild.id]["invite_links"] = invites
-        await self.save(guild)
+        await self.config.guild(guild).invite_links.set(invites)
         return True
 
     async def get_invite_link(self, member: discord.Member) -> str:
@@ -702,6 +946,7 @@ class EventMixin:
         return possible_link
 
     @commands.Cog.listener()
+    @instrumented("member_join")
     async def on_member_join(self, member: discord.Member):
         guild = member.guild
         if guild.id not in self.settings:
@@ -744,7 +989,7 @@ class EventMixin:
             if possible_link:
                 embed.add_field(name=_("Invite used"), value=possible_link, inline=False)
             embed.set_thumbnail(url=member.display_avatar)
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
             time = datetime.datetime.now(datetime.timezone.utc)
             msg = _(
@@ -756,9 +1001,10 @@ class EventMixin:
                 m_id=member.id,
                 users=users,
             )
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("member_ban")
     async def on_member_ban(self, guild: discord.Guild, member: discord.Member):
         """
         This is only used to track that the user was banned and not kicked/removed
@@ -769,6 +1015,7 @@ class EventMixin:
             self._ban_cache[guild.id].append(member.id)
 
     @commands.Cog.listener()
+    @instrumented("member_remove")
     async def on_member_remove(self, member: discord.Member):
         guild = member.guild
         await asyncio.sleep(5)
@@ -821,7 +1068,7 @@ class EventMixin:
             if reason:
                 embed.add_field(name=_("Reason"), value=str(reason), inline=False)
             embed.set_thumbnail(url=member.display_avatar)
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
             time = datetime.datetime.now(datetime.timezone.utc)
             msg = _(
@@ -845,7 +1092,7 @@ class EventMixin:
                     perp=perp,
                     users=len(guild.members),
                 )
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     async def get_permission_change(
         self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel, embed_links: bool
@@ -926,6 +1173,7 @@ class EventMixin:
         return p_msg
 
     @commands.Cog.listener()
+    @instrumented("guild_channel_create")
     async def on_guild_channel_create(self, new_channel: discord.abc.GuildChannel) -> None:
         guild = new_channel.guild
         if guild.id not in self.settings:
@@ -980,11 +1228,12 @@ class EventMixin:
             channel=new_channel.mention,
         )
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("guild_channel_delete")
     async def on_guild_channel_delete(self, old_channel: discord.abc.GuildChannel):
         guild = old_channel.guild
         if guild.id not in self.settings:
@@ -1042,11 +1291,12 @@ class EventMixin:
             channel=f"#{old_channel.name} ({old_channel.id})",
         )
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("audit_log_entry_create")
     async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
         if entry.guild.id not in self.audit_log:
             self.audit_log[entry.guild.id] = deque(maxlen=10)
@@ -1077,6 +1327,7 @@ class EventMixin:
             target_id = target.id
 
         if guild.me.guild_permissions.view_audit_log:
+            start = monotonic()
             await asyncio.sleep(5)
             # wait 5 seconds incase the audit log entry is slow and we prioritize the cache
             if guild.id in self.audit_log:
@@ -1105,9 +1356,29 @@ class EventMixin:
                     if target_id == getattr(log.target, "code", None):
                         logger.trace("Found invite code entry through fetch")
                         entry = log
+            sample = current_sample.get()
+            if sample is not None:
+                sample.audit_log += monotonic() - start
         return entry
 
+    async def send_log(
+        self, channel: discord.TextChannel, *args, **kwargs
+    ) -> discord.Message:
+        """
+        Send a log message, recording how long it took when stats are enabled.
+        """
+        sample = current_sample.get()
+        if sample is None:
+            return await channel.send(*args, **kwargs)
+        start = monotonic()
+        try:
+            return await channel.send(*args, **kwargs)
+        finally:
+            sample.sent_at = monotonic()
+            sample.send += sample.sent_at - start
+
     @commands.Cog.listener()
+    @instrumented("guild_channel_update")
     async def on_guild_channel_update(
         self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel
     ) -> None:
@@ -1217,9 +1488,9 @@ class EventMixin:
         if not worth_updating:
             return
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     async def get_role_permission_change(self, before: discord.Role, after: discord.Role) -> str:
         p_msg = ""
@@ -1232,6 +1503,7 @@ class EventMixin:
         return p_msg
 
     @commands.Cog.listener()
+    @instrumented("guild_role_update")
     async def on_guild_role_update(self, before: discord.Role, after: discord.Role) -> None:
         guild = before.guild
         if guild.id not in self.settings:
@@ -1326,11 +1598,12 @@ class EventMixin:
         if not worth_updating:
             return
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("guild_role_create")
     async def on_guild_role_create(self, role: discord.Role) -> None:
         guild = role.guild
         if guild.id not in self.settings:
@@ -1401,11 +1674,12 @@ class EventMixin:
             msg += _("Reason ") + str(reason) + "\n"
 
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("guild_role_delete")
     async def on_guild_role_delete(self, role: discord.Role) -> None:
         guild = role.guild
         if guild.id not in self.settings:
@@ -1476,11 +1750,12 @@ class EventMixin:
             msg += _("Reason ") + str(reason) + "\n"
 
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("message_edit")
     async def on_message_edit(self, before: discord.Message, after: discord.Message) -> None:
         guild = before.guild
         if guild is None:
@@ -1551,7 +1826,7 @@ class EventMixin:
                 ),
                 icon_url=str(before.author.display_avatar),
             )
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
             msg = _(
                 "{emoji} {time} **{author}** (`{a_id}`) edited a message "
@@ -1565,9 +1840,10 @@ class EventMixin:
                 before=before.content,
                 after=after.jump_url,
             )
-            await channel.send(msg[:2000], allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg[:2000], allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("guild_update")
     async def on_guild_update(self, before: discord.Guild, after: discord.Guild) -> None:
         guild = after
         if guild.id not in self.settings:
@@ -1696,11 +1972,12 @@ class EventMixin:
             )
             if guild.icon:
                 embed.set_thumbnail(url=guild.icon)
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("guild_emojis_update")
     async def on_guild_emojis_update(
         self, guild: discord.Guild, before: Sequence[discord.Emoji], after: Sequence[discord.Emoji]
     ) -> None:
@@ -1889,11 +2166,12 @@ class EventMixin:
             )
             msg += _("\nReason ") + str(reason)
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("voice_state_update")
     async def on_voice_state_update(
         self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState
     ) -> None:
@@ -2011,11 +2289,12 @@ class EventMixin:
             msg += _("Reason ") + reason + "\n"
             embed.add_field(name=_("Reason "), value=reason, inline=False)
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("member_update")
     async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
         guild = before.guild
         if guild.id not in self.settings:
@@ -2154,11 +2433,12 @@ class EventMixin:
             embed.add_field(name=_("Reason"), value=reason, inline=False)
         embed.add_field(name=_("Member ID"), value=box(str(after.id)))
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("invite_create")
     async def on_invite_create(self, invite: discord.Invite) -> None:
         """
         New in discord.py 1.3
@@ -2255,11 +2535,12 @@ class EventMixin:
         if not worth_updating:
             return
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("invite_delete")
     async def on_invite_delete(self, invite: discord.Invite) -> None:
         """
         New in discord.py 1.3
@@ -2273,6 +2554,8 @@ class EventMixin:
             return
         if await self.bot.cog_disabled_in_guild(self, guild):
             return
+        # the stored snapshot no longer matches, let the next pass refetch it
+        self._invite_dirty.add(guild.id)
         if guild.me.is_timed_out():
             return
         if not self.settings[guild.id]["invite_deleted"]["enabled"]:
@@ -2349,11 +2632,12 @@ class EventMixin:
         if not worth_updating:
             return
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("thread_create")
     async def on_thread_create(self, thread: discord.Thread) -> None:
         guild = thread.guild
         if guild.id not in self.settings:
@@ -2413,11 +2697,12 @@ class EventMixin:
             channel=thread.mention,
         )
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("raw_thread_delete")
     async def on_raw_thread_delete(self, payload: discord.RawThreadDeleteEvent):
         guild = self.bot.get_guild(payload.guild_id)
         if guild is None:
@@ -2486,11 +2771,12 @@ class EventMixin:
             channel=f"#{description} ({payload.thread_id})",
         )
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("thread_update")
     async def on_thread_update(self, before: discord.Thread, after: discord.Thread) -> None:
         guild = before.guild
         if guild.id not in self.settings:
@@ -2584,11 +2870,12 @@ class EventMixin:
         if not worth_updating:
             return
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
 
     @commands.Cog.listener()
+    @instrumented("guild_stickers_update")
     async def on_guild_stickers_update(
         self, guild: discord.Guild, before: Sequence[discord.Emoji], after: Sequence[discord.Emoji]
     ) -> None:
@@ -2728,6 +3015,6 @@ class EventMixin:
             msg += _("Reason ") + reason + "\n"
             embed.add_field(name=_("Reason "), value=reason, inline=False)
         if embed_links:
-            await channel.send(embed=embed, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, embed=embed, allowed_mentions=self.allowed_mentions)
         else:
-            await channel.send(msg, allowed_mentions=self.allowed_mentions)
+            await self.send_log(channel, msg, allowed_mentions=self.allowed_mentions)
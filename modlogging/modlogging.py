@@ -1,3 +1,5 @@
+import io
+import json
 from collections import deque
 from typing import Deque, Dict, Union
 
@@ -5,10 +7,11 @@ import discord # type: ignore
 from red_commons.logging import getLogger # type: ignore
 from redbot.core import Config, checks, commands, modlog # type: ignore
 from redbot.core.i18n import Translator, cog_i18n # type: ignore
-from redbot.core.utils.chat_formatting import humanize_list # type: ignore
+from redbot.core.utils.chat_formatting import box, humanize_list, pagify # type: ignore
 
 from .eventmixin import CommandPrivs, EventChooser, EventMixin, MemberUpdateEnum
 from .settings import inv_settings
+from .stats import ListenerStats
 
 _ = Translator("ModLogging", __file__)
 logger = getLogger("red.beehive-cogs.ModLogging")
@@ -69,9 +72,13 @@ class ModLogging(EventMixin, commands.Cog):
         self.bot = bot
         self.config = Config.get_conf(self, 154457677895, force_registration=True)
         self.config.register_guild(**inv_settings)
-        self.config.register_global(version="0.0.0")
+        self.config.register_global(version="0.0.0", listener_stats=False)
         self.settings = {}
         self._ban_cache = {}
+        self._invite_dirty = set()
+        self._invite_snapshot_times = {}
+        self._invite_loop_stats = {}
+        self.listener_stats = ListenerStats()
         self.invite_links_loop.start()
         self.allowed_mentions = discord.AllowedMentions(users=False, roles=False, everyone=False)
         self.audit_log: Dict[int, Deque[discord.AuditLogEntry]] = {}
@@ -95,6 +102,7 @@ class ModLogging(EventMixin, commands.Cog):
     async def cog_load(self) -> None:
         if await self.config.version() < "2.8.5":
             await self.migrate_2_8_5_settings()
+        self.listener_stats.enabled = await self.config.listener_stats()
         for guild_id in await self.config.all_guilds():
             self.settings[int(guild_id)] = await self.config.guild_from_id(guild_id).all()
 
@@ -447,6 +455,35 @@ class ModLogging(EventMixin, commands.Cog):
         await self.save(ctx.guild)
         await ctx.send(msg.format(enabled_or_disabled=verb))
 
+    @_delete.command(name="transcript")
+    async def _delete_bulk_transcript(
+        self, ctx: commands.Context, transcript_format: str = "off"
+    ) -> None:
+        """
+        Archive bulk deleted messages into a single compressed transcript.
+
+        This replaces individual message delete logs for bulk deletes with one
+        log post and an attached transcript of every cached message.
+
+        - `[transcript_format]` One of `text`, `html` or `off`.
+        """
+        transcript_format = transcript_format.lower()
+        if transcript_format not in ("text", "txt", "html", "off"):
+            return await ctx.send_help()
+        if ctx.guild.id not in self.settings:
+            self.settings[ctx.guild.id] = await self.config.guild(ctx.guild).all()
+        if transcript_format == "off":
+            self.settings[ctx.guild.id]["message_delete"]["bulk_transcript"] = None
+            msg = _("Bulk message delete transcripts disabled.")
+        else:
+            new_format = "html" if transcript_format == "html" else "txt"
+            self.settings[ctx.guild.id]["message_delete"]["bulk_transcript"] = new_format
+            msg = _("Bulk message deletes will be archived as {format} transcripts.").format(
+                format=new_format
+            )
+        await self.save(ctx.guild)
+        await ctx.send(msg)
+
     @_delete.command(name="cachedonly")
     async def _delete_cachedonly(self, ctx: commands.Context) -> None:
         """
@@ -801,3 +838,73 @@ class ModLogging(EventMixin, commands.Cog):
             await ctx.send(_("Bots will no longer be tracked in voice update logs."))
         else:
             await ctx.send(_("Bots will be tracked in voice update logs."))
+
+    @_logging.group(name="stats", invoke_without_command=True)
+    @commands.is_owner()
+    async def _logging_stats(self, ctx: commands.Context) -> None:
+        """
+        Show listener latency percentiles per event type.
+
+        Stats are only collected after being enabled with `[p]logging stats toggle`.
+        """
+        snapshot = self.listener_stats.snapshot()
+        if not snapshot["events"]:
+            if not self.listener_stats.enabled:
+                return await ctx.send(
+                    _(
+                        "Listener stats are disabled. "
+                        "Enable them with `{prefix}logging stats toggle`."
+                    ).format(prefix=ctx.clean_prefix)
+                )
+            return await ctx.send(_("No events have been recorded yet."))
+        rows = []
+        for name, data in snapshot["events"].items():
+            audit = data["audit_log"]
+            send = data["send"]
+            e2e = data["end_to_end"]
+            rows.append(
+                f"{name[:24]:<24} {data['calls']:>7} {data['errors']:>4} "
+                f"{audit['p50']:>6.2f} {audit['p95']:>6.2f} {audit['p99']:>6.2f} "
+                f"{send['p50']:>6.2f} {send['p95']:>6.2f} {send['p99']:>6.2f} "
+                f"{e2e['p50']:>6.2f} {e2e['p95']:>6.2f} {e2e['p99']:>6.2f}"
+            )
+        header = (
+            f"{'event':<24} {'calls':>7} {'err':>4} "
+            f"{'aud50':>6} {'aud95':>6} {'aud99':>6} "
+            f"{'snd50':>6} {'snd95':>6} {'snd99':>6} "
+            f"{'e2e50':>6} {'e2e95':>6} {'e2e99':>6}"
+        )
+        msg = header + "\n" + "\n".join(rows)
+        for page in pagify(msg, page_length=1900):
+            await ctx.send(box(page))
+
+    @_logging_stats.command(name="toggle")
+    async def _logging_stats_toggle(self, ctx: commands.Context) -> None:
+        """
+        Toggle collecting listener latency stats.
+        """
+        enabled = not self.listener_stats.enabled
+        self.listener_stats.enabled = enabled
+        await self.config.listener_stats.set(enabled)
+        if enabled:
+            await ctx.send(_("Listener stats will now be collected."))
+        else:
+            await ctx.send(_("Listener stats will no longer be collected."))
+
+    @_logging_stats.command(name="export")
+    async def _logging_stats_export(self, ctx: commands.Context) -> None:
+        """
+        Export the current listener stats as JSON.
+        """
+        snapshot = self.listener_stats.snapshot()
+        snapshot["invite_loop"] = self._invite_loop_stats
+        fp = io.BytesIO(json.dumps(snapshot, indent=2).encode("utf-8"))
+        await ctx.send(file=discord.File(fp, filename="modlogging-stats.json"))
+
+    @_logging_stats.command(name="reset")
+    async def _logging_stats_reset(self, ctx: commands.Context) -> None:
+        """
+        Reset the collected listener stats.
+        """
+        self.listener_stats.reset()
+        await ctx.send(_("Listener stats have been reset."))
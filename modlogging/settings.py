@@ -14,6 +14,7 @@ inv_settings = {
         "ignore_commands": False,
         "bulk_enabled": False,
         "bulk_individual": False,
+        "bulk_transcript": None,
         "cached_only": False,
         "colour": None,
         "emoji": "\N{WASTEBASKET}\N{VARIATION SELECTOR-16}",
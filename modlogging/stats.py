@@ -0,0 +1,165 @@
+import functools
+from contextvars import ContextVar
+from math import inf
+from time import monotonic
+from typing import Any, Dict, List, Optional
+
+# upper bounds in seconds for each histogram bucket
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, inf)
+
+
+class Histogram:
+    """
+    A fixed bucket latency histogram.
+
+    Percentiles are estimated as the upper bound of the bucket they fall in
+    which keeps memory constant no matter how many samples are recorded.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, bound in enumerate(BUCKETS):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": {str(b): c for b, c in zip(BUCKETS, self.counts)},
+        }
+
+
+class Sample:
+    """
+    Timing information collected during a single listener call.
+    """
+
+    __slots__ = ("start", "audit_log", "send", "sent_at")
+
+    def __init__(self):
+        self.start = monotonic()
+        self.audit_log = 0.0
+        self.send = 0.0
+        self.sent_at: Optional[float] = None
+
+
+class EventStats:
+    __slots__ = ("calls", "errors", "audit_log", "send", "duration", "end_to_end")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.audit_log = Histogram()
+        self.send = Histogram()
+        self.duration = Histogram()
+        self.end_to_end = Histogram()
+
+    def record(self, sample: Sample, failed: bool) -> None:
+        self.calls += 1
+        if failed:
+            self.errors += 1
+        self.duration.observe(monotonic() - sample.start)
+        if sample.audit_log:
+            self.audit_log.observe(sample.audit_log)
+        if sample.sent_at is not None:
+            self.send.observe(sample.send)
+            self.end_to_end.observe(sample.sent_at - sample.start)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "audit_log": self.audit_log.to_dict(),
+            "send": self.send.to_dict(),
+            "duration": self.duration.to_dict(),
+            "end_to_end": self.end_to_end.to_dict(),
+        }
+
+
+class ListenerStats:
+    """
+    Opt-in per event type latency tracking for the logging listeners.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started = monotonic()
+        self.events: Dict[str, EventStats] = {}
+
+    def record(self, event: str, sample: Sample, failed: bool) -> None:
+        if event not in self.events:
+            self.events[event] = EventStats()
+        self.events[event].record(sample, failed)
+
+    def reset(self) -> None:
+        self.started = monotonic()
+        self.events = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "uptime": monotonic() - self.started,
+            "events": {name: stats.to_dict() for name, stats in sorted(self.events.items())},
+        }
+
+
+current_sample: ContextVar[Optional[Sample]] = ContextVar("modlogging_sample", default=None)
+
+
+def instrumented(event: str):
+    """
+    Record call counts and latency for a listener when stats are enabled.
+
+    Each listener runs in its own task so the sample stored in the context
+    variable is only visible to the audit log and send helpers called from it.
+    Nested calls, like bulk deletes replaying single deletes, are counted once.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            stats: ListenerStats = self.listener_stats
+            if not stats.enabled or current_sample.get() is not None:
+                return await func(self, *args, **kwargs)
+            sample = Sample()
+            token = current_sample.set(sample)
+            failed = False
+            try:
+                return await func(self, *args, **kwargs)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                current_sample.reset(token)
+                stats.record(event, sample, failed)
+
+        return wrapper
+
+    return decorator
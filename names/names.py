@@ -1,6 +1,26 @@
 import discord
 from redbot.core import commands, Config
+from redbot.core.data_manager import cog_data_path
 import asyncio
+import contextlib
+import csv
+import io
+import logging
+import time
+from typing import Dict
+
+from .purifier import GuildSettings, plan_cleanup
+from .scheduler import DelayedJobScheduler
+
+JOIN_PURIFY_DELAY = 300  # Seconds after joining before a new member's nickname is purified
+# discord.py waits out the member edit rate limit bucket from the response headers,
+# so cleanup edits are sent back to back rather than after a fixed sleep
+CLEANUP_CONCURRENCY = 2  # Nickname edits a cleanup may have in flight at once
+CLEANUP_CHUNK_SIZE = 50  # Planned changes applied between cleanup checkpoints
+CLEANUP_PROGRESS_INTERVAL = 5  # Minimum seconds between cleanup status message edits
+CLEANUP_PREVIEW_LINES = 15  # Changes listed in the dry run embed, the rest are in the CSV
+
+log = logging.getLogger("red.beehive-cogs.names")
 
 class NicknameManagement(commands.Cog):
     """Cog for managing and normalizing user nicknames."""
@@ -11,12 +31,37 @@ class NicknameManagement(commands.Cog):
         default_guild = {
             "allowed_characters": "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 ",
             "max_length": 32,
-            "auto_purify": False
+            "auto_purify": False,
+            "cleanup_state": None,
         }
         self.config.register_guild(**default_guild)
         self.bot.add_listener(self.on_member_update, "on_member_update")
         self.bot.add_listener(self.on_member_join, "on_member_join")
+        self.bot.add_listener(self.on_member_remove, "on_member_remove")
+        self._settings: Dict[int, GuildSettings] = {}
+        self._cleanup_tasks: Dict[int, asyncio.Task] = {}
+        self.scheduler = DelayedJobScheduler(cog_data_path(self) / "scheduled_jobs.json", self.run_scheduled_job)
         self.bot.loop.create_task(self.cleanup_nicknames())
+        self.bot.loop.create_task(self.resume_cleanups())
+
+    async def cog_load(self):
+        await self.scheduler.start()
+
+    async def cog_unload(self):
+        # Cleanups keep their checkpoint and resume after the next load
+        for task in self._cleanup_tasks.values():
+            task.cancel()
+        await self.scheduler.stop()
+
+    async def get_settings(self, guild) -> GuildSettings:
+        settings = self._settings.get(guild.id)
+        if settings is None:
+            settings = GuildSettings(await self.config.guild(guild).all())
+            self._settings[guild.id] = settings
+        return settings
+
+    def invalidate_settings(self, guild) -> None:
+        self._settings.pop(guild.id, None)
 
     @commands.guild_only()
     @commands.has_permissions(manage_nicknames=True)
@@ -33,14 +78,8 @@ class NicknameManagement(commands.Cog):
             await ctx.send("I do not have permission to manage nicknames.")
             return
 
-        guild_settings = await self.config.guild(ctx.guild).all()
-        allowed_characters = set(guild_settings["allowed_characters"])
-        purified_nickname = ''.join(c for c in member.display_name if c in allowed_characters)
-        purified_nickname = purified_nickname[:guild_settings["max_length"]]
-
-        if not purified_nickname:
-            purified_nickname = ''.join(c for c in member.name if c in allowed_characters)
-            purified_nickname = purified_nickname[:guild_settings["max_length"]]
+        settings = await self.get_settings(ctx.guild)
+        purified_nickname = settings.purifier.purify(member.display_name, member.name)
 
         if member.display_name != purified_nickname:
             try:
@@ -59,14 +98,11 @@ class NicknameManagement(commands.Cog):
             await ctx.send("I do not have permission to manage nicknames.")
             return
 
-        guild_settings = await self.config.guild(ctx.guild).all()
-        allowed_characters = set(guild_settings["allowed_characters"])
-        normalized_nickname = ''.join(c for c in member.display_name if c in allowed_characters).title()
-        normalized_nickname = normalized_nickname[:guild_settings["max_length"]]
+        purifier = (await self.get_settings(ctx.guild)).purifier
+        normalized_nickname = purifier.clean(member.display_name).title()[:purifier.max_length]
 
         if not normalized_nickname:
-            normalized_nickname = ''.join(c for c in member.name if c in allowed_characters).title()
-            normalized_nickname = normalized_nickname[:guild_settings["max_length"]]
+            normalized_nickname = purifier.clean(member.name).title()[:purifier.max_length]
 
         if member.display_name != normalized_nickname:
             try:
@@ -82,6 +118,7 @@ class NicknameManagement(commands.Cog):
     async def allowedchars(self, ctx, *, characters: str):
         """Set the allowed characters for nicknames."""
         await self.config.guild(ctx.guild).allowed_characters.set(characters)
+        self.invalidate_settings(ctx.guild)
         await ctx.send(f"Allowed characters set to: {characters}")
 
     @nickname.command()
@@ -92,6 +129,7 @@ class NicknameManagement(commands.Cog):
             await ctx.send("Maximum length must be at least 1.")
             return
         await self.config.guild(ctx.guild).max_length.set(length)
+        self.invalidate_settings(ctx.guild)
         await ctx.send(f"Maximum nickname length set to: {length}")
 
     @nickname.command()
@@ -99,95 +137,208 @@ class NicknameManagement(commands.Cog):
     async def autopurify(self, ctx, enable: bool):
         """Enable or disable auto-purification of nicknames."""
         await self.config.guild(ctx.guild).auto_purify.set(enable)
+        self.invalidate_settings(ctx.guild)
         status = "enabled" if enable else "disabled"
         await ctx.send(f"Auto-purification has been {status}.")
 
-    @nickname.command()
+    @nickname.group(invoke_without_command=True)
     @commands.has_permissions(manage_nicknames=True)
     async def cleanup(self, ctx):
-        """Clean up all pre-existing nicknames in the server slowly to prevent rate limits."""
+        """
+        Clean up all pre-existing nicknames in the server without hitting rate limits.
+
+        The members to change are worked out first, then edited as fast as Discord allows.
+        Progress is saved as it goes, so a cleanup interrupted by a restart picks up where it stopped.
+        """
         if not ctx.guild.me.guild_permissions.manage_nicknames:
             await ctx.send("I do not have permission to manage nicknames.")
             return
 
-        await ctx.send("Starting nickname cleanup. This may take a while...")
-        guild_settings = await self.config.guild(ctx.guild).all()
-        allowed_characters = set(guild_settings["allowed_characters"])
-        max_length = guild_settings["max_length"]
-
-        total_members = len(ctx.guild.members)
-        processed_members = 0
-        changed_nicknames = 0
-        failed_changes = 0
-        character_removal_count = {}
-
-        embed = discord.Embed(title="Nickname cleanup in progress", color=0xfffffe)
-        embed.add_field(name="Total members", value=total_members, inline=True)
-        embed.add_field(name="Processed members", value=processed_members, inline=True)
-        embed.add_field(name="Changed nicknames", value=changed_nicknames, inline=True)
-        embed.add_field(name="Failed changes", value=failed_changes, inline=True)
-        progress_message = await ctx.send(embed=embed)
-
-        for member in ctx.guild.members:
-            if member.bot:
-                try:
-                    await member.edit(nick=None, reason="Clearing bot nickname to restore original name")
-                    changed_nicknames += 1
-                    await asyncio.sleep(1)
-                except discord.Forbidden:
-                    failed_changes += 1
-                except discord.HTTPException:
-                    failed_changes += 1
-            else:
-                original_nickname = member.display_name
-                purified_nickname = ''.join(c for c in original_nickname if c in allowed_characters)
-                purified_nickname = purified_nickname[:max_length]
-                if not purified_nickname:
-                    purified_nickname = ''.join(c for c in member.name if c in allowed_characters)
-                    purified_nickname = purified_nickname[:max_length]
-
-                removed_characters = set(original_nickname) - set(purified_nickname)
-                for char in removed_characters:
-                    character_removal_count[char] = character_removal_count.get(char, 0) + 1
-
-                if original_nickname != purified_nickname:
+        task = self._cleanup_tasks.get(ctx.guild.id)
+        if task is not None and not task.done():
+            await ctx.send("A nickname cleanup is already running in this server. Use `nickname cleanup cancel` to stop it.")
+            return
+
+        state = await self.config.guild(ctx.guild).cleanup_state()
+        if state:
+            status = await ctx.send(embed=self._cleanup_embed("Resuming nickname cleanup", ctx.guild, state))
+        else:
+            state = {
+                "last_member_id": 0,
+                "planned": None,
+                "changed": 0,
+                "failed": 0,
+                "removed_characters": [],
+            }
+            status = await ctx.send(embed=self._cleanup_embed("Planning nickname cleanup", ctx.guild, state))
+        state["channel_id"] = status.channel.id
+        state["message_id"] = status.id
+        await self.config.guild(ctx.guild).cleanup_state.set(state)
+        self._cleanup_tasks[ctx.guild.id] = asyncio.create_task(self.run_cleanup(ctx.guild, state, status))
+
+    @cleanup.command(name="dryrun")
+    @commands.has_permissions(manage_nicknames=True)
+    async def cleanup_dryrun(self, ctx):
+        """Report what a cleanup would change without editing any nicknames."""
+        async with ctx.typing():
+            changes, removed = await self._plan_cleanup(ctx.guild, 0)
+
+        bots = sum(1 for _, nickname in changes if nickname is None)
+        embed = discord.Embed(title="Nickname cleanup preview", color=0xfffffe)
+        embed.add_field(name="Total members", value=len(ctx.guild.members), inline=True)
+        embed.add_field(name="Nicknames to purify", value=len(changes) - bots, inline=True)
+        embed.add_field(name="Bot nicknames to clear", value=bots, inline=True)
+        embed.add_field(name="Most removed characters", value=self._format_removed(removed.most_common(5)), inline=False)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["member_id", "username", "current_name", "new_nickname"])
+        lines = []
+        for member_id, nickname in changes:
+            member = ctx.guild.get_member(member_id)
+            if member is None:
+                continue
+            new_name = member.name if nickname is None else nickname
+            writer.writerow([member.id, member.name, member.display_name, "" if nickname is None else nickname])
+            if len(lines) < CLEANUP_PREVIEW_LINES:
+                lines.append(f"{discord.utils.escape_markdown(member.display_name)} → {discord.utils.escape_markdown(new_name)}")
+        if lines:
+            embed.add_field(name="Examples", value="\n".join(lines)[:1024], inline=False)
+        if not changes:
+            await ctx.send(embed=embed)
+            return
+        file = discord.File(io.BytesIO(buffer.getvalue().encode("utf-8")), filename="nickname_cleanup_preview.csv")
+        await ctx.send(embed=embed, file=file)
+
+    @cleanup.command(name="cancel")
+    @commands.has_permissions(manage_nicknames=True)
+    async def cleanup_cancel(self, ctx):
+        """Stop a running or interrupted cleanup and discard its progress."""
+        task = self._cleanup_tasks.pop(ctx.guild.id, None)
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await self.config.guild(ctx.guild).cleanup_state.clear()
+        await ctx.send("The nickname cleanup has been cancelled.")
+
+    async def _plan_cleanup(self, guild, after_member_id):
+        """The changes for members after `after_member_id`, worked out in a worker thread."""
+        purifier = (await self.get_settings(guild)).purifier
+        members = [
+            (m.id, m.display_name, m.name, m.bot, m.nick is not None)
+            for m in guild.members
+            if m.id > after_member_id
+        ]
+        return await asyncio.to_thread(plan_cleanup, purifier, members)
+
+    def _cleanup_embed(self, title, guild, state, color=0xfffffe):
+        embed = discord.Embed(title=title, color=color)
+        embed.add_field(name="Total members", value=len(guild.members), inline=True)
+        embed.add_field(name="Planned changes", value="..." if state["planned"] is None else state["planned"], inline=True)
+        embed.add_field(name="Changed nicknames", value=state["changed"], inline=True)
+        embed.add_field(name="Failed changes", value=state["failed"], inline=True)
+        return embed
+
+    @staticmethod
+    def _format_removed(removed):
+        return ', '.join(f"{char}: {count}" for char, count in removed) or "None"
+
+    async def resume_cleanups(self):
+        """Continue any cleanups that were interrupted by a restart."""
+        await self.bot.wait_until_ready()
+        for guild_id, data in (await self.config.all_guilds()).items():
+            state = data.get("cleanup_state")
+            if not state:
+                continue
+            guild = self.bot.get_guild(guild_id)
+            if guild is None or guild.id in self._cleanup_tasks:
+                continue
+            status = None
+            channel = guild.get_channel(state.get("channel_id") or 0)
+            if channel is not None:
+                status = channel.get_partial_message(state["message_id"])
+            self._cleanup_tasks[guild.id] = asyncio.create_task(self.run_cleanup(guild, state, status))
+
+    async def run_cleanup(self, guild, state, status):
+        """
+        Apply the planned nickname changes in member id order.
+
+        Progress is checkpointed after every chunk by the id of the last member
+        handled, a resumed cleanup plans again from there so members who joined,
+        left or renamed in the meantime are handled correctly.
+        """
+        try:
+            changes, removed = await self._plan_cleanup(guild, state["last_member_id"])
+            if state["planned"] is None:
+                state["removed_characters"] = removed.most_common(5)
+            state["planned"] = state["changed"] + state["failed"] + len(changes)
+            await self.config.guild(guild).cleanup_state.set(state)
+            semaphore = asyncio.Semaphore(CLEANUP_CONCURRENCY)
+            last_edit = 0.0
+
+            for start in range(0, len(changes), CLEANUP_CHUNK_SIZE):
+                chunk = changes[start:start + CLEANUP_CHUNK_SIZE]
+                # Settings may change while a long cleanup runs
+                purifier = (await self.get_settings(guild)).purifier
+                results = await asyncio.gather(
+                    *(self._cleanup_edit(semaphore, guild, purifier, member_id) for member_id, _ in chunk)
+                )
+                state["changed"] += results.count(True)
+                state["failed"] += results.count(False)
+                state["last_member_id"] = chunk[-1][0]
+                await self.config.guild(guild).cleanup_state.set(state)
+                if status is not None and time.monotonic() - last_edit >= CLEANUP_PROGRESS_INTERVAL:
+                    last_edit = time.monotonic()
                     try:
-                        await member.edit(nick=purified_nickname, reason="Nickname purified during cleanup")
-                        changed_nicknames += 1
-                        await asyncio.sleep(1)
-                    except discord.Forbidden:
-                        failed_changes += 1
+                        await status.edit(embed=self._cleanup_embed("Nickname cleanup in progress", guild, state))
                     except discord.HTTPException:
-                        failed_changes += 1
-
-            processed_members += 1
-            if processed_members % 100 == 0:
-                embed.set_field_at(1, name="Processed members", value=processed_members, inline=True)
-                embed.set_field_at(2, name="Changed nicknames", value=changed_nicknames, inline=True)
-                embed.set_field_at(3, name="Failed changes", value=failed_changes, inline=True)
-                await progress_message.edit(embed=embed)
-
-        most_removed_characters = sorted(character_removal_count.items(), key=lambda item: item[1], reverse=True)[:5]
-        most_removed_characters_str = ', '.join([f"{char}: {count}" for char, count in most_removed_characters])
-
-        embed = discord.Embed(title="Nickname cleanup finished", color=0x2bbd8e)
-        embed.add_field(name="Total members", value=total_members, inline=True)
-        embed.add_field(name="Processed members", value=processed_members, inline=True)
-        embed.add_field(name="Changed nicknames", value=changed_nicknames, inline=True)
-        embed.add_field(name="Failed changes", value=failed_changes, inline=True)
-        embed.add_field(name="Most removed characters", value=most_removed_characters_str or "None", inline=False)
-        await progress_message.edit(embed=embed)
+                        status = None
+
+            embed = self._cleanup_embed("Nickname cleanup finished", guild, state, color=0x2bbd8e)
+            embed.add_field(name="Most removed characters", value=self._format_removed(state["removed_characters"]), inline=False)
+            await self.config.guild(guild).cleanup_state.clear()
+            if status is not None:
+                try:
+                    await status.edit(embed=embed)
+                except discord.HTTPException:
+                    status = None
+            if status is None:
+                channel = guild.get_channel(state.get("channel_id") or 0)
+                if channel is not None:
+                    await channel.send(embed=embed)
+        except Exception:
+            log.exception("Error running the nickname cleanup in %s", guild.id)
+        finally:
+            if self._cleanup_tasks.get(guild.id) is asyncio.current_task():
+                del self._cleanup_tasks[guild.id]
+
+    async def _cleanup_edit(self, semaphore, guild, purifier, member_id):
+        """Edit one member's nickname, returning whether it worked or `None` if nothing needed doing."""
+        member = guild.get_member(member_id)
+        if member is None:
+            return None
+        if member.bot:
+            if member.nick is None:
+                return None
+            nickname, reason = None, "Clearing bot nickname to restore original name"
+        else:
+            # Purified again in case the member renamed since the plan was made
+            nickname, reason = purifier.purify(member.display_name, member.name), "Nickname purified during cleanup"
+            if nickname == member.display_name:
+                return None
+        async with semaphore:
+            try:
+                await member.edit(nick=nickname, reason=reason)
+            except discord.HTTPException:
+                return False
+        return True
 
     async def on_member_update(self, before, after):
         if before.display_name != after.display_name:
-            guild_settings = await self.config.guild(after.guild).all()
-            if guild_settings["auto_purify"]:
-                allowed_characters = set(guild_settings["allowed_characters"])
-                purified_nickname = ''.join(c for c in after.display_name if c in allowed_characters)
-                purified_nickname = purified_nickname[:guild_settings["max_length"]]
-                if not purified_nickname:
-                    purified_nickname = ''.join(c for c in after.name if c in allowed_characters)
-                    purified_nickname = purified_nickname[:guild_settings["max_length"]]
+            settings = await self.get_settings(after.guild)
+            if settings.auto_purify:
+                purified_nickname = settings.purifier.purify(after.display_name, after.name)
                 if after.display_name != purified_nickname:
                     try:
                         await after.edit(nick=purified_nickname, reason="Nickname auto-purified on update")
@@ -197,15 +348,25 @@ class NicknameManagement(commands.Cog):
                         pass
 
     async def on_member_join(self, member):
-        await asyncio.sleep(300)  # Wait for 5 minutes before attempting to change the nickname
-        guild_settings = await self.config.guild(member.guild).all()
-        if guild_settings["auto_purify"]:
-            allowed_characters = set(guild_settings["allowed_characters"])
-            purified_nickname = ''.join(c for c in member.display_name if c in allowed_characters)
-            purified_nickname = purified_nickname[:guild_settings["max_length"]]
-            if not purified_nickname:
-                purified_nickname = ''.join(c for c in member.name if c in allowed_characters)
-                purified_nickname = purified_nickname[:guild_settings["max_length"]]
+        # Wait 5 minutes before attempting to change the nickname, without parking a task per member
+        if (await self.get_settings(member.guild)).auto_purify:
+            self.scheduler.schedule(
+                f"purify:{member.guild.id}:{member.id}",
+                JOIN_PURIFY_DELAY,
+                {"guild_id": member.guild.id, "member_id": member.id},
+            )
+
+    async def on_member_remove(self, member):
+        self.scheduler.cancel(f"purify:{member.guild.id}:{member.id}")
+
+    async def run_scheduled_job(self, key, payload):
+        guild = self.bot.get_guild(payload["guild_id"])
+        member = guild.get_member(payload["member_id"]) if guild else None
+        if member is None:
+            return
+        settings = await self.get_settings(member.guild)
+        if settings.auto_purify:
+            purified_nickname = settings.purifier.purify(member.display_name, member.name)
             if member.display_name != purified_nickname:
                 try:
                     await member.edit(nick=purified_nickname, reason="Nickname auto-purified on join")
@@ -218,16 +379,10 @@ class NicknameManagement(commands.Cog):
         await self.bot.wait_until_ready()
         while not self.bot.is_closed():
             for guild in self.bot.guilds:
-                guild_settings = await self.config.guild(guild).all()
-                if guild_settings["auto_purify"]:
-                    allowed_characters = set(guild_settings["allowed_characters"])
-                    max_length = guild_settings["max_length"]
+                settings = await self.get_settings(guild)
+                if settings.auto_purify:
                     for member in guild.members:
-                        purified_nickname = ''.join(c for c in member.display_name if c in allowed_characters)
-                        purified_nickname = purified_nickname[:max_length]
-                        if not purified_nickname:
-                            purified_nickname = ''.join(c for c in member.name if c in allowed_characters)
-                            purified_nickname = purified_nickname[:max_length]
+                        purified_nickname = settings.purifier.purify(member.display_name, member.name)
                         if member.display_name != purified_nickname:
                             try:
                                 await member.edit(nick=purified_nickname, reason="Nickname auto-purified during cleanup")
@@ -0,0 +1,78 @@
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+
+class _DisallowedTable(dict):
+    """
+    A `str.translate` table that deletes every character outside the allowed set.
+
+    Unicode is too large to list every disallowed character up front, so code
+    points are looked up the first time they are seen and remembered.
+    """
+
+    def __init__(self, allowed: Iterable[str]):
+        super().__init__()
+        self.allowed = frozenset(map(ord, allowed))
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        value = codepoint if codepoint in self.allowed else None
+        self[codepoint] = value
+        return value
+
+
+class NicknamePurifier:
+    """
+    A guild's allowed characters and length limit, compiled once and reused for every name.
+    """
+
+    __slots__ = ("table", "max_length")
+
+    def __init__(self, allowed_characters: str, max_length: int):
+        self.table = _DisallowedTable(allowed_characters)
+        self.max_length = max_length
+
+    def clean(self, text: str) -> str:
+        """The text with every disallowed character removed, not truncated."""
+        return text.translate(self.table)
+
+    def purify(self, display_name: str, name: str) -> str:
+        """The display name reduced to allowed characters, falling back to the username."""
+        purified = self.clean(display_name)[:self.max_length]
+        if not purified:
+            purified = self.clean(name)[:self.max_length]
+        return purified
+
+
+class GuildSettings:
+    """In-memory snapshot of a guild's config, rebuilt when a setting command changes it."""
+
+    __slots__ = ("auto_purify", "purifier")
+
+    def __init__(self, data: dict):
+        self.auto_purify: bool = data["auto_purify"]
+        self.purifier = NicknamePurifier(data["allowed_characters"], data["max_length"])
+
+
+def plan_cleanup(
+    purifier: NicknamePurifier, members: Iterable[Tuple[int, str, str, bool, bool]]
+) -> Tuple[List[Tuple[int, Optional[str]]], Counter]:
+    """
+    Work out which members need their nickname changed, in member id order.
+
+    `members` are (id, display name, username, is bot, has nickname) tuples so
+    the plan can be made in a worker thread. Returns (member id, new nickname)
+    pairs, where `None` clears a bot's nickname, and how often each character
+    would be removed.
+    """
+    changes: List[Tuple[int, Optional[str]]] = []
+    removed: Counter = Counter()
+    for member_id, display_name, name, bot, has_nick in sorted(members):
+        if bot:
+            if has_nick:
+                changes.append((member_id, None))
+            continue
+        purified = purifier.purify(display_name, name)
+        if purified != display_name:
+            removed.update(set(display_name) - set(purified))
+            changes.append((member_id, purified))
+    return changes, removed
@@ -0,0 +1,154 @@
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+log = logging.getLogger("red.beehive-cogs.names")
+
+JOB_CONCURRENCY = 5  # Jobs allowed to run at the same time
+JOB_FLUSH_INTERVAL = 5  # Seconds between saving pending jobs when they changed
+
+JobHandler = Callable[[str, dict], Awaitable[None]]
+
+
+class DelayedJobScheduler:
+    """
+    Runs jobs at a later time from a single task instead of one sleeping coroutine each.
+
+    Jobs are identified by a string key, so scheduling a key again replaces the
+    pending job and `cancel` drops it. Pending jobs are written to a JSON file
+    so they survive reloads and restarts, jobs that came due while the bot was
+    offline run once it is back. Each job is handed to `handler` with its key
+    and payload, at most `concurrency` at a time. A job is only forgotten once
+    its handler has finished, so handlers should be safe to run twice.
+    """
+
+    def __init__(self, path: Path, handler: JobHandler, concurrency: int = JOB_CONCURRENCY):
+        self.path = path
+        self.handler = handler
+        # key -> (due timestamp, payload)
+        self._jobs: Dict[str, Tuple[float, dict]] = {}
+        # (due timestamp, key), replaced and cancelled entries are skipped when popped
+        self._heap: List[Tuple[float, str]] = []
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._wakeup = asyncio.Event()
+        self._dirty = False
+        self._tasks: List[asyncio.Task] = []
+        # Jobs currently running, kept referenced until they finish
+        self._running: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    async def start(self) -> None:
+        await self._load()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._run()), loop.create_task(self._save_periodically())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        running = list(self._running)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        await self.save()
+
+    def schedule(self, key: str, delay: float, payload: dict) -> None:
+        due = time.time() + delay
+        self._jobs[key] = (due, payload)
+        heapq.heappush(self._heap, (due, key))
+        self._dirty = True
+        self._wakeup.set()
+
+    def cancel(self, key: str) -> bool:
+        if self._jobs.pop(key, None) is None:
+            return False
+        self._dirty = True
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                due, key = heapq.heappop(self._heap)
+                job = self._jobs.get(key)
+                if job is None or job[0] != due:
+                    continue
+                # Waiting here holds back the queue while the concurrency limit is reached
+                await self._semaphore.acquire()
+                job = self._jobs.get(key)
+                if job is None or job[0] != due:
+                    # Cancelled or replaced while waiting for a free slot
+                    self._semaphore.release()
+                    continue
+                task = asyncio.create_task(self._execute(key, due, job[1]))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+            self._wakeup.clear()
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, key: str, due: float, payload: dict) -> None:
+        cancelled = False
+        try:
+            await self.handler(key, payload)
+        except asyncio.CancelledError:
+            # Stopped mid-job, keep it so it runs again after the next start
+            cancelled = True
+            raise
+        except Exception:
+            log.exception("Scheduled job %s failed", key)
+        finally:
+            self._semaphore.release()
+            # Leave it alone if it was scheduled again while running
+            job = None if cancelled else self._jobs.get(key)
+            if job is not None and job[0] == due:
+                del self._jobs[key]
+                self._dirty = True
+
+    async def _save_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(JOB_FLUSH_INTERVAL)
+            try:
+                await self.save()
+            except Exception:
+                log.exception("Could not save scheduled jobs")
+
+    async def save(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = json.dumps({key: [due, payload] for key, (due, payload) in self._jobs.items()})
+        try:
+            await asyncio.to_thread(self._write, data)
+        except OSError:
+            self._dirty = True
+            raise
+
+    def _write(self, data: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(data)
+        os.replace(tmp, self.path)
+
+    async def _load(self) -> None:
+        try:
+            raw = await asyncio.to_thread(self.path.read_text)
+        except FileNotFoundError:
+            return
+        try:
+            saved = json.loads(raw)
+        except ValueError:
+            log.warning("Ignoring unreadable scheduled jobs file %s", self.path)
+            return
+        for key, (due, payload) in saved.items():
+            self._jobs[key] = (due, payload)
+            heapq.heappush(self._heap, (due, key))
@@ -1,11 +1,26 @@
 from redbot.core import commands, Config  # type: ignore
+from redbot.core.data_manager import cog_data_path  # type: ignore
 import discord
 import aiohttp
 import asyncio
+import contextlib
+import heapq
+import logging
+import time
 from collections import Counter
 from datetime import datetime, timedelta
 
+from .store import BanlistStore, ban_is_active
+
 TIMEOUT_DURATION = 28 * 24 * 60 * 60  # 28 days in seconds (max Discord timeout)
+BANLIST_REFRESH_INTERVAL = 60 * 60  # Conditional refresh of the shared banlist every hour
+RETIMEOUT_MARGIN = 24 * 60 * 60  # Re-apply banlist timeouts when less than a day is left
+SCAN_CHUNK_SIZE = 1000  # Members checked between scan checkpoints
+SCAN_CONCURRENCY = 3  # Moderation actions a scan may have in flight at once
+SCAN_PROGRESS_INTERVAL = 5  # Minimum seconds between scan status message edits
+SCAN_SUMMARY_LIMIT = 50  # Affected and failed members kept for the scan summary
+
+log = logging.getLogger("red.beehive-cogs.openbanlist")
 
 class OpenBanList(commands.Cog):
     """
@@ -25,18 +40,29 @@ class OpenBanList(commands.Cog):
                 "2": "kick",
                 "3": "timeout"
             },
-            "log_channel": None  # Default log channel is None
+            "log_channel": None,  # Default log channel is None
+            "scan_state": None  # Checkpoint of an unfinished banlist scan
         }
         self.config.register_guild(**default_guild)
         self.banlist_url = "https://openbanlist.cc/data/banlist.json"
         self.session = aiohttp.ClientSession()
+        self.store = BanlistStore(self.session, self.banlist_url, cog_data_path(self))
+        # Heap of (due timestamp, guild id, user id) for banlist timeouts to renew
+        self._timeout_queue = []
+        self._timeout_due = {}
+        self._timeout_wakeup = asyncio.Event()
+        self._scan_tasks = {}
         self.bot.loop.create_task(self.update_banlist_periodically())
         self.timeout_task = self.bot.loop.create_task(self.timeout_enforcer())
+        self.bot.loop.create_task(self.resume_scans())
 
     def cog_unload(self):
         self.bot.loop.create_task(self.session.close())
         if hasattr(self, "timeout_task"):
             self.timeout_task.cancel()
+        # Running scans keep their checkpoint and resume when the cog loads again
+        for task in self._scan_tasks.values():
+            task.cancel()
 
     @commands.guild_only()
     @commands.group(invoke_without_command=True)
@@ -59,6 +85,7 @@ class OpenBanList(commands.Cog):
             color=0x2bbd8e
         )
         await ctx.send(embed=embed)
+        await self.enforce_guild(ctx.guild)
 
     @commands.admin_or_permissions(manage_guild=True)
     @banlist.command()
@@ -125,6 +152,7 @@ class OpenBanList(commands.Cog):
             color=0x2bbd8e
         )
         await ctx.send(embed=embed)
+        await self.enforce_guild(ctx.guild)
 
     @commands.admin_or_permissions(manage_guild=True)
     @banlist.command()
@@ -146,159 +174,159 @@ class OpenBanList(commands.Cog):
         else:
             user_id = user.id
 
-        async with self.session.get(self.banlist_url) as response:
-            if response.status == 200:
-                banlist_data = await response.json()
-                # Find all bans for this user by reported_id
-                user_bans = []
-                banlist_items = list(banlist_data.items())
-                for idx, (ban_key, ban_info) in enumerate(banlist_items, 1):
-                    if int(ban_info.get("reported_id", 0)) == user_id:
-                        user_bans.append((idx, ban_info))
-                if not user_bans:
-                    embed = discord.Embed(
-                        title="OpenBanlist check",
-                        description=f"That user has no active bans or historical punishments on OpenBanlist.",
-                        color=0x2bbd8e
-                    )
-                    await ctx.send(embed=embed)
-                    return
+        if not await self.store.ensure_loaded():
+            await ctx.send("Failed to fetch the banlist. Please try again later.")
+            return
+        # Find all bans for this user by reported_id
+        user_bans = self.store.get(user_id)
+        if not user_bans:
+            embed = discord.Embed(
+                title="OpenBanlist check",
+                description=f"That user has no active bans or historical punishments on OpenBanlist.",
+                color=0x2bbd8e
+            )
+            await ctx.send(embed=embed)
+            return
 
-                # Only consider bans that are still active (appeal_verdict is not "accepted")
-                active_bans = [ban_info for idx, ban_info in user_bans if ban_info.get("appeal_info", {}).get("appeal_verdict", "").lower() != "accepted"]
+        # Only consider bans that are still active (appeal_verdict is not "accepted")
+        active_bans = [ban_info for idx, ban_info in user_bans if ban_is_active(ban_info)]
 
-                # If there are active bans, show the first one
+        # If there are active bans, show the first one
+        if active_bans:
+            active_ban = active_bans[0]
+            severity = str(active_ban.get("severity", "3"))
+            severity_map = {"1": "High", "2": "Medium", "3": "Low"}
+            embed = discord.Embed(
+                title="OpenBanlist check",
+                description=f"> Uh oh! <@{user_id}> is listed in the **[OpenBanlist](https://openbanlist.cc)**",
+                color=0xff4545
+            )
+            embed.add_field(name="Banned for", value=active_ban.get("ban_reason", "No reason provided yet, check back soon"), inline=True)
+            embed.add_field(name="Context", value=active_ban.get("context", "No context provided"), inline=False)
+            embed.add_field(name="Severity", value=f"{severity} ({severity_map.get(severity, 'Unknown')})", inline=True)
+            # Process reporter name if available
+            reporter_id = active_ban.get('reporter_id', 'Unknown')
+            reporter_name = active_ban.get('reporter_name', None)
+            if reporter_name:
+                reporter_display = f"{reporter_name} (<@{reporter_id}>)\n`{reporter_id}`"
+            else:
+                reporter_display = f"<@{reporter_id}>\n`{reporter_id}`"
+            embed.add_field(name="Reported by", value=reporter_display, inline=True)
+            # Process approver name if available
+            approver_id = active_ban.get('approver_id', 'Unknown')
+            approver_name = active_ban.get('approver_name', None)
+            if approver_name:
+                approver_display = f"{approver_name} (<@{approver_id}>)\n`{approver_id}`"
+            else:
+                approver_display = f"<@{approver_id}>\n`{approver_id}`"
+            embed.add_field(name="Approved by", value=approver_display, inline=True)
+            appealable_status = ":white_check_mark: **Yes**" if active_ban.get("appealable", False) else ":x: **Not eligible**"
+            embed.add_field(name="Can be appealed?", value=appealable_status, inline=True)
+            if active_ban.get("appealed", False):
+                appeal_info = active_ban.get("appeal_info", {})
+                appeal_verdict = appeal_info.get("appeal_verdict", "")
+                if not appeal_verdict:
+                    appeal_status = "Pending"
+                elif appeal_verdict == "accepted":
+                    # If the appeal is accepted, this ban should not be considered active, so skip showing as active
+                    # Instead, fall through to the else block below
+                    active_bans = []
+                elif appeal_verdict == "denied":
+                    appeal_status = "Denied"
+                else:
+                    appeal_status = "Unknown"
                 if active_bans:
-                    active_ban = active_bans[0]
-                    severity = str(active_ban.get("severity", "3"))
-                    severity_map = {"1": "High", "2": "Medium", "3": "Low"}
-                    embed = discord.Embed(
-                        title="OpenBanlist check",
-                        description=f"> Uh oh! <@{user_id}> is listed in the **[OpenBanlist](https://openbanlist.cc)**",
-                        color=0xff4545
-                    )
-                    embed.add_field(name="Banned for", value=active_ban.get("ban_reason", "No reason provided yet, check back soon"), inline=True)
-                    embed.add_field(name="Context", value=active_ban.get("context", "No context provided"), inline=False)
-                    embed.add_field(name="Severity", value=f"{severity} ({severity_map.get(severity, 'Unknown')})", inline=True)
-                    # Process reporter name if available
-                    reporter_id = active_ban.get('reporter_id', 'Unknown')
-                    reporter_name = active_ban.get('reporter_name', None)
-                    if reporter_name:
-                        reporter_display = f"{reporter_name} (<@{reporter_id}>)\n`{reporter_id}`"
-                    else:
-                        reporter_display = f"<@{reporter_id}>\n`{reporter_id}`"
-                    embed.add_field(name="Reported by", value=reporter_display, inline=True)
-                    # Process approver name if available
-                    approver_id = active_ban.get('approver_id', 'Unknown')
-                    approver_name = active_ban.get('approver_name', None)
-                    if approver_name:
-                        approver_display = f"{approver_name} (<@{approver_id}>)\n`{approver_id}`"
-                    else:
-                        approver_display = f"<@{approver_id}>\n`{approver_id}`"
-                    embed.add_field(name="Approved by", value=approver_display, inline=True)
-                    appealable_status = ":white_check_mark: **Yes**" if active_ban.get("appealable", False) else ":x: **Not eligible**"
-                    embed.add_field(name="Can be appealed?", value=appealable_status, inline=True)
-                    if active_ban.get("appealed", False):
-                        appeal_info = active_ban.get("appeal_info", {})
-                        appeal_verdict = appeal_info.get("appeal_verdict", "")
-                        if not appeal_verdict:
-                            appeal_status = "Pending"
-                        elif appeal_verdict == "accepted":
-                            # If the appeal is accepted, this ban should not be considered active, so skip showing as active
-                            # Instead, fall through to the else block below
-                            active_bans = []
-                        elif appeal_verdict == "denied":
-                            appeal_status = "Denied"
-                        else:
-                            appeal_status = "Unknown"
-                        if active_bans:
-                            embed.add_field(name="Appeal status", value=appeal_status, inline=True)
-                            embed.add_field(name="Appeal verdict", value=appeal_verdict or "No verdict provided", inline=False)
-                            appeal_reason = appeal_info.get("appeal_reason", "")
-                            if appeal_reason:
-                                embed.add_field(name="Appeal reason", value=appeal_reason, inline=False)
-                    if active_bans:
-                        evidence = active_ban.get("evidence", "")
-                        if evidence:
-                            embed.set_image(url=evidence)
-                        report_date = active_ban.get("report_date", "Unknown")
-                        ban_date = active_ban.get("ban_date", "Unknown")
-                        if report_date != "Unknown":
-                            embed.add_field(name="Reported on", value=f"<t:{report_date}:f>", inline=True)
-                        else:
-                            embed.add_field(name="Report date", value="Unknown", inline=True)
-                        if ban_date != "Unknown":
-                            embed.add_field(name="Added to database", value=f"<t:{ban_date}:f>", inline=True)
-                        else:
-                            embed.add_field(name="Ban date", value="Unknown", inline=True)
-                        await ctx.send(embed=embed)
-                        return  # Only send the active ban embed if still valid
-
-                # If we get here, either there are no active bans, or the only ban(s) have an accepted appeal
-                embed = discord.Embed(
-                    title="OpenBanlist check",
-                    description=f"<@{user_id}> is **not currently banned** but has a punishment history on **[OpenBanlist](https://openbanlist.cc)**",
-                    color=discord.Color.orange()
-                )
-                # Add a single field for prior bans as per instructions
-                prior_bans_lines = []
-                for idx, ban_info in user_bans:
-                    reason = ban_info.get("ban_reason", "No reason provided")
-                    ban_date = ban_info.get("ban_date", None)
-                    severity = str(ban_info.get("severity", "3"))
-                    severity_map = {"1": "High", "2": "Medium", "3": "Low"}
-                    if ban_date and ban_date != "Unknown":
-                        try:
-                            # Discord dynamic timestamp
-                            date_str = f"<t:{int(ban_date)}:f>"
-                        except Exception:
-                            date_str = str(ban_date)
-                    else:
-                        date_str = "Unknown"
-                    prior_bans_lines.append(f"`#{idx}` for **{reason}** `({severity_map.get(severity, 'Unknown')})` on **{date_str}**")
-                if prior_bans_lines:
-                    embed.add_field(
-                        name="Prior bans",
-                        value="\n".join(prior_bans_lines),
-                        inline=False
-                    )
+                    embed.add_field(name="Appeal status", value=appeal_status, inline=True)
+                    embed.add_field(name="Appeal verdict", value=appeal_verdict or "No verdict provided", inline=False)
+                    appeal_reason = appeal_info.get("appeal_reason", "")
+                    if appeal_reason:
+                        embed.add_field(name="Appeal reason", value=appeal_reason, inline=False)
+            if active_bans:
+                evidence = active_ban.get("evidence", "")
+                if evidence:
+                    embed.set_image(url=evidence)
+                report_date = active_ban.get("report_date", "Unknown")
+                ban_date = active_ban.get("ban_date", "Unknown")
+                if report_date != "Unknown":
+                    embed.add_field(name="Reported on", value=f"<t:{report_date}:f>", inline=True)
+                else:
+                    embed.add_field(name="Report date", value="Unknown", inline=True)
+                if ban_date != "Unknown":
+                    embed.add_field(name="Added to database", value=f"<t:{ban_date}:f>", inline=True)
+                else:
+                    embed.add_field(name="Ban date", value="Unknown", inline=True)
                 await ctx.send(embed=embed)
+                return  # Only send the active ban embed if still valid
+
+        # If we get here, either there are no active bans, or the only ban(s) have an accepted appeal
+        embed = discord.Embed(
+            title="OpenBanlist check",
+            description=f"<@{user_id}> is **not currently banned** but has a punishment history on **[OpenBanlist](https://openbanlist.cc)**",
+            color=discord.Color.orange()
+        )
+        # Add a single field for prior bans as per instructions
+        prior_bans_lines = []
+        for idx, ban_info in user_bans:
+            reason = ban_info.get("ban_reason", "No reason provided")
+            ban_date = ban_info.get("ban_date", None)
+            severity = str(ban_info.get("severity", "3"))
+            severity_map = {"1": "High", "2": "Medium", "3": "Low"}
+            if ban_date and ban_date != "Unknown":
+                try:
+                    # Discord dynamic timestamp
+                    date_str = f"<t:{int(ban_date)}:f>"
+                except Exception:
+                    date_str = str(ban_date)
+            else:
+                date_str = "Unknown"
+            prior_bans_lines.append(f"`#{idx}` for **{reason}** `({severity_map.get(severity, 'Unknown')})` on **{date_str}**")
+        if prior_bans_lines:
+            embed.add_field(
+                name="Prior bans",
+                value="\n".join(prior_bans_lines),
+                inline=False
+            )
+        await ctx.send(embed=embed)
 
     @banlist.command()
     async def stats(self, ctx):
         """Show statistics about the banlist."""
-        async with self.session.get(self.banlist_url) as response:
-            if response.status == 200:
-                banlist_data = await response.json()
-                total_banned = len(banlist_data)
-                ban_reasons = [ban_info.get("ban_reason", "No reason provided") for ban_info in banlist_data.values()]
-                reason_counts = Counter(ban_reasons)
-                top_reasons = reason_counts.most_common(5)
-
-                # Count by severity
-                severity_counts = Counter(str(ban_info.get("severity", "3")) for ban_info in banlist_data.values())
-                severity_map = {"1": "High", "2": "Medium", "3": "Low"}
+        if not await self.store.ensure_loaded():
+            await ctx.send("Failed to fetch the banlist. Please try again later.")
+            return
+        banlist_data = self.store.data
+        total_banned = len(banlist_data)
+        ban_reasons = [ban_info.get("ban_reason", "No reason provided") for ban_info in banlist_data.values()]
+        reason_counts = Counter(ban_reasons)
+        top_reasons = reason_counts.most_common(5)
+
+        # Count by severity
+        severity_counts = Counter(str(ban_info.get("severity", "3")) for ban_info in banlist_data.values())
+        severity_map = {"1": "High", "2": "Medium", "3": "Low"}
 
-                embed = discord.Embed(
-                    title="OpenBanlist stats",
-                    description=f"There are **{total_banned}** active global bans",
-                    color=0xfffffe
-                )
-                for reason, count in top_reasons:
-                    embed.add_field(name=reason, value=f"**{count}** users", inline=False)
-                for sev in ("1", "2", "3"):
-                    embed.add_field(
-                        name=f"Severity {sev} ({severity_map[sev]})",
-                        value=f"**{severity_counts.get(sev, 0)}** bans",
-                        inline=True
-                    )
-                await ctx.send(embed=embed)
+        embed = discord.Embed(
+            title="OpenBanlist stats",
+            description=f"There are **{total_banned}** active global bans",
+            color=0xfffffe
+        )
+        for reason, count in top_reasons:
+            embed.add_field(name=reason, value=f"**{count}** users", inline=False)
+        for sev in ("1", "2", "3"):
+            embed.add_field(
+                name=f"Severity {sev} ({severity_map[sev]})",
+                value=f"**{severity_counts.get(sev, 0)}** bans",
+                inline=True
+            )
+        await ctx.send(embed=embed)
 
     @commands.admin_or_permissions(manage_guild=True)
-    @banlist.command(name="scan")
+    @banlist.group(name="scan", invoke_without_command=True)
     async def scan(self, ctx):
         """
         Manually scan the server and take the configured action on any banned accounts found.
+
+        Large servers are scanned in chunks with progress shown in a status message. If the
+        bot restarts during a scan it will pick up where it left off.
         """
         guild = ctx.guild
         enabled = await self.config.guild(guild).enabled()
@@ -321,430 +349,615 @@ class OpenBanList(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        log_channel_id = await self.config.guild(guild).log_channel()
-        log_channel = guild.get_channel(log_channel_id) if log_channel_id else None
+        task = self._scan_tasks.get(guild.id)
+        if task is not None and not task.done():
+            await ctx.send("A scan is already running in this server. Use `banlist scan cancel` to stop it.")
+            return
+
+        if not await self.store.ensure_loaded():
+            await ctx.send("Failed to fetch the banlist. Please try again later.")
+            return
 
-        await ctx.send("🔍 Scanning server for users on the OpenBanlist...")
+        state = await self.config.guild(guild).scan_state()
+        if state:
+            status = await ctx.send("🔍 Resuming the interrupted OpenBanlist scan...")
+        else:
+            status = await ctx.send("🔍 Scanning server for users on the OpenBanlist...")
+            state = {
+                "last_member_id": 0,
+                "scanned": 0,
+                "found": 0,
+                "failed": 0,
+                "affected": [],
+                "failures": [],
+            }
+        state["channel_id"] = status.channel.id
+        state["message_id"] = status.id
+        await self.config.guild(guild).scan_state.set(state)
+        self._scan_tasks[guild.id] = asyncio.create_task(self.run_scan(guild, state, status))
+
+    @commands.admin_or_permissions(manage_guild=True)
+    @scan.command(name="cancel")
+    async def scan_cancel(self, ctx):
+        """Stop a running or interrupted scan and discard its progress."""
+        task = self._scan_tasks.pop(ctx.guild.id, None)
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await self.config.guild(ctx.guild).scan_state.clear()
+        await ctx.send("The OpenBanlist scan has been cancelled.")
+
+    async def resume_scans(self):
+        """Continue any scans that were interrupted by a restart."""
+        await self.bot.wait_until_ready()
+        if not await self.store.ensure_loaded():
+            return
+        for guild_id, data in (await self.config.all_guilds()).items():
+            state = data.get("scan_state")
+            if not state:
+                continue
+            guild = self.bot.get_guild(guild_id)
+            if guild is None or guild.id in self._scan_tasks:
+                continue
+            status = None
+            channel = guild.get_channel(state.get("channel_id") or 0)
+            if channel is not None:
+                status = channel.get_partial_message(state["message_id"])
+            self._scan_tasks[guild.id] = asyncio.create_task(self.run_scan(guild, state, status))
+
+    async def run_scan(self, guild, state, status):
+        """
+        Walk the guild members in id order, acting on banlist matches.
+
+        Progress is checkpointed after every chunk by the id of the last member
+        checked, so a resumed scan skips everyone already handled even if members
+        joined or left in the meantime.
+        """
+        try:
+            actions = await self.config.guild(guild).actions()
+            log_channel_id = await self.config.guild(guild).log_channel()
+            log_channel = guild.get_channel(log_channel_id) if log_channel_id else None
+            semaphore = asyncio.Semaphore(SCAN_CONCURRENCY)
+            member_ids = sorted(m.id for m in guild.members if m.id > state["last_member_id"])
+            total = state["scanned"] + len(member_ids)
+            last_edit = 0.0
+
+            for start in range(0, len(member_ids), SCAN_CHUNK_SIZE):
+                chunk = member_ids[start:start + SCAN_CHUNK_SIZE]
+                matches = []
+                for member_id in chunk:
+                    member = guild.get_member(member_id)
+                    if member is None or member.bot:
+                        continue
+                    active_bans = self.store.active_bans(member_id)
+                    if active_bans:
+                        matches.append((member, active_bans[0]))
+                if matches:
+                    results = await asyncio.gather(
+                        *(self._scan_act(semaphore, member, ban_info, actions, log_channel) for member, ban_info in matches)
+                    )
+                    for (member, _), action_taken in zip(matches, results):
+                        if action_taken is None:
+                            state["failed"] += 1
+                            state["failures"] = (state["failures"] + [member.id])[-SCAN_SUMMARY_LIMIT:]
+                        else:
+                            state["found"] += 1
+                            state["affected"] = (state["affected"] + [[member.id, action_taken]])[-SCAN_SUMMARY_LIMIT:]
+                state["scanned"] += len(chunk)
+                state["last_member_id"] = chunk[-1]
+                await self.config.guild(guild).scan_state.set(state)
+                if status is not None and time.monotonic() - last_edit >= SCAN_PROGRESS_INTERVAL:
+                    last_edit = time.monotonic()
+                    try:
+                        await status.edit(
+                            content=(
+                                f"🔍 Scanning server for users on the OpenBanlist... "
+                                f"**{state['scanned']}/{total}** members checked, "
+                                f"**{state['found']}** matches, **{state['failed']}** failed"
+                            )
+                        )
+                    except discord.HTTPException:
+                        status = None
+                # Give the event loop a chance to breathe between chunks
+                await asyncio.sleep(0)
+
+            summary_embed = discord.Embed(
+                title="OpenBanlist scan complete",
+                color=0x2bbd8e if state["found"] or state["failed"] else 0xfffffe
+            )
+            summary_embed.add_field(name="Total scanned", value=str(state["scanned"]), inline=True)
+            summary_embed.add_field(name="Matches found", value=str(state["found"]), inline=True)
+            summary_embed.add_field(name="Failed actions", value=str(state["failed"]), inline=True)
+            if state["affected"]:
+                summary_embed.add_field(
+                    name="Users affected",
+                    value="\n".join(f"<@{m}> ({m}) - {a}" for m, a in state["affected"])[:1024],
+                    inline=False
+                )
+            if state["failures"]:
+                summary_embed.add_field(
+                    name="Failed to act on",
+                    value="\n".join(f"<@{m}> ({m})" for m in state["failures"])[:1024],
+                    inline=False
+                )
+            await self.config.guild(guild).scan_state.clear()
+            channel = guild.get_channel(state.get("channel_id") or 0)
+            if channel is not None:
+                await channel.send(embed=summary_embed)
+        except Exception:
+            log.exception("Error running the banlist scan in %s", guild.id)
+        finally:
+            if self._scan_tasks.get(guild.id) is asyncio.current_task():
+                del self._scan_tasks[guild.id]
+
+    async def _scan_act(self, semaphore, member, ban_info, actions, log_channel):
+        """Apply the scan action to one member, returning what was done or `None` on failure."""
+        severity = str(ban_info.get("severity", "3"))
+        action = actions.get(severity, "none")
+        async with semaphore:
+            try:
+                action_taken = await self._apply_scan_action(member, action, severity)
+            except discord.Forbidden:
+                return None
+            except discord.HTTPException:
+                log.warning("Failed to act on %s during a banlist scan", member.id, exc_info=True)
+                return None
+            if log_channel:
+                try:
+                    await log_channel.send(embed=self._scan_log_embed(member, ban_info, severity, action_taken))
+                except discord.HTTPException:
+                    pass
+        return action_taken
 
-        async with self.session.get(self.banlist_url) as response:
-            if response.status != 200:
-                await ctx.send("Failed to fetch the banlist. Please try again later.")
-                return
-            banlist_data = await response.json()
-            # Build a dict by reported_id for fast lookup
-            ban_ids = {int(ban_info.get("reported_id", 0)): ban_info for ban_info in banlist_data.values()}
+    async def _apply_scan_action(self, member, action, severity):
+        if action == "kick":
+            try:
+                embed_dm = discord.Embed(
+                    title="You're unable to stay in this server",
+                    description="You have been removed from the server due to an active ban on OpenBanlist.",
+                    color=0xff4545
+                )
+                embed_dm.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
+                await member.send(embed=embed_dm)
+            except discord.Forbidden:
+                pass
+            await member.kick(reason=f"Active ban detected on OpenBanlist (manual scan, severity {severity})")
+            return "kicked"
+        if action == "ban":
+            try:
+                embed_dm = discord.Embed(
+                    title="You're unable to stay in this server",
+                    description="You have been banned from the server due to an active ban on OpenBanlist.",
+                    color=0xff4545
+                )
+                embed_dm.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
+                await member.send(embed=embed_dm)
+            except discord.Forbidden:
+                pass
+            await member.ban(reason=f"Active ban detected on OpenBanlist (manual scan, severity {severity})")
+            return "banned"
+        if action == "timeout":
+            try:
+                embed_dm = discord.Embed(
+                    title="You have been timed out in this server",
+                    description="You have been timed out due to an active ban on OpenBanlist. You will not be able to interact in this server.",
+                    color=0xffa500
+                )
+                embed_dm.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
+                await member.send(embed=embed_dm)
+            except discord.Forbidden:
+                pass
+            try:
+                until = discord.utils.utcnow() + timedelta(seconds=TIMEOUT_DURATION)
+                await member.timeout(until=until, reason=f"Active ban detected on OpenBanlist (manual scan, severity {severity})")
+                self.schedule_retimeout(member, until)
+                return "timed out"
+            except Exception:
+                return "failed to timeout"
+        return "none"
 
-        found = []
-        failed = []
+    def _scan_log_embed(self, member, ban_info, severity, action_taken):
         severity_map = {"1": "High", "2": "Medium", "3": "Low"}
-        for member in guild.members:
-            if member.bot:
+        embed = discord.Embed(
+            title="Banlist match found (manual scan)",
+            description=f"{member.mention} ({member.id}) is actively listed on OpenBanlist.",
+            color=0xff4545
+        )
+        embed.add_field(name="Action taken", value=action_taken, inline=False)
+        embed.add_field(name="Ban reason", value=ban_info.get("ban_reason", "No reason provided"), inline=False)
+        embed.add_field(name="Context", value=ban_info.get("context", "No context provided"), inline=False)
+        embed.add_field(name="Severity", value=f"{severity} ({severity_map.get(severity, 'Unknown')})", inline=True)
+        # Process reporter name if available
+        reporter_id = ban_info.get("reporter_id", "Unknown")
+        reporter_name = ban_info.get("reporter_name", None)
+        if reporter_name:
+            reporter_display = f"{reporter_name} (<@{reporter_id}>)"
+        else:
+            reporter_display = f"<@{reporter_id}>"
+        embed.add_field(name="Reporter", value=reporter_display, inline=False)
+        approver_id = ban_info.get("approver_id", "Unknown")
+        approver_name = ban_info.get("approver_name", None)
+        if approver_name:
+            approver_display = f"{approver_name} (<@{approver_id}>)"
+        else:
+            approver_display = f"<@{approver_id}>"
+        embed.add_field(name="Approver", value=approver_display, inline=False)
+        embed.add_field(name="Appealable", value=str(ban_info.get("appealable", False)), inline=False)
+        if ban_info.get("appealed", False):
+            appeal_info = ban_info.get("appeal_info", {})
+            appeal_verdict = appeal_info.get("appeal_verdict", "")
+            if not appeal_verdict:
+                appeal_status = "Pending"
+            elif appeal_verdict == "accepted":
+                appeal_status = "Accepted"
+            elif appeal_verdict == "denied":
+                appeal_status = "Denied"
+            else:
+                appeal_status = "Unknown"
+            embed.add_field(name="Appeal status", value=appeal_status, inline=True)
+            embed.add_field(name="Appeal verdict", value=appeal_verdict or "No verdict provided", inline=False)
+            appeal_reason = appeal_info.get("appeal_reason", "")
+            if appeal_reason:
+                embed.add_field(name="Appeal reason", value=appeal_reason, inline=False)
+        evidence = ban_info.get("evidence", "")
+        if evidence:
+            embed.set_image(url=evidence)
+        report_date = ban_info.get("report_date", "Unknown")
+        ban_date = ban_info.get("ban_date", "Unknown")
+        if report_date != "Unknown":
+            embed.add_field(name="Report date", value=f"<t:{report_date}:F>", inline=False)
+        else:
+            embed.add_field(name="Report date", value="Unknown", inline=False)
+        if ban_date != "Unknown":
+            embed.add_field(name="Ban date", value=f"<t:{ban_date}:F>", inline=False)
+        else:
+            embed.add_field(name="Ban date", value="Unknown", inline=False)
+        return embed
+
+    async def update_banlist_periodically(self):
+        await self.bot.wait_until_ready()
+        first_pass = True
+        while True:
+            try:
+                await self.store.ensure_loaded()
+                diff = await self.store.refresh()
+                if first_pass and self.store.loaded:
+                    # Nothing is known about the members yet so check every banned user once
+                    await self.enforce_users(self.store.active_user_ids())
+                    first_pass = False
+                elif diff:
+                    await self.enforce_diff(diff)
+            except Exception:
+                log.exception("Error while updating the banlist")
+            await asyncio.sleep(BANLIST_REFRESH_INTERVAL)
+
+    async def enforce_diff(self, diff):
+        """Act only on the users whose bans changed since the last refresh."""
+        if diff.lifted:
+            # The ban is no longer active so stop re-applying the banlist timeout and lift it
+            for key in [k for k in self._timeout_due if k[1] in diff.lifted]:
+                del self._timeout_due[key]
+                await self._lift_timeout(*key)
+        await self.enforce_users(diff.affected)
+
+    async def _lift_timeout(self, guild_id, user_id):
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(user_id) if guild else None
+        if member is None or not getattr(member, "timed_out_until", None):
+            return
+        try:
+            await member.timeout(None, reason="OpenBanlist ban lifted")
+        except discord.HTTPException:
+            log.warning("Failed to lift the banlist timeout for %s in %s", user_id, guild_id, exc_info=True)
+
+    async def enforce_guild(self, guild):
+        """
+        Check every banned user against one guild.
+
+        Refreshes only act on users whose bans changed, so this covers guilds
+        whose settings just changed or that the bot just joined.
+        """
+        try:
+            if await self.store.ensure_loaded():
+                await self.enforce_users(self.store.active_user_ids(), guilds=[guild])
+        except Exception:
+            log.exception("Error enforcing the banlist in %s", guild.id)
+
+    async def enforce_users(self, user_ids, guilds=None):
+        """Apply the configured action to the given users in every guild they are in, or only in `guilds`."""
+        if not user_ids:
+            return
+        guild_actions = []
+        for guild in guilds if guilds is not None else self.bot.guilds:
+            guild_settings = await self.config.guild(guild).all()
+            if not guild_settings["enabled"]:
+                continue
+            actions = guild_settings["actions"]
+            if all(a == "none" for a in actions.values()):
+                continue
+            guild_actions.append((guild, actions))
+        if not guild_actions:
+            return
+
+        for user_id in user_ids:
+            active_bans = self.store.active_bans(user_id)
+            if not active_bans:
                 continue
-            ban_info = ban_ids.get(member.id)
-            if ban_info:
-                # Skip if appeal_verdict is accepted
-                appeal_info = ban_info.get("appeal_info", {})
-                if appeal_info.get("appeal_verdict", "").lower() == "accepted":
+            severity = str(active_bans[0].get("severity", "3"))
+            for guild, actions in guild_actions:
+                member = guild.get_member(user_id)
+                if member is None or member.bot:
+                    continue
+                action = actions.get(severity, "none")
+                try:
+                    if action == "kick":
+                        await member.kick(reason=f"Active ban detected on OpenBanlist (severity {severity})")
+                    elif action == "ban":
+                        await member.ban(reason=f"Active ban detected on OpenBanlist (severity {severity})")
+                    elif action == "timeout":
+                        if not self._needs_timeout(member):
+                            self.schedule_retimeout(member)
+                            continue
+                        try:
+                            until = discord.utils.utcnow() + timedelta(seconds=TIMEOUT_DURATION)
+                            await member.timeout(until=until, reason=f"Active ban detected on OpenBanlist (severity {severity})")
+                            self.schedule_retimeout(member, until)
+                        except Exception:
+                            pass
+                except discord.Forbidden:
+                    pass
+
+    @staticmethod
+    def _needs_timeout(member):
+        """Whether the member has no timeout or one expiring within the re-timeout margin."""
+        until = getattr(member, "timed_out_until", None)
+        if not until:
+            return True
+        return (until - discord.utils.utcnow()).total_seconds() < RETIMEOUT_MARGIN
+
+    def schedule_retimeout(self, member, until=None):
+        """Queue a member to have their banlist timeout re-applied before it expires."""
+        until = until or getattr(member, "timed_out_until", None)
+        if not until:
+            return
+        due = until.timestamp() - RETIMEOUT_MARGIN
+        key = (member.guild.id, member.id)
+        self._timeout_due[key] = due
+        heapq.heappush(self._timeout_queue, (due, member.guild.id, member.id))
+        self._timeout_wakeup.set()
+
+    async def timeout_enforcer(self):
+        """
+        Re-apply banlist timeouts shortly before they expire.
+
+        Timeouts sit in a heap ordered by when they need renewing, so this only
+        wakes up when there is work to do instead of walking every member.
+        """
+        await self.bot.wait_until_ready()
+        while not self.bot.is_closed():
+            now = time.time()
+            while self._timeout_queue and self._timeout_queue[0][0] <= now:
+                due, guild_id, user_id = heapq.heappop(self._timeout_queue)
+                if self._timeout_due.get((guild_id, user_id)) != due:
+                    # Superseded by a newer entry or the ban was lifted
                     continue
-                severity = str(ban_info.get("severity", "3"))
+                del self._timeout_due[(guild_id, user_id)]
+                try:
+                    await self._renew_timeout(guild_id, user_id)
+                except Exception:
+                    log.exception("Error renewing banlist timeout for %s in %s", user_id, guild_id)
+            self._timeout_wakeup.clear()
+            delay = self._timeout_queue[0][0] - time.time() if self._timeout_queue else None
+            try:
+                await asyncio.wait_for(self._timeout_wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _renew_timeout(self, guild_id, user_id):
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        member = guild.get_member(user_id)
+        if member is None:
+            return
+        active_bans = self.store.active_bans(user_id)
+        if not active_bans:
+            return
+        guild_settings = await self.config.guild(guild).all()
+        if not guild_settings["enabled"]:
+            return
+        severity = str(active_bans[0].get("severity", "3"))
+        if guild_settings["actions"].get(severity, "none") != "timeout":
+            return
+        until = None
+        if self._needs_timeout(member):
+            until = discord.utils.utcnow() + timedelta(seconds=TIMEOUT_DURATION)
+            await member.timeout(until=until, reason="OpenBanlist timeout enforcement")
+        self.schedule_retimeout(member, until)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        await self.enforce_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        guild = member.guild
+        if not await self.config.guild(guild).enabled():
+            return
+
+        # The banlist is kept in memory and indexed by user id, so screening a join
+        # is a dict lookup instead of a download
+        if not await self.store.ensure_loaded():
+            return
+        log_channel_id = await self.config.guild(guild).log_channel()
+        log_channel = guild.get_channel(log_channel_id)
+
+        # Find all bans for this member, if any, by reported_id
+        user_bans = self.store.get(member.id)
+        # Only consider bans that are still active (appeal_verdict is not "accepted")
+        active_bans = [ban_info for idx, ban_info in user_bans if ban_is_active(ban_info)]
+
+        severity_map = {"1": "High", "2": "Medium", "3": "Low"}
+        actions = await self.config.guild(guild).actions()
+
+        # If there are active bans, process as before
+        if user_bans:
+            if active_bans:
+                # There is at least one active ban
+                active_ban = active_bans[0]
+                severity = str(active_ban.get("severity", "3"))
                 action = actions.get(severity, "none")
                 try:
                     if action == "kick":
                         try:
-                            embed_dm = discord.Embed(
-                                title="You're unable to stay in this server",
+                            embed = discord.Embed(
+                                title="You're unable to join this server",
                                 description="You have been removed from the server due to an active ban on OpenBanlist.",
                                 color=0xff4545
                             )
-                            embed_dm.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
-                            await member.send(embed=embed_dm)
+                            embed.add_field(name="Severity", value=f"{severity} ({severity_map.get(severity, 'Unknown')})", inline=True)
+                            embed.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
+                            await member.send(embed=embed)
                         except discord.Forbidden:
                             pass
-                        await member.kick(reason=f"Active ban detected on OpenBanlist (manual scan, severity {severity})")
+                        await member.kick(reason=f"Active ban detected on OpenBanlist (severity {severity})")
                         action_taken = "kicked"
                     elif action == "ban":
                         try:
-                            embed_dm = discord.Embed(
-                                title="You're unable to stay in this server",
+                            embed = discord.Embed(
+                                title="You're unable to join this server",
                                 description="You have been banned from the server due to an active ban on OpenBanlist.",
                                 color=0xff4545
                             )
-                            embed_dm.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
-                            await member.send(embed=embed_dm)
+                            embed.add_field(name="Severity", value=f"{severity} ({severity_map.get(severity, 'Unknown')})", inline=True)
+                            embed.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
+                            await member.send(embed=embed)
                         except discord.Forbidden:
                             pass
-                        await member.ban(reason=f"Active ban detected on OpenBanlist (manual scan, severity {severity})")
+                        await member.ban(reason=f"Active ban detected on OpenBanlist (severity {severity})")
                         action_taken = "banned"
                     elif action == "timeout":
                         try:
-                            embed_dm = discord.Embed(
+                            embed = discord.Embed(
                                 title="You have been timed out in this server",
                                 description="You have been timed out due to an active ban on OpenBanlist. You will not be able to interact in this server.",
                                 color=0xffa500
                             )
-                            embed_dm.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
-                            await member.send(embed=embed_dm)
+                            embed.add_field(name="Severity", value=f"{severity} ({severity_map.get(severity, 'Unknown')})", inline=True)
+                            embed.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
+                            await member.send(embed=embed)
                         except discord.Forbidden:
                             pass
                         try:
-                            await member.timeout(until=discord.utils.utcnow() + timedelta(seconds=TIMEOUT_DURATION), reason=f"Active ban detected on OpenBanlist (manual scan, severity {severity})")
+                            until = discord.utils.utcnow() + timedelta(seconds=TIMEOUT_DURATION)
+                            await member.timeout(until=until, reason=f"Active ban detected on OpenBanlist (severity {severity})")
+                            self.schedule_retimeout(member, until)
                             action_taken = "timed out"
                         except Exception:
                             action_taken = "failed to timeout"
                     else:
                         action_taken = "none"
-                    found.append((member, ban_info, action_taken))
                 except discord.Forbidden:
-                    failed.append((member, ban_info))
-                    continue
+                    action_taken = "failed due to permissions"
 
-                # Log each action if log_channel is set
                 if log_channel:
                     embed = discord.Embed(
-                        title="Banlist match found (manual scan)",
-                        description=f"{member.mention} ({member.id}) is actively listed on OpenBanlist.",
+                        title="Banlist match found",
+                        description=f"{member.mention} ({member.id}) joined and is actively listed on OpenBanlist.",
                         color=0xff4545
                     )
                     embed.add_field(name="Action taken", value=action_taken, inline=False)
-                    embed.add_field(name="Ban reason", value=ban_info.get("ban_reason", "No reason provided"), inline=False)
-                    embed.add_field(name="Context", value=ban_info.get("context", "No context provided"), inline=False)
+                    embed.add_field(name="Ban reason", value=active_ban.get("ban_reason", "No reason provided"), inline=False)
+                    embed.add_field(name="Context", value=active_ban.get("context", "No context provided"), inline=False)
                     embed.add_field(name="Severity", value=f"{severity} ({severity_map.get(severity, 'Unknown')})", inline=True)
                     # Process reporter name if available
-                    reporter_id = ban_info.get("reporter_id", "Unknown")
-                    reporter_name = ban_info.get("reporter_name", None)
+                    reporter_id = active_ban.get("reporter_id", "Unknown")
+                    reporter_name = active_ban.get("reporter_name", None)
                     if reporter_name:
                         reporter_display = f"{reporter_name} (<@{reporter_id}>)"
                     else:
                         reporter_display = f"<@{reporter_id}>"
                     embed.add_field(name="Reporter", value=reporter_display, inline=False)
-                    approver_id = ban_info.get("approver_id", "Unknown")
-                    approver_name = ban_info.get("approver_name", None)
+                    approver_id = active_ban.get("approver_id", "Unknown")
+                    approver_name = active_ban.get("approver_name", None)
                     if approver_name:
                         approver_display = f"{approver_name} (<@{approver_id}>)"
                     else:
                         approver_display = f"<@{approver_id}>"
                     embed.add_field(name="Approver", value=approver_display, inline=False)
-                    embed.add_field(name="Appealable", value=str(ban_info.get("appealable", False)), inline=False)
-                    if ban_info.get("appealed", False):
-                        appeal_info = ban_info.get("appeal_info", {})
+                    embed.add_field(name="Appealable", value=str(active_ban.get("appealable", False)), inline=False)
+                    if active_ban.get("appealed", False):
+                        appeal_info = active_ban.get("appeal_info", {})
                         appeal_verdict = appeal_info.get("appeal_verdict", "")
                         if not appeal_verdict:
                             appeal_status = "Pending"
                         elif appeal_verdict == "accepted":
-                            appeal_status = "Accepted"
+                            # If the appeal is accepted, this ban should not be considered active, so skip showing as active
+                            # Instead, fall through to the else block below
+                            active_bans = []
                         elif appeal_verdict == "denied":
                             appeal_status = "Denied"
                         else:
                             appeal_status = "Unknown"
-                        embed.add_field(name="Appeal status", value=appeal_status, inline=True)
-                        embed.add_field(name="Appeal verdict", value=appeal_verdict or "No verdict provided", inline=False)
-                        appeal_reason = appeal_info.get("appeal_reason", "")
-                        if appeal_reason:
-                            embed.add_field(name="Appeal reason", value=appeal_reason, inline=False)
-                    evidence = ban_info.get("evidence", "")
-                    if evidence:
-                        embed.set_image(url=evidence)
-                    report_date = ban_info.get("report_date", "Unknown")
-                    ban_date = ban_info.get("ban_date", "Unknown")
-                    if report_date != "Unknown":
-                        embed.add_field(name="Report date", value=f"<t:{report_date}:F>", inline=False)
-                    else:
-                        embed.add_field(name="Report date", value="Unknown", inline=False)
-                    if ban_date != "Unknown":
-                        embed.add_field(name="Ban date", value=f"<t:{ban_date}:F>", inline=False)
-                    else:
-                        embed.add_field(name="Ban date", value="Unknown", inline=False)
-                    await log_channel.send(embed=embed)
-
-        summary_embed = discord.Embed(
-            title="OpenBanlist scan complete",
-            color=0x2bbd8e if found or failed else 0xfffffe
-        )
-        summary_embed.add_field(name="Total scanned", value=str(len(guild.members)), inline=True)
-        summary_embed.add_field(name="Matches found", value=str(len(found)), inline=True)
-        summary_embed.add_field(name="Failed actions", value=str(len(failed)), inline=True)
-        if found:
-            summary_embed.add_field(
-                name="Users affected",
-                value="\n".join(f"{m.mention} ({m.id}) - {a}" for m, _, a in found)[:1024],
-                inline=False
-            )
-        if failed:
-            summary_embed.add_field(
-                name="Failed to act on",
-                value="\n".join(f"{m.mention} ({m.id})" for m, _ in failed)[:1024],
-                inline=False
-            )
-        await ctx.send(embed=summary_embed)
-
-    async def update_banlist_periodically(self):
-        while True:
-            await self.update_banlist()
-            await asyncio.sleep(86400)  # 24 hours
-
-    async def update_banlist(self):
-        async with self.session.get(self.banlist_url) as response:
-            if response.status == 200:
-                banlist_data = await response.json()
-                for guild in self.bot.guilds:
-                    if await self.config.guild(guild).enabled():
-                        await self.enforce_banlist(guild, banlist_data)
-
-    async def enforce_banlist(self, guild, banlist_data):
-        actions = await self.config.guild(guild).actions()
-        if all(a == "none" for a in actions.values()):
-            return
-
-        # Build a dict by reported_id for fast lookup
-        ban_ids = {int(ban_info.get("reported_id", 0)): ban_info for ban_info in banlist_data.values()}
-        severity_map = {"1": "High", "2": "Medium", "3": "Low"}
-
-        for member in guild.members:
-            ban_info = ban_ids.get(member.id)
-            if ban_info:
-                appeal_info = ban_info.get("appeal_info", {})
-                if appeal_info.get("appeal_verdict", "").lower() == "accepted":
-                    continue
-                severity = str(ban_info.get("severity", "3"))
-                action = actions.get(severity, "none")
-                try:
-                    if action == "kick":
-                        await member.kick(reason=f"Active ban detected on OpenBanlist (severity {severity})")
-                    elif action == "ban":
-                        await member.ban(reason=f"Active ban detected on OpenBanlist (severity {severity})")
-                    elif action == "timeout":
-                        try:
-                            await member.timeout(until=discord.utils.utcnow() + timedelta(seconds=TIMEOUT_DURATION), reason=f"Active ban detected on OpenBanlist (severity {severity})")
-                        except Exception:
-                            pass
-                except discord.Forbidden:
-                    pass
-
-    async def timeout_enforcer(self):
-        await self.bot.wait_until_ready()
-        while not self.bot.is_closed():
-            try:
-                for guild in self.bot.guilds:
-                    enabled = await self.config.guild(guild).enabled()
-                    if not enabled:
-                        continue
-                    actions = await self.config.guild(guild).actions()
-                    if all(a == "none" for a in actions.values()):
-                        continue
-                    log_channel_id = await self.config.guild(guild).log_channel()
-                    log_channel = guild.get_channel(log_channel_id) if log_channel_id else None
-
-                    async with self.session.get(self.banlist_url) as response:
-                        if response.status != 200:
-                            continue
-                        banlist_data = await response.json()
-                        ban_ids = {int(ban_info.get("reported_id", 0)): ban_info for ban_info in banlist_data.values()}
-                        severity_map = {"1": "High", "2": "Medium", "3": "Low"}
-                        for member in guild.members:
-                            if member.bot:
-                                continue
-                            ban_info = ban_ids.get(member.id)
-                            if not ban_info:
-                                continue
-                            appeal_info = ban_info.get("appeal_info", {})
-                            if appeal_info.get("appeal_verdict", "").lower() == "accepted":
-                                continue
-                            severity = str(ban_info.get("severity", "3"))
-                            action = actions.get(severity, "none")
-                            if action == "timeout":
-                                # Only re-timeout if not already timed out for the max duration
-                                try:
-                                    if hasattr(member, "timed_out_until") and member.timed_out_until:
-                                        # If timeout is expiring in less than 1 day, re-apply
-                                        if (member.timed_out_until - discord.utils.utcnow()).total_seconds() < 24 * 60 * 60:
-                                            await member.timeout(until=discord.utils.utcnow() + timedelta(seconds=TIMEOUT_DURATION), reason="OpenBanlist timeout enforcement")
-                                    else:
-                                        await member.timeout(until=discord.utils.utcnow() + timedelta(seconds=TIMEOUT_DURATION), reason="OpenBanlist timeout enforcement")
-                                except Exception:
-                                    pass
-            except Exception:
-                pass
-            await asyncio.sleep(60 * 60)  # Run every hour
-
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
-        guild = member.guild
-        if not await self.config.guild(guild).enabled():
-            return
-
-        async with self.session.get(self.banlist_url) as response:
-            if response.status == 200:
-                banlist_data = await response.json()
-                log_channel_id = await self.config.guild(guild).log_channel()
-                log_channel = guild.get_channel(log_channel_id)
-
-                # Find all bans for this member, if any, by reported_id
-                user_bans = []
-                banlist_items = list(banlist_data.items())
-                for idx, (ban_key, ban_info) in enumerate(banlist_items, 1):
-                    if int(ban_info.get("reported_id", 0)) == member.id:
-                        user_bans.append((idx, ban_info))
-                # Only consider bans that are still active (appeal_verdict is not "accepted")
-                active_bans = [ban_info for idx, ban_info in user_bans if ban_info.get("appeal_info", {}).get("appeal_verdict", "").lower() != "accepted"]
-
-                severity_map = {"1": "High", "2": "Medium", "3": "Low"}
-                actions = await self.config.guild(guild).actions()
-
-                # If there are active bans, process as before
-                if user_bans:
+                        if active_bans:
+                            embed.add_field(name="Appeal status", value=appeal_status, inline=True)
+                            embed.add_field(name="Appeal verdict", value=appeal_verdict or "No verdict provided", inline=False)
+                            appeal_reason = appeal_info.get("appeal_reason", "")
+                            if appeal_reason:
+                                embed.add_field(name="Appeal reason", value=appeal_reason, inline=False)
                     if active_bans:
-                        # There is at least one active ban
-                        active_ban = active_bans[0]
-                        severity = str(active_ban.get("severity", "3"))
-                        action = actions.get(severity, "none")
-                        try:
-                            if action == "kick":
-                                try:
-                                    embed = discord.Embed(
-                                        title="You're unable to join this server",
-                                        description="You have been removed from the server due to an active ban on OpenBanlist.",
-                                        color=0xff4545
-                                    )
-                                    embed.add_field(name="Severity", value=f"{severity} ({severity_map.get(severity, 'Unknown')})", inline=True)
-                                    embed.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
-                                    await member.send(embed=embed)
-                                except discord.Forbidden:
-                                    pass
-                                await member.kick(reason=f"Active ban detected on OpenBanlist (severity {severity})")
-                                action_taken = "kicked"
-                            elif action == "ban":
-                                try:
-                                    embed = discord.Embed(
-                                        title="You're unable to join this server",
-                                        description="You have been banned from the server due to an active ban on OpenBanlist.",
-                                        color=0xff4545
-                                    )
-                                    embed.add_field(name="Severity", value=f"{severity} ({severity_map.get(severity, 'Unknown')})", inline=True)
-                                    embed.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
-                                    await member.send(embed=embed)
-                                except discord.Forbidden:
-                                    pass
-                                await member.ban(reason=f"Active ban detected on OpenBanlist (severity {severity})")
-                                action_taken = "banned"
-                            elif action == "timeout":
-                                try:
-                                    embed = discord.Embed(
-                                        title="You have been timed out in this server",
-                                        description="You have been timed out due to an active ban on OpenBanlist. You will not be able to interact in this server.",
-                                        color=0xffa500
-                                    )
-                                    embed.add_field(name="Severity", value=f"{severity} ({severity_map.get(severity, 'Unknown')})", inline=True)
-                                    embed.add_field(name="Appeal", value="To appeal, please visit [openbanlist.cc/appeal](https://openbanlist.cc/appeal).", inline=False)
-                                    await member.send(embed=embed)
-                                except discord.Forbidden:
-                                    pass
-                                try:
-                                    await member.timeout(until=discord.utils.utcnow() + timedelta(seconds=TIMEOUT_DURATION), reason=f"Active ban detected on OpenBanlist (severity {severity})")
-                                    action_taken = "timed out"
-                                except Exception:
-                                    action_taken = "failed to timeout"
-                            else:
-                                action_taken = "none"
-                        except discord.Forbidden:
-                            action_taken = "failed due to permissions"
-
-                        if log_channel:
-                            embed = discord.Embed(
-                                title="Banlist match found",
-                                description=f"{member.mention} ({member.id}) joined and is actively listed on OpenBanlist.",
-                                color=0xff4545
-                            )
-                            embed.add_field(name="Action taken", value=action_taken, inline=False)
-                            embed.add_field(name="Ban reason", value=active_ban.get("ban_reason", "No reason provided"), inline=False)
-                            embed.add_field(name="Context", value=active_ban.get("context", "No context provided"), inline=False)
-                            embed.add_field(name="Severity", value=f"{severity} ({severity_map.get(severity, 'Unknown')})", inline=True)
-                            # Process reporter name if available
-                            reporter_id = active_ban.get("reporter_id", "Unknown")
-                            reporter_name = active_ban.get("reporter_name", None)
-                            if reporter_name:
-                                reporter_display = f"{reporter_name} (<@{reporter_id}>)"
-                            else:
-                                reporter_display = f"<@{reporter_id}>"
-                            embed.add_field(name="Reporter", value=reporter_display, inline=False)
-                            approver_id = active_ban.get("approver_id", "Unknown")
-                            approver_name = active_ban.get("approver_name", None)
-                            if approver_name:
-                                approver_display = f"{approver_name} (<@{approver_id}>)"
-                            else:
-                                approver_display = f"<@{approver_id}>"
-                            embed.add_field(name="Approver", value=approver_display, inline=False)
-                            embed.add_field(name="Appealable", value=str(active_ban.get("appealable", False)), inline=False)
-                            if active_ban.get("appealed", False):
-                                appeal_info = active_ban.get("appeal_info", {})
-                                appeal_verdict = appeal_info.get("appeal_verdict", "")
-                                if not appeal_verdict:
-                                    appeal_status = "Pending"
-                                elif appeal_verdict == "accepted":
-                                    # If the appeal is accepted, this ban should not be considered active, so skip showing as active
-                                    # Instead, fall through to the else block below
-                                    active_bans = []
-                                elif appeal_verdict == "denied":
-                                    appeal_status = "Denied"
-                                else:
-                                    appeal_status = "Unknown"
-                                if active_bans:
-                                    embed.add_field(name="Appeal status", value=appeal_status, inline=True)
-                                    embed.add_field(name="Appeal verdict", value=appeal_verdict or "No verdict provided", inline=False)
-                                    appeal_reason = appeal_info.get("appeal_reason", "")
-                                    if appeal_reason:
-                                        embed.add_field(name="Appeal reason", value=appeal_reason, inline=False)
-                            if active_bans:
-                                evidence = active_ban.get("evidence", "")
-                                if evidence:
-                                    embed.set_image(url=evidence)
-                                report_date = active_ban.get("report_date", "Unknown")
-                                ban_date = active_ban.get("ban_date", "Unknown")
-                                if report_date != "Unknown":
-                                    embed.add_field(name="Report date", value=f"<t:{report_date}:F>", inline=False)
-                                else:
-                                    embed.add_field(name="Report date", value="Unknown", inline=False)
-                                if ban_date != "Unknown":
-                                    embed.add_field(name="Ban date", value=f"<t:{ban_date}:F>", inline=False)
-                                else:
-                                    embed.add_field(name="Ban date", value="Unknown", inline=False)
-                                await log_channel.send(embed=embed)
-                                return  # Only send the active ban embed if still valid
-                    # If we get here, either there are no active bans, or the only ban(s) have an accepted appeal
-                    if log_channel:
-                        embed = discord.Embed(
-                            title="User join screened",
-                            description=f"**{member.mention}** ({member.id}) joined the server and has a punishment history on OpenBanlist",
-                            color=discord.Color.orange()
-                        )
-                        # Add a single field for prior bans as per instructions
-                        prior_bans_lines = []
-                        for idx, ban_info in user_bans:
-                            reason = ban_info.get("ban_reason", "No reason provided")
-                            ban_date = ban_info.get("ban_date", None)
-                            severity = str(ban_info.get("severity", "3"))
-                            if ban_date and ban_date != "Unknown":
-                                try:
-                                    # ban_date is a unix timestamp, so use Discord dynamic timestamp
-                                    date_str = f"<t:{int(ban_date)}:F>"
-                                except Exception:
-                                    date_str = str(ban_date)
-                            else:
-                                date_str = "Unknown"
-                            prior_bans_lines.append(f"`#{idx}` for **{reason}** (Severity {severity_map.get(severity, 'Unknown')}) on **{date_str}**")
-                        if prior_bans_lines:
-                            embed.add_field(
-                                name="Prior bans",
-                                value="\n".join(prior_bans_lines),
-                                inline=False
-                            )
-                        embed.set_footer(text="Powered by OpenBanlist, a BeeHive service | openbanlist.cc")
-                        await log_channel.send(embed=embed)
-                else:
-                    if log_channel:
-                        embed = discord.Embed(
-                            title="User join screened",
-                            description=f"**{member.mention}** ({member.id}) joined the server and passed all banlist checks",
-                            color=0x2bbd8e
-                        )
-                        embed.set_footer(text="Powered by OpenBanlist, a BeeHive service | openbanlist.cc")
+                        evidence = active_ban.get("evidence", "")
+                        if evidence:
+                            embed.set_image(url=evidence)
+                        report_date = active_ban.get("report_date", "Unknown")
+                        ban_date = active_ban.get("ban_date", "Unknown")
+                        if report_date != "Unknown":
+                            embed.add_field(name="Report date", value=f"<t:{report_date}:F>", inline=False)
+                        else:
+                            embed.add_field(name="Report date", value="Unknown", inline=False)
+                        if ban_date != "Unknown":
+                            embed.add_field(name="Ban date", value=f"<t:{ban_date}:F>", inline=False)
+                        else:
+                            embed.add_field(name="Ban date", value="Unknown", inline=False)
                         await log_channel.send(embed=embed)
+                        return  # Only send the active ban embed if still valid
+            # If we get here, either there are no active bans, or the only ban(s) have an accepted appeal
+            if log_channel:
+                embed = discord.Embed(
+                    title="User join screened",
+                    description=f"**{member.mention}** ({member.id}) joined the server and has a punishment history on OpenBanlist",
+                    color=discord.Color.orange()
+                )
+                # Add a single field for prior bans as per instructions
+                prior_bans_lines = []
+                for idx, ban_info in user_bans:
+                    reason = ban_info.get("ban_reason", "No reason provided")
+                    ban_date = ban_info.get("ban_date", None)
+                    severity = str(ban_info.get("severity", "3"))
+                    if ban_date and ban_date != "Unknown":
+                        try:
+                            # ban_date is a unix timestamp, so use Discord dynamic timestamp
+                            date_str = f"<t:{int(ban_date)}:F>"
+                        except Exception:
+                            date_str = str(ban_date)
+                    else:
+                        date_str = "Unknown"
+                    prior_bans_lines.append(f"`#{idx}` for **{reason}** (Severity {severity_map.get(severity, 'Unknown')}) on **{date_str}**")
+                if prior_bans_lines:
+                    embed.add_field(
+                        name="Prior bans",
+                        value="\n".join(prior_bans_lines),
+                        inline=False
+                    )
+                embed.set_footer(text="Powered by OpenBanlist, a BeeHive service | openbanlist.cc")
+                await log_channel.send(embed=embed)
+        else:
+            if log_channel:
+                embed = discord.Embed(
+                    title="User join screened",
+                    description=f"**{member.mention}** ({member.id}) joined the server and passed all banlist checks",
+                    color=0x2bbd8e
+                )
+                embed.set_footer(text="Powered by OpenBanlist, a BeeHive service | openbanlist.cc")
+                await log_channel.send(embed=embed)
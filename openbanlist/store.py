@@ -0,0 +1,210 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import aiohttp
+
+log = logging.getLogger("red.beehive-cogs.openbanlist")
+
+# (position in the banlist starting at 1, ban info)
+BanEntry = Tuple[int, dict]
+
+
+def ban_is_active(ban_info: dict) -> bool:
+    """A ban stops being active once its appeal has been accepted."""
+    appeal_info = ban_info.get("appeal_info") or {}
+    return str(appeal_info.get("appeal_verdict", "")).lower() != "accepted"
+
+
+def build_index(banlist_data: dict) -> Dict[int, List[BanEntry]]:
+    """Group every ban by the reported user id."""
+    index: Dict[int, List[BanEntry]] = {}
+    for idx, ban_info in enumerate(banlist_data.values(), 1):
+        try:
+            reported_id = int(ban_info.get("reported_id", 0))
+        except (TypeError, ValueError):
+            continue
+        index.setdefault(reported_id, []).append((idx, ban_info))
+    return index
+
+
+def active_severities(index: Dict[int, List[BanEntry]]) -> Dict[int, str]:
+    """The severity of the first active ban for every user that has one."""
+    active = {}
+    for user_id, entries in index.items():
+        for _, ban_info in entries:
+            if ban_is_active(ban_info):
+                active[user_id] = str(ban_info.get("severity", "3"))
+                break
+    return active
+
+
+class BanlistDiff:
+    """
+    What changed between two copies of the banlist.
+    """
+
+    __slots__ = ("added", "lifted", "severity_changed")
+
+    def __init__(self, old: Dict[int, str], new: Dict[int, str]):
+        # users with a new active ban
+        self.added: Set[int] = new.keys() - old.keys()
+        # users whose bans are no longer active, usually an accepted appeal
+        self.lifted: Set[int] = old.keys() - new.keys()
+        self.severity_changed: Set[int] = {
+            user_id for user_id in new.keys() & old.keys() if new[user_id] != old[user_id]
+        }
+
+    @property
+    def affected(self) -> Set[int]:
+        """Users that may need an action applied."""
+        return self.added | self.severity_changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.lifted or self.severity_changed)
+
+    def __repr__(self) -> str:
+        return (
+            f"<BanlistDiff added={len(self.added)} lifted={len(self.lifted)} "
+            f"severity_changed={len(self.severity_changed)}>"
+        )
+
+
+class BanlistStore:
+    """
+    A single shared copy of the OpenBanlist.
+
+    The banlist is refreshed with conditional requests so an unchanged list costs
+    a 304 instead of a full download, the last good copy is kept on disk so it is
+    available immediately after a restart, and lookups go through an index keyed
+    by user id so nothing on the join path touches the network.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, url: str, path: Path):
+        self.session = session
+        self.url = url
+        self.path = path
+        self.data: dict = {}
+        self.index: Dict[int, List[BanEntry]] = {}
+        self.active: Dict[int, str] = {}
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.fetched_at: float = 0.0
+        self.loaded = False
+        self._lock = asyncio.Lock()
+
+    def get(self, user_id: int) -> List[BanEntry]:
+        """Every ban for a user, active or not."""
+        return self.index.get(user_id, [])
+
+    def active_bans(self, user_id: int) -> List[dict]:
+        return [ban_info for _, ban_info in self.get(user_id) if ban_is_active(ban_info)]
+
+    def active_user_ids(self) -> Set[int]:
+        return set(self.active)
+
+    async def ensure_loaded(self) -> bool:
+        """Make sure there is some copy of the banlist, from disk or the network."""
+        if self.loaded:
+            return True
+        async with self._lock:
+            if not self.loaded:
+                await self._load_snapshot()
+        if not self.loaded:
+            await self.refresh()
+        return self.loaded
+
+    async def refresh(self) -> Optional[BanlistDiff]:
+        """
+        Fetch the banlist if it has changed upstream.
+
+        Returns the difference to the previous copy when new data was loaded,
+        otherwise `None`. Concurrent callers share the same request.
+        """
+        if self._lock.locked():
+            async with self._lock:
+                return None
+        async with self._lock:
+            headers = {}
+            if self.loaded and self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.loaded and self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+            try:
+                async with self.session.get(self.url, headers=headers) as response:
+                    if response.status == 304:
+                        self.fetched_at = time.time()
+                        return None
+                    if response.status != 200:
+                        log.warning("Failed to fetch the banlist, status %s", response.status)
+                        return None
+                    raw = await response.read()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                log.warning("Failed to fetch the banlist", exc_info=True)
+                return None
+            try:
+                data, index, active = await asyncio.to_thread(self._parse, raw)
+            except ValueError:
+                log.warning("The banlist response was not valid JSON")
+                return None
+            diff = BanlistDiff(self.active, active)
+            self._swap(data, index, active)
+            self.etag = etag
+            self.last_modified = last_modified
+            self.fetched_at = time.time()
+            await asyncio.to_thread(self._write_snapshot, raw)
+            log.debug("Banlist refreshed: %r", diff)
+            return diff
+
+    def _swap(self, data: dict, index: Dict[int, List[BanEntry]], active: Dict[int, str]) -> None:
+        self.data = data
+        self.index = index
+        self.active = active
+        self.loaded = True
+
+    @staticmethod
+    def _parse(raw: bytes) -> Tuple[dict, Dict[int, List[BanEntry]], Dict[int, str]]:
+        data = json.loads(raw)
+        index = build_index(data)
+        return data, index, active_severities(index)
+
+    async def _load_snapshot(self) -> None:
+        try:
+            snapshot = await asyncio.to_thread(self._read_snapshot)
+        except (OSError, ValueError):
+            log.warning("Could not read the saved banlist snapshot", exc_info=True)
+            return
+        if snapshot is None:
+            return
+        meta, data, index, active = snapshot
+        self._swap(data, index, active)
+        self.etag = meta.get("etag")
+        self.last_modified = meta.get("last_modified")
+        self.fetched_at = meta.get("fetched_at", 0.0)
+
+    def _read_snapshot(self):
+        banlist_file = self.path / "banlist.json"
+        meta_file = self.path / "banlist_meta.json"
+        if not banlist_file.exists():
+            return None
+        data, index, active = self._parse(banlist_file.read_bytes())
+        meta = json.loads(meta_file.read_text()) if meta_file.exists() else {}
+        return meta, data, index, active
+
+    def _write_snapshot(self, raw: bytes) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self.path / "banlist.json.tmp"
+        tmp.write_bytes(raw)
+        os.replace(tmp, self.path / "banlist.json")
+        meta = {
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "fetched_at": self.fetched_at,
+        }
+        (self.path / "banlist_meta.json").write_text(json.dumps(meta))
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+import aiohttp  # type: ignore
+
+log = logging.getLogger("red.beehive-cogs.weatherpro")
+
+RESPONSE_CACHE_SIZE = 512  # Most responses kept at once, least recently used go first
+RESPONSE_DEFAULT_TTL = 5 * 60  # Seconds a response is kept when upstream gives no freshness headers
+RESPONSE_MAX_TTL = 60 * 60  # Never trust a response for longer than this, whatever the headers say
+POINTS_TTL = 30 * 24 * 60 * 60  # Seconds a zip code's NWS grid metadata is trusted for
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+# (HTTP status, parsed body), the body is None unless the status is 200
+Response = Tuple[int, Optional[dict]]
+REQUEST_FAILED = 0  # Status reported when no HTTP response came back at all
+
+
+def freshness(headers) -> float:
+    """Seconds a response may be reused for according to its Cache-Control or Expires headers."""
+    cache_control = headers.get("Cache-Control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = MAX_AGE_PATTERN.search(cache_control)
+    if match:
+        age = headers.get("Age", "0")
+        ttl = int(match.group(1)) - (int(age) if age.isdigit() else 0)
+    elif headers.get("Expires"):
+        try:
+            expires = parsedate_to_datetime(headers["Expires"])
+            date = parsedate_to_datetime(headers["Date"]) if headers.get("Date") else None
+        except (TypeError, ValueError):
+            return 0
+        ttl = (expires - date).total_seconds() if date else expires.timestamp() - time.time()
+    else:
+        ttl = RESPONSE_DEFAULT_TTL
+    return max(0, min(ttl, RESPONSE_MAX_TTL))
+
+
+class ResponseCache:
+    """
+    A TTL and LRU bounded cache of JSON GET responses, keyed by URL.
+
+    Forecast and nowcast URLs carry the location, so popular zip codes share
+    entries. Each entry lives as long as upstream's Cache-Control or Expires
+    headers allow, and callers asking for a URL that is already being fetched
+    wait on that request instead of starting another. Failed requests are not
+    cached.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.session = session
+        self.maxsize = maxsize
+        # url -> (expiry, body), ordered from least to most recently used
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def get(self, url: str) -> Optional[dict]:
+        """A fresh cached body for the URL, without fetching anything."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        expires, body = entry
+        if expires <= monotonic():
+            del self._entries[url]
+            return None
+        self._entries.move_to_end(url)
+        return body
+
+    async def fetch(self, url: str) -> Response:
+        body = self.get(url)
+        if body is not None:
+            return 200, body
+        future = self._pending.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(url))
+            self._pending[url] = future
+            future.add_done_callback(lambda _: self._pending.pop(url, None))
+        # Shield so one cancelled waiter does not cancel the request for the others
+        return await asyncio.shield(future)
+
+    async def _fetch(self, url: str) -> Response:
+        try:
+            async with self.session.get(url) as response:
+                if response.status != 200:
+                    return response.status, None
+                body = await response.json(content_type=None)
+                ttl = freshness(response.headers)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            log.warning("Failed to fetch %s", url, exc_info=True)
+            return REQUEST_FAILED, None
+        if ttl > 0 and body:
+            self._entries[url] = (monotonic() + ttl, body)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return 200, body
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class PointsStore:
+    """
+    NWS grid metadata (`/points/{lat},{lon}` properties) per zip code, kept in a JSON file.
+
+    A zip code's forecast office and grid practically never change, so each
+    one is resolved once a month at most and survives restarts. Concurrent
+    lookups of the same zip code share one request.
+    """
+
+    def __init__(self, path: Path, session: aiohttp.ClientSession, ttl: float = POINTS_TTL):
+        self.path = path
+        self.session = session
+        self.ttl = ttl
+        # zip code -> {"resolved": timestamp, "properties": {...}}
+        self._points: Optional[Dict[str, dict]] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._load_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    async def _ensure_loaded(self) -> Dict[str, dict]:
+        async with self._load_lock:
+            if self._points is None:
+                self._points = await asyncio.to_thread(self._read)
+        return self._points
+
+    def _read(self) -> Dict[str, dict]:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    async def resolve(self, zip_code: str, latitude: float, longitude: float) -> Response:
+        points = await self._ensure_loaded()
+        entry = points.get(zip_code)
+        if entry is not None and entry["resolved"] + self.ttl > time.time():
+            return 200, entry["properties"]
+        future = self._pending.get(zip_code)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(zip_code, latitude, longitude))
+            self._pending[zip_code] = future
+            future.add_done_callback(lambda _: self._pending.pop(zip_code, None))
+        return await asyncio.shield(future)
+
+    async def _fetch(self, zip_code: str, latitude: float, longitude: float) -> Response:
+        url = f"https://api.weather.gov/points/{latitude:.4f},{longitude:.4f}"
+        try:
+            async with self.session.get(url) as response:
+                if response.status != 200:
+                    return response.status, None
+                data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            log.warning("Failed to fetch %s", url, exc_info=True)
+            return REQUEST_FAILED, None
+        properties = {
+            key: value
+            for key, value in data.get("properties", {}).items()
+            if key in ("forecast", "forecastHourly", "forecastGridData", "forecastZone", "county", "gridId", "gridX", "gridY")
+        }
+        self._points[zip_code] = {"resolved": time.time(), "properties": properties}
+        async with self._write_lock:
+            payload = json.dumps(self._points)
+            try:
+                await asyncio.to_thread(self._write, payload)
+            except OSError:
+                # Still cached in memory, the next resolved zip code writes it again
+                pass
+        return 200, properties
+
+    def _write(self, payload: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(payload)
+        os.replace(tmp, self.path)
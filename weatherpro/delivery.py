@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+import discord  # type: ignore
+
+log = logging.getLogger("red.beehive-cogs.weatherpro")
+
+DM_CONCURRENCY = 5  # Direct messages in flight at once
+DM_TIMEOUT = 30  # Seconds before a direct message is given up on
+SENT_ALERT_GRACE = 60 * 60  # Seconds an alert id is remembered past its expiry, NWS can list alerts a little late
+
+
+class SentAlertStore:
+    """
+    Which users each alert has been sent to, kept until the alert expires.
+
+    Lookups are a dict and set membership test, and entries for expired alerts
+    are dropped by `expire`, so the store only ever holds the alerts that are
+    currently active. It is saved to a JSON file so a restart does not resend
+    alerts.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.loaded = False
+        # alert id -> (forget after timestamp, user ids it was sent to)
+        self._alerts: Dict[str, Tuple[float, Set[int]]] = {}
+        self._dirty = False
+
+    async def load(self) -> None:
+        try:
+            raw = await asyncio.to_thread(self.path.read_text)
+            saved = json.loads(raw)
+        except FileNotFoundError:
+            saved = {}
+        except (OSError, ValueError):
+            log.warning("Ignoring unreadable sent alerts file %s", self.path)
+            saved = {}
+        for alert_id, (expires, user_ids) in saved.items():
+            self._alerts[alert_id] = (expires, set(user_ids))
+        self.loaded = True
+
+    def was_sent(self, alert_id: str, user_id: int) -> bool:
+        entry = self._alerts.get(alert_id)
+        return entry is not None and user_id in entry[1]
+
+    def mark_sent(self, alert_id: str, user_id: int, expires: float) -> None:
+        entry = self._alerts.get(alert_id)
+        if entry is None:
+            entry = self._alerts[alert_id] = (expires + SENT_ALERT_GRACE, set())
+        entry[1].add(user_id)
+        self._dirty = True
+
+    def expire(self) -> None:
+        now = time.time()
+        for alert_id in [alert_id for alert_id, (expires, _) in self._alerts.items() if expires <= now]:
+            del self._alerts[alert_id]
+            self._dirty = True
+
+    async def save(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = json.dumps({alert_id: [expires, list(user_ids)] for alert_id, (expires, user_ids) in self._alerts.items()})
+        try:
+            await asyncio.to_thread(self._write, data)
+        except OSError:
+            self._dirty = True
+            log.exception("Could not save sent alerts")
+
+    def _write(self, data: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(data)
+        os.replace(tmp, self.path)
+
+
+class DMSender:
+    """
+    Sends direct messages a few at a time, so one slow or closed DM does not hold up the rest.
+
+    discord.py already waits out Discord's rate limits per route, this bounds
+    how many messages queue on them and how long any one of them may take.
+    """
+
+    def __init__(self, concurrency: int = DM_CONCURRENCY, timeout: float = DM_TIMEOUT):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.timeout = timeout
+
+    async def send(self, user, **kwargs) -> Optional[bool]:
+        """
+        True once delivered, None if Discord rejected it in a way worth retrying
+        later, or False if it should not be retried. That is when the user does
+        not accept DMs from the bot, or when sending timed out and the message
+        may already have been delivered.
+        """
+        async with self._semaphore:
+            try:
+                await asyncio.wait_for(user.send(**kwargs), timeout=self.timeout)
+            except discord.Forbidden:
+                return False
+            except asyncio.TimeoutError:
+                log.warning("Timed out sending a weather DM to %s", user.id)
+                return False
+            except discord.HTTPException:
+                log.warning("Failed to send a weather DM to %s", user.id, exc_info=True)
+                return None
+        return True
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+import aiohttp  # type: ignore
+
+log = logging.getLogger("red.beehive-cogs.weatherpro")
+
+POLL_CONCURRENCY = 8  # Locations fetched from NWS at the same time
+
+
+class ConditionalPoller:
+    """
+    Polls JSON endpoints with conditional requests, at most `concurrency` at a time.
+
+    The validators and body of each URL's last response are kept, so a poll
+    that comes back `304 Not Modified` costs NWS next to nothing and hands back
+    the body seen last time. URLs not polled in a sweep are forgotten by
+    `retain`, which keeps this bounded to the locations that are still in use.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, concurrency: int = POLL_CONCURRENCY):
+        self.session = session
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # url -> (ETag, Last-Modified, parsed body)
+        self._last: Dict[str, Tuple[Optional[str], Optional[str], dict]] = {}
+
+    async def poll(self, url: str) -> Optional[dict]:
+        """The current body for `url`, or `None` if it could not be fetched."""
+        headers = {"Accept": "application/geo+json"}
+        last = self._last.get(url)
+        if last is not None:
+            etag, last_modified, _ = last
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        async with self._semaphore:
+            try:
+                async with self.session.get(url, headers=headers) as response:
+                    if response.status == 304 and last is not None:
+                        return last[2]
+                    if response.status != 200:
+                        return None
+                    data = await response.json(content_type=None)
+                    self._last[url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"), data)
+                    return data
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                log.warning("Failed to poll %s", url, exc_info=True)
+                return None
+
+    def retain(self, urls: Iterable[str]) -> None:
+        """Forget every URL not in `urls`."""
+        keep = set(urls)
+        for url in [url for url in self._last if url not in keep]:
+            del self._last[url]
@@ -1,10 +1,18 @@
 import discord #type: ignore
 import aiohttp #type: ignore
 import asyncio
-import csv
+import time
+from collections import defaultdict
 from datetime import datetime
 from redbot.core import commands, Config #type: ignore
-from redbot.core.data_manager import bundled_data_path #type: ignore
+from redbot.core.data_manager import bundled_data_path, cog_data_path #type: ignore
+
+from .cache import PointsStore, ResponseCache
+from .delivery import DMSender, SentAlertStore
+from .polling import ConditionalPoller
+from .zipindex import ZipIndex
+
+LEGACY_SENT_ALERT_TTL = 7 * 24 * 60 * 60  # Seconds alert ids without a known expiry are remembered for
 
 class Weather(commands.Cog):
     """It's beautiful out there"""
@@ -12,13 +20,18 @@ class Weather(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.session = aiohttp.ClientSession()
+        self.alert_poller = ConditionalPoller(self.session)
+        self.responses = ResponseCache(self.session)
+        self.points = PointsStore(cog_data_path(self) / "points.json", self.session)
+        self.sent_alerts = SentAlertStore(cog_data_path(self) / "sent_alerts.json")
+        self.dm_sender = DMSender()
         self.config = Config.get_conf(self, identifier=1234567890)
         default_user = {
             "zip_code": None,
             "severealerts": False,
             "freezealerts": False,
             "heatalerts": False,
-            "sent_alerts": [],
+            "sent_alerts": [],  # Legacy, moved to the sent alerts store on first sweep
         }
         self.config.register_user(**default_user)
         default_global = {
@@ -44,15 +57,9 @@ class Weather(commands.Cog):
             "highest_rainfall_date": None,
         }
         self.config.register_global(**default_global)
-        data_dir = bundled_data_path(self)
-        with (data_dir / "zipcodes.csv").open(mode="r") as zip_code_file:
-            csv_reader = csv.reader(zip_code_file)
-            self.zip_codes = {
-                row[0]: (row[1], row[2])
-                for i, row in enumerate(csv_reader)
-                if i != 0
-            }
-        
+        # Read from the bundled CSV the first time a zip code is looked up
+        self.zip_codes = ZipIndex(bundled_data_path(self) / "zipcodes.csv")
+
     def cog_load(self):
         self.bot.loop.create_task(self.start_severe_alerts_task())
         self.bot.loop.create_task(self.start_freeze_alerts_task())
@@ -77,60 +84,6 @@ class Weather(commands.Cog):
         millimeters = inches * 25.4
         return f"{millimeters:.1f}"
     
-    async def check_weather_alerts(self):
-        """Check for weather alerts and DM users if any severe or extreme warnings are issued"""
-        all_users = await self.config.all_users()
-        users_with_alerts = [user_id for user_id, data in all_users.items() if data.get("severealerts")]
-
-        for user_id in users_with_alerts:
-            user_data = await self.config.user_from_id(user_id).all()
-            zip_code = user_data.get("zip_code")
-            if not zip_code or zip_code not in self.zip_codes:
-                continue
-
-            latitude, longitude = self.zip_codes[zip_code]
-            alerts_url = f"https://api.weather.gov/alerts/active?point={latitude.strip()},{longitude.strip()}"
-
-            async with self.session.get(alerts_url) as response:
-                if response.status != 200:
-                    continue
-
-                data = await response.json()
-                alerts = data.get('features', [])
-                severe_alerts = [alert for alert in alerts if alert['properties']['severity'] in ['Severe', 'Extreme']]
-
-                if severe_alerts:
-                    user = self.bot.get_user(user_id)
-                    if user:
-                        sent_alerts = user_data.get("sent_alerts", [])
-                        new_alerts = [alert for alert in severe_alerts if alert['id'] not in sent_alerts]
-
-                        if new_alerts:
-                            for alert in new_alerts:
-                                embed = discord.Embed(
-                                    title=alert['properties']['event'],
-                                    description=f"{'An' if alert['properties']['event'][0].lower() in 'aeiou' else 'A'} **{alert['properties']['event']}** was issued at **<t:{int(datetime.fromisoformat(alert['properties']['sent']).timestamp())}:F>** for your location and is in effect until **<t:{int(datetime.fromisoformat(alert['properties']['expires']).timestamp())}:F>**.",
-                                    color=0xff4545
-                                )
-                                if 'instruction' in alert['properties']:
-                                    instruction = alert['properties']['instruction'].replace('\n', ' ').strip()
-                                    embed.add_field(name="Instruction", value=instruction, inline=False)
-                                if 'severity' in alert['properties']:
-                                    embed.add_field(name="Severity", value=alert['properties']['severity'], inline=True)
-                                if 'urgency' in alert['properties']:
-                                    embed.add_field(name="Urgency", value=alert['properties']['urgency'], inline=True)
-                                if 'certainty' in alert['properties']:
-                                    embed.add_field(name="Certainty", value=alert['properties']['certainty'], inline=True)
-                                if 'senderName' in alert['properties']:
-                                    embed.set_footer(text=f"Issued by {alert['properties']['senderName']}")
-
-                                await user.send(embed=embed)
-                                sent_alerts.append(alert['id'])
-
-                            await self.config.user_from_id(user_id).sent_alerts.set(sent_alerts)
-                            total_alerts_sent = await self.config.total_alerts_sent()
-                            await self.config.total_alerts_sent.set(total_alerts_sent + len(new_alerts))
-
     @commands.group()
     async def weather(self, ctx):
         """Fetch current and upcoming conditions, search and explore hundreds of weather-focused words, check alert statistics across the country, and fetch information on observation stations and radar installations"""
@@ -150,80 +103,76 @@ class Weather(commands.Cog):
             await ctx.send("Invalid zip code. Please set a valid zip code.")
             return
         
-        latitude, longitude = self.zip_codes[zip_code]
-        points_url = f"https://api.weather.gov/points/{latitude.strip()},{longitude.strip()}"
-        
-        # Fetch weather data using the latitude and longitude
-        async with self.session.get(points_url) as response:
-            if response.status != 200:
-                await ctx.send(f"Failed to fetch the weather data. Status Code: {response.status}")
-                return
+        # Grid metadata is cached per zip code and forecasts for as long as NWS says they are fresh
+        latitude, longitude = self.zip_codes.coordinates(zip_code)
+        status, points = await self.points.resolve(zip_code, latitude, longitude)
+        if points is None:
+            await ctx.send(f"Failed to fetch the weather data. Status Code: {status}")
+            return
 
-            data = await response.json()
-            forecast_url = data.get('properties', {}).get('forecast')
-            if not forecast_url:
-                await ctx.send(f"Failed to retrieve forecast URL.")
-                return
-            
-            async with self.session.get(forecast_url) as forecast_response:
-                if forecast_response.status != 200:
-                    await ctx.send(f"Failed to fetch the forecast data.")
-                    return
-                
-                forecast_data = await forecast_response.json()
-                periods = forecast_data.get('properties', {}).get('periods', [])
-                if not periods:
-                    await ctx.send(f"Failed to retrieve forecast periods.")
-                    return
-                
-                embeds = []
-                
-                for period in periods[:10]:  # Create a page for each of the next 10 forecast periods
-                    name = period.get('name', 'N/A')
-                    detailed_forecast = period.get('detailedForecast', 'No detailed forecast available.')
-                    temperature = period.get('temperature', 'N/A')
-                    if temperature != 'N/A':
-                        temperature = f"{temperature}°F"
-                    wind_speed = period.get('windSpeed', 'N/A')
-                    wind_direction = period.get('windDirection', 'N/A')
-                    
-                    embed = discord.Embed(
-                        title=f"Weather forecast for {name}",
-                        description=f"{detailed_forecast}",
-                        color=0xfffffe
-                    )
-                    embed.add_field(name="Temperature", value=temperature)
-                    embed.add_field(name="Wind speed", value=wind_speed)
-                    embed.add_field(name="Wind direction", value=wind_direction)
-                    
-                    embeds.append(embed)
-                
-                message = await ctx.send(embed=embeds[0])
-                forecasts_fetched = await self.config.forecasts_fetched()
-                await self.config.forecasts_fetched.set(forecasts_fetched + 1)
-                page = 0
-                await message.add_reaction("⬅️")
-                await message.add_reaction("❌")
-                await message.add_reaction("➡️")
+        forecast_url = points.get('forecast')
+        if not forecast_url:
+            await ctx.send(f"Failed to retrieve forecast URL.")
+            return
 
-                def check(reaction, user):
-                    return user == ctx.author and str(reaction.emoji) in ["⬅️", "➡️", "❌"] and reaction.message.id == message.id
+        status, forecast_data = await self.responses.fetch(forecast_url)
+        if forecast_data is None:
+            await ctx.send(f"Failed to fetch the forecast data.")
+            return
 
-                while True:
-                    try:
-                        reaction, user = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
-                        if str(reaction.emoji) == "➡️":
-                            page = (page + 1) % len(embeds)
-                        elif str(reaction.emoji) == "⬅️":
-                            page = (page - 1) % len(embeds)
-                        elif str(reaction.emoji) == "❌":
-                            await message.delete()
-                            break
-                        
-                        await message.edit(embed=embeds[page])
-                        await message.remove_reaction(reaction, user)
-                    except asyncio.TimeoutError:
-                        break
+        periods = forecast_data.get('properties', {}).get('periods', [])
+        if not periods:
+            await ctx.send(f"Failed to retrieve forecast periods.")
+            return
+
+        embeds = []
+
+        for period in periods[:10]:  # Create a page for each of the next 10 forecast periods
+            name = period.get('name', 'N/A')
+            detailed_forecast = period.get('detailedForecast', 'No detailed forecast available.')
+            temperature = period.get('temperature', 'N/A')
+            if temperature != 'N/A':
+                temperature = f"{temperature}°F"
+            wind_speed = period.get('windSpeed', 'N/A')
+            wind_direction = period.get('windDirection', 'N/A')
+
+            embed = discord.Embed(
+                title=f"Weather forecast for {name}",
+                description=f"{detailed_forecast}",
+                color=0xfffffe
+            )
+            embed.add_field(name="Temperature", value=temperature)
+            embed.add_field(name="Wind speed", value=wind_speed)
+            embed.add_field(name="Wind direction", value=wind_direction)
+
+            embeds.append(embed)
+
+        message = await ctx.send(embed=embeds[0])
+        forecasts_fetched = await self.config.forecasts_fetched()
+        await self.config.forecasts_fetched.set(forecasts_fetched + 1)
+        page = 0
+        await message.add_reaction("⬅️")
+        await message.add_reaction("❌")
+        await message.add_reaction("➡️")
+
+        def check(reaction, user):
+            return user == ctx.author and str(reaction.emoji) in ["⬅️", "➡️", "❌"] and reaction.message.id == message.id
+
+        while True:
+            try:
+                reaction, user = await self.bot.wait_for("reaction_add", timeout=60.0, check=check)
+                if str(reaction.emoji) == "➡️":
+                    page = (page + 1) % len(embeds)
+                elif str(reaction.emoji) == "⬅️":
+                    page = (page - 1) % len(embeds)
+                elif str(reaction.emoji) == "❌":
+                    await message.delete()
+                    break
+
+                await message.edit(embed=embeds[page])
+                await message.remove_reaction(reaction, user)
+            except asyncio.TimeoutError:
+                break
 
     @weather.command(name="stats")
     async def stats(self, ctx):
@@ -321,13 +270,13 @@ class Weather(commands.Cog):
                 await ctx.send(embed=embed, view=view)
                 return
             
-            latitude, longitude = self.zip_codes[zip_code]
+            latitude, longitude = self.zip_codes.coordinates(zip_code)
             
             # Fetch current weather data using the latitude and longitude
             url = "https://api.open-meteo.com/v1/forecast"
             params = {
-                "latitude": str(latitude).strip(),
-                "longitude": str(longitude).strip(),
+                "latitude": f"{latitude:.4f}",
+                "longitude": f"{longitude:.4f}",
                 "current": "temperature_2m,relative_humidity_2m,apparent_temperature,precipitation,rain,showers,snowfall,cloud_cover,pressure_msl,surface_pressure,wind_speed_10m,wind_direction_10m,wind_gusts_10m",
                 "hourly": "uv_index,cape,direct_radiation_instant,soil_temperature_0cm",
                 "minutely_15": "lightning_potential,visibility,soil_moisture_0_to_1cm",
@@ -341,288 +290,288 @@ class Weather(commands.Cog):
             queryString = "&".join(f"{key}={value}" for key, value in params.items())
             weather_url = f"{url}?{queryString}"
             
-            async with self.session.get(weather_url) as response:
-                if response.status != 200:
-                    await ctx.send(f"Failed to fetch the weather data. URL: {weather_url}, Status Code: {response.status}")
-                    return
+            # Popular zip codes are requested constantly, nowcasts are shared while they are fresh
+            status, data = await self.responses.fetch(weather_url)
+            if status != 200:
+                await ctx.send(f"Failed to fetch the weather data. URL: {weather_url}, Status Code: {status}")
+                return
 
-                data = await response.json()
-                if not data:
-                    await ctx.send(f"Failed to retrieve current weather data. URL: {weather_url}, Data: {data}")
-                    return
-                
-                current = data.get('current', {})
-                hourly = data.get('hourly', {})
-                minutely_15 = data.get('minutely_15', {})
-                
-                embed = discord.Embed(
-                    title=f"Current conditions",
-                    color=0xfffffe
-                )
-                temperature = current.get('temperature_2m', 'N/A')
-                embed.add_field(name="Temperature", value=f"**{temperature}°F** • {self.fahrenheit_to_celsius(temperature)}°C")
-                embed.add_field(name="Feels like", value=f"**{current.get('apparent_temperature', 'N/A')}°F** • {self.fahrenheit_to_celsius(current.get('apparent_temperature', 'N/A'))}°C")
-
-                ground_temp = hourly.get('soil_temperature_0cm', 'N/A')
-                if isinstance(ground_temp, list) and ground_temp:
-                    ground_temp = ground_temp[0]
-                embed.add_field(name="Ground temperature", value=f"**{ground_temp}°F** • {self.fahrenheit_to_celsius(ground_temp)}°C")
-
-                wind_direction = current.get('wind_direction_10m', 'N/A')
-                if wind_direction != 'N/A':
-                    if (wind_direction >= 0 and wind_direction <= 22.5) or (wind_direction > 337.5 and wind_direction <= 360):
-                        wind_direction_str = 'North'
-                    elif wind_direction > 22.5 and wind_direction <= 67.5:
-                        wind_direction_str = 'Northeast'
-                    elif wind_direction > 67.5 and wind_direction <= 112.5:
-                        wind_direction_str = 'East'
-                    elif wind_direction > 112.5 and wind_direction <= 157.5:
-                        wind_direction_str = 'Southeast'
-                    elif wind_direction > 157.5 and wind_direction <= 202.5:
-                        wind_direction_str = 'South'
-                    elif wind_direction > 202.5 and wind_direction <= 247.5:
-                        wind_direction_str = 'Southwest'
-                    elif wind_direction > 247.5 and wind_direction <= 292.5:
-                        wind_direction_str = 'West'
-                    else:
-                        wind_direction_str = 'Northwest'
-                else:
-                    wind_direction_str = 'N/A'
-                embed.add_field(name="Wind direction", value=wind_direction_str)
-
-                wind_speed = current.get('wind_speed_10m', 'N/A')
-                if wind_speed != 'N/A':
-                    wind_speed_knots = self.mph_to_knots(wind_speed)
-                    embed.add_field(name="Wind speed", value=f"**{wind_speed} mph** • {wind_speed_knots} kts")
-
-                wind_gusts = current.get('wind_gusts_10m', 'N/A')
-                if wind_gusts != 'N/A':
-                    wind_gusts_knots = self.mph_to_knots(wind_gusts)
-                    embed.add_field(name="Wind gusts", value=f"**{wind_gusts} mph** • {wind_gusts_knots} kts")
-                
-                embed.add_field(name="Humidity", value=f"{current.get('relative_humidity_2m', 'N/A')}%")
-                
-                precipitation = current.get('precipitation', 'N/A')
-                if precipitation != 'N/A' and precipitation != 0.0:
-                    embed.add_field(name="Precipitation", value=f"{precipitation} inches")
-                
-                rain = current.get('rain', 'N/A')
-                if rain != 'N/A' and rain != 0.0:
-                    embed.add_field(name="Rain", value=f"{rain} inches")
-                
-                showers = current.get('showers', 'N/A')
-                if showers != 'N/A' and showers != 0.0:
-                    embed.add_field(name="Showers", value=f"{showers} inches")
-                
-                snowfall = current.get('snowfall', 'N/A')
-                if snowfall != 'N/A' and snowfall != 0.0:
-                    embed.add_field(name="Snowfall", value=f"{snowfall} inches")
-                
-                embed.add_field(name="Cloud cover", value=f"{current.get('cloud_cover', 'N/A')}%")
-
-                visibility = minutely_15.get('visibility', [0])
-                if isinstance(visibility, list) and visibility:
-                    visibility_value_miles = visibility[0] / 5280
-                    visibility_value_meters = float(self.miles_to_meters(visibility_value_miles))
-                    if visibility_value_meters < 1000:
-                        visibility_str = f"{visibility_value_meters:.1f} m"
-                    else:
-                        visibility_value_km = visibility_value_meters / 1000
-                        visibility_str = f"{visibility_value_km:.1f} km"
+            if not data:
+                await ctx.send(f"Failed to retrieve current weather data. URL: {weather_url}, Data: {data}")
+                return
+            
+            current = data.get('current', {})
+            hourly = data.get('hourly', {})
+            minutely_15 = data.get('minutely_15', {})
+            
+            embed = discord.Embed(
+                title=f"Current conditions",
+                color=0xfffffe
+            )
+            temperature = current.get('temperature_2m', 'N/A')
+            embed.add_field(name="Temperature", value=f"**{temperature}°F** • {self.fahrenheit_to_celsius(temperature)}°C")
+            embed.add_field(name="Feels like", value=f"**{current.get('apparent_temperature', 'N/A')}°F** • {self.fahrenheit_to_celsius(current.get('apparent_temperature', 'N/A'))}°C")
+
+            ground_temp = hourly.get('soil_temperature_0cm', 'N/A')
+            if isinstance(ground_temp, list) and ground_temp:
+                ground_temp = ground_temp[0]
+            embed.add_field(name="Ground temperature", value=f"**{ground_temp}°F** • {self.fahrenheit_to_celsius(ground_temp)}°C")
+
+            wind_direction = current.get('wind_direction_10m', 'N/A')
+            if wind_direction != 'N/A':
+                if (wind_direction >= 0 and wind_direction <= 22.5) or (wind_direction > 337.5 and wind_direction <= 360):
+                    wind_direction_str = 'North'
+                elif wind_direction > 22.5 and wind_direction <= 67.5:
+                    wind_direction_str = 'Northeast'
+                elif wind_direction > 67.5 and wind_direction <= 112.5:
+                    wind_direction_str = 'East'
+                elif wind_direction > 112.5 and wind_direction <= 157.5:
+                    wind_direction_str = 'Southeast'
+                elif wind_direction > 157.5 and wind_direction <= 202.5:
+                    wind_direction_str = 'South'
+                elif wind_direction > 202.5 and wind_direction <= 247.5:
+                    wind_direction_str = 'Southwest'
+                elif wind_direction > 247.5 and wind_direction <= 292.5:
+                    wind_direction_str = 'West'
                 else:
-                    visibility_value_miles = 0
-                    visibility_str = "0.0 miles"
-                embed.add_field(name="Visibility", value=f"{visibility_value_miles:.2f} mi • {visibility_str}")
-
-                embed.add_field(name="Pressure (MSL)", value=f"{current.get('pressure_msl', 'N/A')} hPa")
-                embed.add_field(name="Surface pressure", value=f"{current.get('surface_pressure', 'N/A')} hPa")
-                
-                lightning_potential = minutely_15.get('lightning_potential', [None])
-                if isinstance(lightning_potential, list) and lightning_potential:
-                    lightning_potential = lightning_potential[0]
-                if lightning_potential is None or lightning_potential == 0:
-                    lightning_potential_str = 'None'
-                elif lightning_potential < 500:
-                    lightning_potential_str = 'Low'
-                elif lightning_potential < 1000:
-                    lightning_potential_str = 'Medium'
-                elif lightning_potential < 2000:
-                    lightning_potential_str = 'High'
+                    wind_direction_str = 'Northwest'
+            else:
+                wind_direction_str = 'N/A'
+            embed.add_field(name="Wind direction", value=wind_direction_str)
+
+            wind_speed = current.get('wind_speed_10m', 'N/A')
+            if wind_speed != 'N/A':
+                wind_speed_knots = self.mph_to_knots(wind_speed)
+                embed.add_field(name="Wind speed", value=f"**{wind_speed} mph** • {wind_speed_knots} kts")
+
+            wind_gusts = current.get('wind_gusts_10m', 'N/A')
+            if wind_gusts != 'N/A':
+                wind_gusts_knots = self.mph_to_knots(wind_gusts)
+                embed.add_field(name="Wind gusts", value=f"**{wind_gusts} mph** • {wind_gusts_knots} kts")
+            
+            embed.add_field(name="Humidity", value=f"{current.get('relative_humidity_2m', 'N/A')}%")
+            
+            precipitation = current.get('precipitation', 'N/A')
+            if precipitation != 'N/A' and precipitation != 0.0:
+                embed.add_field(name="Precipitation", value=f"{precipitation} inches")
+            
+            rain = current.get('rain', 'N/A')
+            if rain != 'N/A' and rain != 0.0:
+                embed.add_field(name="Rain", value=f"{rain} inches")
+            
+            showers = current.get('showers', 'N/A')
+            if showers != 'N/A' and showers != 0.0:
+                embed.add_field(name="Showers", value=f"{showers} inches")
+            
+            snowfall = current.get('snowfall', 'N/A')
+            if snowfall != 'N/A' and snowfall != 0.0:
+                embed.add_field(name="Snowfall", value=f"{snowfall} inches")
+            
+            embed.add_field(name="Cloud cover", value=f"{current.get('cloud_cover', 'N/A')}%")
+
+            visibility = minutely_15.get('visibility', [0])
+            if isinstance(visibility, list) and visibility:
+                visibility_value_miles = visibility[0] / 5280
+                visibility_value_meters = float(self.miles_to_meters(visibility_value_miles))
+                if visibility_value_meters < 1000:
+                    visibility_str = f"{visibility_value_meters:.1f} m"
                 else:
-                    lightning_potential_str = 'Extreme'
-                embed.add_field(name="Lightning potential", value=f"{lightning_potential_str}")
-                
-                # Fetch severe and extreme weather alerts
-                alerts_url = f"https://api.weather.gov/alerts/active?point={latitude.strip()},{longitude.strip()}"
-                active_alerts_list = []
-                async with self.session.get(alerts_url) as alerts_response:
-                    try:
-                        alerts_response.raise_for_status()
-                        alerts_data = await alerts_response.json()
-                        alerts = alerts_data.get('features', [])
-                        if alerts:
-                            embed.set_footer(text="When thunder roars, go indoors. If you can hear thunder, you can be struck by lightning.")
-                            alert_titles = []
-                            event_emojis = {
-                                "Tornado Warning": ":cloud_tornado:",
-                                "Severe Thunderstorm Warning": ":thunder_cloud_rain:",
-                                "Flood Warning": ":ocean:",
-                                "Flood Watch": ":ocean:",
-                                "Heat Advisory": ":desert:",
-                                "Special Weather Statement": ":information_source:",
-                                "Winter Storm Warning": ":cloud_snow:",
-                                "High Wind Warning": ":wind_blowing_face:",
-                                "Excessive Heat Warning": ":thermometer:",
-                                "Fire Weather Watch": ":fire:",
-                                "Flood Advisory": ":ocean:",
-                                "Hurricane Warning": ":cyclone:",
-                                "Tsunami Warning": ":ocean:",
-                                "Earthquake Warning": ":earth_americas:",
-                                "Blizzard Warning": ":snowflake:",
-                                "Freeze Warning": ":snowflake:",
-                                "Dust Storm Warning": ":dash:",
-                                "Extreme Cold Warning": ":cold_face:",
-                                "Extreme Heat Warning": ":hot_face:",
-                                "Gale Warning": ":wind_face:",
-                                "Ice Storm Warning": ":ice_cube:",
-                                "Red Flag Warning": ":triangular_flag_on_post:",
-                                "Severe Weather Statement": ":cloud_with_lightning_and_rain:",
-                                "Special Marine Warning": ":anchor:",
-                                "Storm Surge Warning": ":ocean:",
-                                "Tropical Storm Warning": ":thunder_cloud_rain:",
-                                "Tropical Cyclone Statement": ":cyclone:",
-                                "Volcano Warning": ":volcano:",
-                                "Flash Flood Warning": ":ocean:",
-                                "Frost Advisory": ":snowflake:",
-                                "Hydrologic Outlook": ":notepad_spiral:",
-                                "Rip Current Statement": ":ocean:",
-                                "Mandatory evacuation order": ":person_running:",
-                                "Air Quality Alert": ":face_in_clouds:",
-                                "Coastal Flood Warning": ":beach_umbrella:",
-                                # Add more event types and corresponding emojis as needed
-                            }
-                            event_transformations = {
-                                "Evacuation - Immediate": "Mandatory evacuation order",
-                                # Add more event transformations as needed
-                            }
-                            for alert in alerts:
-                                event = alert['properties']['event']
-                                event = event_transformations.get(event, event)  # Transform event name if applicable
-                                emoji = event_emojis.get(event, ":warning:")  # Default to warning emoji if event not found
-                                expires = alert['properties'].get('expires')
-                                if expires:
+                    visibility_value_km = visibility_value_meters / 1000
+                    visibility_str = f"{visibility_value_km:.1f} km"
+            else:
+                visibility_value_miles = 0
+                visibility_str = "0.0 miles"
+            embed.add_field(name="Visibility", value=f"{visibility_value_miles:.2f} mi • {visibility_str}")
+
+            embed.add_field(name="Pressure (MSL)", value=f"{current.get('pressure_msl', 'N/A')} hPa")
+            embed.add_field(name="Surface pressure", value=f"{current.get('surface_pressure', 'N/A')} hPa")
+            
+            lightning_potential = minutely_15.get('lightning_potential', [None])
+            if isinstance(lightning_potential, list) and lightning_potential:
+                lightning_potential = lightning_potential[0]
+            if lightning_potential is None or lightning_potential == 0:
+                lightning_potential_str = 'None'
+            elif lightning_potential < 500:
+                lightning_potential_str = 'Low'
+            elif lightning_potential < 1000:
+                lightning_potential_str = 'Medium'
+            elif lightning_potential < 2000:
+                lightning_potential_str = 'High'
+            else:
+                lightning_potential_str = 'Extreme'
+            embed.add_field(name="Lightning potential", value=f"{lightning_potential_str}")
+            
+            # Fetch severe and extreme weather alerts
+            alerts_url = f"https://api.weather.gov/alerts/active?point={latitude:.4f},{longitude:.4f}"
+            active_alerts_list = []
+            async with self.session.get(alerts_url) as alerts_response:
+                try:
+                    alerts_response.raise_for_status()
+                    alerts_data = await alerts_response.json()
+                    alerts = alerts_data.get('features', [])
+                    if alerts:
+                        embed.set_footer(text="When thunder roars, go indoors. If you can hear thunder, you can be struck by lightning.")
+                        alert_titles = []
+                        event_emojis = {
+                            "Tornado Warning": ":cloud_tornado:",
+                            "Severe Thunderstorm Warning": ":thunder_cloud_rain:",
+                            "Flood Warning": ":ocean:",
+                            "Flood Watch": ":ocean:",
+                            "Heat Advisory": ":desert:",
+                            "Special Weather Statement": ":information_source:",
+                            "Winter Storm Warning": ":cloud_snow:",
+                            "High Wind Warning": ":wind_blowing_face:",
+                            "Excessive Heat Warning": ":thermometer:",
+                            "Fire Weather Watch": ":fire:",
+                            "Flood Advisory": ":ocean:",
+                            "Hurricane Warning": ":cyclone:",
+                            "Tsunami Warning": ":ocean:",
+                            "Earthquake Warning": ":earth_americas:",
+                            "Blizzard Warning": ":snowflake:",
+                            "Freeze Warning": ":snowflake:",
+                            "Dust Storm Warning": ":dash:",
+                            "Extreme Cold Warning": ":cold_face:",
+                            "Extreme Heat Warning": ":hot_face:",
+                            "Gale Warning": ":wind_face:",
+                            "Ice Storm Warning": ":ice_cube:",
+                            "Red Flag Warning": ":triangular_flag_on_post:",
+                            "Severe Weather Statement": ":cloud_with_lightning_and_rain:",
+                            "Special Marine Warning": ":anchor:",
+                            "Storm Surge Warning": ":ocean:",
+                            "Tropical Storm Warning": ":thunder_cloud_rain:",
+                            "Tropical Cyclone Statement": ":cyclone:",
+                            "Volcano Warning": ":volcano:",
+                            "Flash Flood Warning": ":ocean:",
+                            "Frost Advisory": ":snowflake:",
+                            "Hydrologic Outlook": ":notepad_spiral:",
+                            "Rip Current Statement": ":ocean:",
+                            "Mandatory evacuation order": ":person_running:",
+                            "Air Quality Alert": ":face_in_clouds:",
+                            "Coastal Flood Warning": ":beach_umbrella:",
+                            # Add more event types and corresponding emojis as needed
+                        }
+                        event_transformations = {
+                            "Evacuation - Immediate": "Mandatory evacuation order",
+                            # Add more event transformations as needed
+                        }
+                        for alert in alerts:
+                            event = alert['properties']['event']
+                            event = event_transformations.get(event, event)  # Transform event name if applicable
+                            emoji = event_emojis.get(event, ":warning:")  # Default to warning emoji if event not found
+                            expires = alert['properties'].get('expires')
+                            if expires:
+                                try:
+                                    expires_timestamp = f"<t:{int(datetime.fromisoformat(expires[:-1]).timestamp())}:R>"
+                                except ValueError:
+                                    # Attempt to correct the timestamp format
                                     try:
-                                        expires_timestamp = f"<t:{int(datetime.fromisoformat(expires[:-1]).timestamp())}:R>"
-                                    except ValueError:
-                                        # Attempt to correct the timestamp format
-                                        try:
-                                            corrected_expires = expires + '0'  # Adding missing zero
-                                            expires_timestamp = f"<t:{int(datetime.fromisoformat(corrected_expires[:-1]).timestamp())}:R>"
-                                        except ValueError as ve:
-                                            expires_timestamp = f"Invalid expiry time format: {expires}"
-                                    alert_titles.append(f"{emoji} **{event}** expiring **{expires_timestamp}**")
-                                else:
-                                    alert_titles.append(f"{emoji} **{event}**")
-                                # For AI summary, collect alert event and description
-                                alert_desc = alert['properties'].get('description', '')
-                                if alert_desc:
-                                    active_alerts_list.append(f"{event}: {alert_desc}")
-                                else:
-                                    active_alerts_list.append(f"{event}")
-                            alert_status = "\n".join(alert_titles)
-                        else:
-                            alert_status = "None right now - **#It'sAmazingOutThere**"
-                    except Exception as e:
-                        alert_status = f"Failed to fetch alerts: {str(e)}, url={alerts_url}"
-                
-                embed.add_field(name="Active alerts", value=alert_status, inline=False)
-
-                # Check if OpenAI key is set and generate AI weather summary
-                tokens = await self.bot.get_shared_api_tokens("openai")
-                openai_key = tokens.get("api_key") if tokens else None
-                if openai_key:
-                    openai_url = "https://api.openai.com/v1/chat/completions"
-                    headers = {
-                        "Authorization": f"Bearer {openai_key}",
-                        "Content-Type": "application/json"
-                    }
-                    # Compose a summary of active alerts for the AI prompt
-                    if active_alerts_list:
-                        alerts_summary = "Active alerts: " + "; ".join(active_alerts_list)
+                                        corrected_expires = expires + '0'  # Adding missing zero
+                                        expires_timestamp = f"<t:{int(datetime.fromisoformat(corrected_expires[:-1]).timestamp())}:R>"
+                                    except ValueError as ve:
+                                        expires_timestamp = f"Invalid expiry time format: {expires}"
+                                alert_titles.append(f"{emoji} **{event}** expiring **{expires_timestamp}**")
+                            else:
+                                alert_titles.append(f"{emoji} **{event}**")
+                            # For AI summary, collect alert event and description
+                            alert_desc = alert['properties'].get('description', '')
+                            if alert_desc:
+                                active_alerts_list.append(f"{event}: {alert_desc}")
+                            else:
+                                active_alerts_list.append(f"{event}")
+                        alert_status = "\n".join(alert_titles)
                     else:
-                        alerts_summary = "There are no active weather alerts at this time."
-                    messages = [
-                        {"role": "system", "content": "You are a virtual meteorologist built into an app. Never talk about the location the data comes from or the time. Always respond in conversational text, giving recommendations based on conditions where appropriate."},
-                        {"role": "user", "content": f"Generate a summary of the current weather conditions based on the following data: {data}\n\n{alerts_summary}"}
-                    ]
-                    openai_payload = {
-                        "model": "gpt-4.1-nano",
-                        "messages": messages,
-                        "max_tokens": 500,
-                        "temperature": 1.0
-                    }
-                    async with self.session.post(openai_url, headers=headers, json=openai_payload) as openai_response:
-                        if openai_response.status == 200:
-                            openai_data = await openai_response.json()
-                            ai_summary = openai_data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-                            embed.add_field(name="AI weather summary", value=ai_summary, inline=False)
-                        else:
-                            pass
-
-                await ctx.send(embed=embed)
-                nowcasts_fetched = await self.config.nowcasts_fetched()
-                await self.config.nowcasts_fetched.set(nowcasts_fetched + 1)
-
-                # Update highest and lowest values
-                highest_temperature = await self.config.highest_temperature()
-                highest_temperature_date = await self.config.highest_temperature_date()
-                lowest_temperature = await self.config.lowest_temperature()
-                lowest_temperature_date = await self.config.lowest_temperature_date()
-                highest_wind_speed = await self.config.highest_wind_speed()
-                highest_wind_speed_date = await self.config.highest_wind_speed_date()
-                highest_precipitation = await self.config.highest_precipitation()
-                highest_precipitation_date = await self.config.highest_precipitation_date()
-                highest_wind_gusts = await self.config.highest_wind_gusts()
-                highest_wind_gusts_date = await self.config.highest_wind_gusts_date()
-                highest_snowfall = await self.config.highest_snowfall()
-                highest_snowfall_date = await self.config.highest_snowfall_date()
-                highest_rainfall = await self.config.highest_rainfall()
-                highest_rainfall_date = await self.config.highest_rainfall_date()
-
-                current_date = datetime.now().isoformat()
-
-                if temperature != 'N/A':
-                    if highest_temperature is None or temperature > highest_temperature:
-                        await self.config.highest_temperature.set(temperature)
-                        await self.config.highest_temperature_date.set(current_date)
-                    if lowest_temperature is None or temperature < lowest_temperature:
-                        await self.config.lowest_temperature.set(temperature)
-                        await self.config.lowest_temperature_date.set(current_date)
-
-                if wind_speed != 'N/A':
-                    if highest_wind_speed is None or wind_speed > highest_wind_speed:
-                        await self.config.highest_wind_speed.set(wind_speed)
-                        await self.config.highest_wind_speed_date.set(current_date)
-
-                if wind_gusts != 'N/A':
-                    if highest_wind_gusts is None or wind_gusts > highest_wind_gusts:
-                        await self.config.highest_wind_gusts.set(wind_gusts)
-                        await self.config.highest_wind_gusts_date.set(current_date)
-
-                if precipitation != 'N/A' and precipitation != 0.0:
-                    if highest_precipitation is None or precipitation > highest_precipitation:
-                        await self.config.highest_precipitation.set(precipitation)
-                        await self.config.highest_precipitation_date.set(current_date)
-
-                if snowfall != 'N/A' and snowfall != 0.0:
-                    if highest_snowfall is None or snowfall > highest_snowfall:
-                        await self.config.highest_snowfall.set(snowfall)
-                        await self.config.highest_snowfall_date.set(current_date)
-
-                if showers != 'N/A' and showers != 0.0:
-                    if highest_rainfall is None or showers > highest_rainfall:
-                        await self.config.highest_rainfall.set(showers)
-                        await self.config.highest_rainfall_date.set(current_date)
+                        alert_status = "None right now - **#It'sAmazingOutThere**"
+                except Exception as e:
+                    alert_status = f"Failed to fetch alerts: {str(e)}, url={alerts_url}"
+            
+            embed.add_field(name="Active alerts", value=alert_status, inline=False)
+
+            # Check if OpenAI key is set and generate AI weather summary
+            tokens = await self.bot.get_shared_api_tokens("openai")
+            openai_key = tokens.get("api_key") if tokens else None
+            if openai_key:
+                openai_url = "https://api.openai.com/v1/chat/completions"
+                headers = {
+                    "Authorization": f"Bearer {openai_key}",
+                    "Content-Type": "application/json"
+                }
+                # Compose a summary of active alerts for the AI prompt
+                if active_alerts_list:
+                    alerts_summary = "Active alerts: " + "; ".join(active_alerts_list)
+                else:
+                    alerts_summary = "There are no active weather alerts at this time."
+                messages = [
+                    {"role": "system", "content": "You are a virtual meteorologist built into an app. Never talk about the location the data comes from or the time. Always respond in conversational text, giving recommendations based on conditions where appropriate."},
+                    {"role": "user", "content": f"Generate a summary of the current weather conditions based on the following data: {data}\n\n{alerts_summary}"}
+                ]
+                openai_payload = {
+                    "model": "gpt-4.1-nano",
+                    "messages": messages,
+                    "max_tokens": 500,
+                    "temperature": 1.0
+                }
+                async with self.session.post(openai_url, headers=headers, json=openai_payload) as openai_response:
+                    if openai_response.status == 200:
+                        openai_data = await openai_response.json()
+                        ai_summary = openai_data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+                        embed.add_field(name="AI weather summary", value=ai_summary, inline=False)
+                    else:
+                        pass
+
+            await ctx.send(embed=embed)
+            nowcasts_fetched = await self.config.nowcasts_fetched()
+            await self.config.nowcasts_fetched.set(nowcasts_fetched + 1)
+
+            # Update highest and lowest values
+            highest_temperature = await self.config.highest_temperature()
+            highest_temperature_date = await self.config.highest_temperature_date()
+            lowest_temperature = await self.config.lowest_temperature()
+            lowest_temperature_date = await self.config.lowest_temperature_date()
+            highest_wind_speed = await self.config.highest_wind_speed()
+            highest_wind_speed_date = await self.config.highest_wind_speed_date()
+            highest_precipitation = await self.config.highest_precipitation()
+            highest_precipitation_date = await self.config.highest_precipitation_date()
+            highest_wind_gusts = await self.config.highest_wind_gusts()
+            highest_wind_gusts_date = await self.config.highest_wind_gusts_date()
+            highest_snowfall = await self.config.highest_snowfall()
+            highest_snowfall_date = await self.config.highest_snowfall_date()
+            highest_rainfall = await self.config.highest_rainfall()
+            highest_rainfall_date = await self.config.highest_rainfall_date()
+
+            current_date = datetime.now().isoformat()
+
+            if temperature != 'N/A':
+                if highest_temperature is None or temperature > highest_temperature:
+                    await self.config.highest_temperature.set(temperature)
+                    await self.config.highest_temperature_date.set(current_date)
+                if lowest_temperature is None or temperature < lowest_temperature:
+                    await self.config.lowest_temperature.set(temperature)
+                    await self.config.lowest_temperature_date.set(current_date)
+
+            if wind_speed != 'N/A':
+                if highest_wind_speed is None or wind_speed > highest_wind_speed:
+                    await self.config.highest_wind_speed.set(wind_speed)
+                    await self.config.highest_wind_speed_date.set(current_date)
+
+            if wind_gusts != 'N/A':
+                if highest_wind_gusts is None or wind_gusts > highest_wind_gusts:
+                    await self.config.highest_wind_gusts.set(wind_gusts)
+                    await self.config.highest_wind_gusts_date.set(current_date)
+
+            if precipitation != 'N/A' and precipitation != 0.0:
+                if highest_precipitation is None or precipitation > highest_precipitation:
+                    await self.config.highest_precipitation.set(precipitation)
+                    await self.config.highest_precipitation_date.set(current_date)
+
+            if snowfall != 'N/A' and snowfall != 0.0:
+                if highest_snowfall is None or snowfall > highest_snowfall:
+                    await self.config.highest_snowfall.set(snowfall)
+                    await self.config.highest_snowfall_date.set(current_date)
+
+            if showers != 'N/A' and showers != 0.0:
+                if highest_rainfall is None or showers > highest_rainfall:
+                    await self.config.highest_rainfall.set(showers)
+                    await self.config.highest_rainfall_date.set(current_date)
 
     @commands.guild_only()
     @weather.command(name="glossary")
@@ -1153,55 +1102,113 @@ class Weather(commands.Cog):
     async def check_weather_alerts(self):
         """Check for weather alerts and DM users if any severe or extreme warnings are issued"""
         all_users = await self.config.all_users()
-        users_with_alerts = [user_id for user_id, data in all_users.items() if data.get("severealerts")]
 
-        for user_id in users_with_alerts:
-            user_data = await self.config.user_from_id(user_id).all()
-            zip_code = user_data.get("zip_code")
-            if not zip_code or zip_code not in self.zip_codes:
+        # Subscribers sharing a zip code share one NWS request
+        subscribers = defaultdict(list)
+        for user_id, data in all_users.items():
+            zip_code = data.get("zip_code")
+            if data.get("severealerts") and zip_code and zip_code in self.zip_codes:
+                subscribers[zip_code].append(user_id)
+
+        urls = {zip_code: self._alerts_url(zip_code) for zip_code in subscribers}
+        self.alert_poller.retain(urls.values())
+        results = await asyncio.gather(*(self.alert_poller.poll(url) for url in urls.values()))
+
+        await self._load_sent_alerts()
+        self.sent_alerts.expire()
+        deliveries = []
+        for zip_code, data in zip(urls, results):
+            if data is None:
                 continue
+            alerts = data.get('features', [])
+            severe_alerts = [alert for alert in alerts if alert['properties']['severity'] in ['Severe', 'Extreme']]
+
+            for alert in severe_alerts:
+                embed = None
+                for user_id in subscribers[zip_code]:
+                    if self.sent_alerts.was_sent(alert['id'], user_id):
+                        continue
+                    user = self.bot.get_user(user_id)
+                    if not user:
+                        continue
+                    if embed is None:
+                        embed = self._severe_alert_embed(alert)
+                    deliveries.append((alert, user_id, user, embed))
+
+        delivered = await asyncio.gather(*(self.dm_sender.send(user, embed=embed) for _, _, user, embed in deliveries))
+        alerts_sent = 0
+        for (alert, user_id, _, _), result in zip(deliveries, delivered):
+            # Closed DMs and timed out sends count as handled, retrying could fail again or send twice
+            if result is not None:
+                self.sent_alerts.mark_sent(alert['id'], user_id, self._alert_expiry(alert))
+            if result:
+                alerts_sent += 1
+        await self.sent_alerts.save()
+
+        if alerts_sent:
+            total_alerts_sent = await self.config.total_alerts_sent()
+            await self.config.total_alerts_sent.set(total_alerts_sent + alerts_sent)
 
-            latitude, longitude = self.zip_codes[zip_code]
-            alerts_url = f"https://api.weather.gov/alerts/active?point={latitude.strip()},{longitude.strip()}"
-
-            async with self.session.get(alerts_url) as response:
-                if response.status != 200:
-                    continue
+    async def _load_sent_alerts(self):
+        if self.sent_alerts.loaded:
+            return
+        await self.sent_alerts.load()
+        # Move over the per-user lists Config used to keep, they have no expiry so guess one
+        legacy_users = {user_id: data["sent_alerts"] for user_id, data in (await self.config.all_users()).items() if data.get("sent_alerts")}
+        if not legacy_users:
+            return
+        expires = time.time() + LEGACY_SENT_ALERT_TTL
+        for user_id, alert_ids in legacy_users.items():
+            for alert_id in alert_ids:
+                self.sent_alerts.mark_sent(alert_id, user_id, expires)
+        await self.sent_alerts.save()
+        for user_id in legacy_users:
+            await self.config.user_from_id(user_id).sent_alerts.clear()
+
+    @staticmethod
+    def _alert_expiry(alert):
+        """Timestamp after which an alert can no longer be active."""
+        properties = alert['properties']
+        timestamps = []
+        for key in ('expires', 'ends'):
+            try:
+                timestamps.append(datetime.fromisoformat(properties[key]).timestamp())
+            except (KeyError, TypeError, ValueError):
+                continue
+        return max(timestamps) if timestamps else time.time() + LEGACY_SENT_ALERT_TTL
 
-                data = await response.json()
-                alerts = data.get('features', [])
-                severe_alerts = [alert for alert in alerts if alert['properties']['severity'] in ['Severe', 'Extreme']]
+    def _alerts_url(self, zip_code):
+        latitude, longitude = self.zip_codes.coordinates(zip_code)
+        return f"https://api.weather.gov/alerts/active?point={latitude:.4f},{longitude:.4f}"
 
-                if severe_alerts:
-                    user = self.bot.get_user(user_id)
-                    if user:
-                        sent_alerts = user_data.get("sent_alerts", [])
-                        new_alerts = [alert for alert in severe_alerts if alert['id'] not in sent_alerts]
-
-                        if new_alerts:
-                            for alert in new_alerts:
-                                embed = discord.Embed(
-                                    title=alert['properties']['event'],
-                                    description=f"{'An' if alert['properties']['event'][0].lower() in 'aeiou' else 'A'} **{alert['properties']['event']}** was issued at **<t:{int(datetime.fromisoformat(alert['properties']['sent']).timestamp())}:F>** for your location and is in effect until **<t:{int(datetime.fromisoformat(alert['properties']['expires']).timestamp())}:F>**.",
-                                    color=0xff4545
-                                )
-                                if 'instruction' in alert['properties']:
-                                    embed.add_field(name="Instruction", value=alert['properties']['instruction'], inline=False)
-                                if 'severity' in alert['properties']:
-                                    embed.add_field(name="Severity", value=alert['properties']['severity'], inline=True)
-                                if 'urgency' in alert['properties']:
-                                    embed.add_field(name="Urgency", value=alert['properties']['urgency'], inline=True)
-                                if 'certainty' in alert['properties']:
-                                    embed.add_field(name="Certainty", value=alert['properties']['certainty'], inline=True)
-                                if 'senderName' in alert['properties']:
-                                    embed.set_footer(text=f"Issued by {alert['properties']['senderName']}")
-
-                                await user.send(embed=embed)
-                                sent_alerts.append(alert['id'])
-
-                            await self.config.user_from_id(user_id).sent_alerts.set(sent_alerts)
-                            total_alerts_sent = await self.config.total_alerts_sent()
-                            await self.config.total_alerts_sent.set(total_alerts_sent + len(new_alerts))
+    def _severe_alert_embed(self, alert):
+        embed = discord.Embed(
+            title=alert['properties']['event'],
+            description=f"{'An' if alert['properties']['event'][0].lower() in 'aeiou' else 'A'} **{alert['properties']['event']}** was issued at **<t:{int(datetime.fromisoformat(alert['properties']['sent']).timestamp())}:F>** for your location and is in effect until **<t:{int(datetime.fromisoformat(alert['properties']['expires']).timestamp())}:F>**.",
+            color=0xff4545
+        )
+        if 'instruction' in alert['properties']:
+            embed.add_field(name="Instruction", value=alert['properties']['instruction'], inline=False)
+        if 'severity' in alert['properties']:
+            embed.add_field(name="Severity", value=alert['properties']['severity'], inline=True)
+        if 'urgency' in alert['properties']:
+            embed.add_field(name="Urgency", value=alert['properties']['urgency'], inline=True)
+        if 'certainty' in alert['properties']:
+            embed.add_field(name="Certainty", value=alert['properties']['certainty'], inline=True)
+        if 'senderName' in alert['properties']:
+            embed.set_footer(text=f"Issued by {alert['properties']['senderName']}")
+        return embed
+
+    async def _forecast_periods(self, zip_code):
+        """The NWS forecast periods for a zip code, or `None` if they could not be fetched."""
+        latitude, longitude = self.zip_codes.coordinates(zip_code)
+        _, points = await self.points.resolve(zip_code, latitude, longitude)
+        if not points or not points.get('forecast'):
+            return None
+        _, data = await self.responses.fetch(points['forecast'])
+        if data is None:
+            return None
+        return data.get('properties', {}).get('periods', [])
 
     async def start_severe_alerts_task(self):
         while True:
@@ -1223,39 +1230,36 @@ class Weather(commands.Cog):
         all_users = await self.config.all_users()
         users_with_freeze_alerts = [user_id for user_id, data in all_users.items() if data.get("freezealerts")]
 
+        deliveries = []
         for user_id in users_with_freeze_alerts:
-            user_data = await self.config.user_from_id(user_id).all()
-            zip_code = user_data.get("zip_code")
+            zip_code = all_users[user_id].get("zip_code")
             if not zip_code or zip_code not in self.zip_codes:
                 continue
 
-            latitude, longitude = self.zip_codes[zip_code]
-            forecast_url = f"https://api.weather.gov/points/{latitude.strip()},{longitude.strip()}/forecast"
+            periods = await self._forecast_periods(zip_code)
+            if periods is None:
+                continue
 
-            async with self.session.get(forecast_url) as response:
-                if response.status != 200:
-                    continue
+            cold_alerts = [period for period in periods if period['temperature'] <= 10]
 
-                data = await response.json()
-                periods = data.get('properties', {}).get('periods', [])
-                cold_alerts = [period for period in periods if period['temperature'] <= 10]
+            if cold_alerts:
+                user = self.bot.get_user(user_id)
+                if user:
+                    for alert in cold_alerts:
+                        embed = discord.Embed(
+                            title="Extreme cold alert",
+                            description=f"Expected dangerously cold temperatures: {alert['temperature']}°F",
+                            color=0x1E90FF
+                        )
+                        embed.add_field(name="Time", value=alert['name'], inline=True)
+                        embed.add_field(name="Detailed Forecast", value=alert['detailedForecast'], inline=False)
+                        embed.set_footer(text="Stay warm and take necessary precautions.")
+                        deliveries.append(self.dm_sender.send(user, embed=embed))
 
-                if cold_alerts:
-                    user = self.bot.get_user(user_id)
-                    if user:
-                        for alert in cold_alerts:
-                            embed = discord.Embed(
-                                title="Extreme cold alert",
-                                description=f"Expected dangerously cold temperatures: {alert['temperature']}°F",
-                                color=0x1E90FF
-                            )
-                            embed.add_field(name="Time", value=alert['name'], inline=True)
-                            embed.add_field(name="Detailed Forecast", value=alert['detailedForecast'], inline=False)
-                            embed.set_footer(text="Stay warm and take necessary precautions.")
-
-                            await user.send(embed=embed)
-                            total_freeze_alerts_sent = await self.config.total_freeze_alerts_sent()
-                            await self.config.total_freeze_alerts_sent.set(total_freeze_alerts_sent + 1)
+        alerts_sent = sum(1 for delivered in await asyncio.gather(*deliveries) if delivered)
+        if alerts_sent:
+            total_freeze_alerts_sent = await self.config.total_freeze_alerts_sent()
+            await self.config.total_freeze_alerts_sent.set(total_freeze_alerts_sent + alerts_sent)
 
     async def start_freeze_alerts_task(self):
         while True:
@@ -1277,39 +1281,36 @@ class Weather(commands.Cog):
         all_users = await self.config.all_users()
         users_with_heat_alerts = [user_id for user_id, data in all_users.items() if data.get("heatalerts")]
 
+        deliveries = []
         for user_id in users_with_heat_alerts:
-            user_data = await self.config.user_from_id(user_id).all()
-            zip_code = user_data.get("zip_code")
+            zip_code = all_users[user_id].get("zip_code")
             if not zip_code or zip_code not in self.zip_codes:
                 continue
 
-            latitude, longitude = self.zip_codes[zip_code]
-            forecast_url = f"https://api.weather.gov/points/{latitude.strip()},{longitude.strip()}/forecast"
-
-            async with self.session.get(forecast_url) as response:
-                if response.status != 200:
-                    continue
+            periods = await self._forecast_periods(zip_code)
+            if periods is None:
+                continue
 
-                data = await response.json()
-                periods = data.get('properties', {}).get('periods', [])
-                heat_alerts = [period for period in periods if period['temperature'] >= 100]
+            heat_alerts = [period for period in periods if period['temperature'] >= 100]
 
-                if heat_alerts:
-                    user = self.bot.get_user(user_id)
-                    if user:
-                        for alert in heat_alerts:
-                            embed = discord.Embed(
-                                title="Extreme heat alert",
-                                description=f"Expected dangerously hot temperatures: {alert['temperature']}°F",
-                                color=0xFF4500
-                            )
-                            embed.add_field(name="Time", value=alert['name'], inline=True)
-                            embed.add_field(name="Detailed Forecast", value=alert['detailedForecast'], inline=False)
-                            embed.set_footer(text="Stay cool and take necessary precautions.")
-
-                            await user.send(embed=embed)
-                            total_heat_alerts_sent = await self.config.total_heat_alerts_sent()
-                            await self.config.total_heat_alerts_sent.set(total_heat_alerts_sent + 1)
+            if heat_alerts:
+                user = self.bot.get_user(user_id)
+                if user:
+                    for alert in heat_alerts:
+                        embed = discord.Embed(
+                            title="Extreme heat alert",
+                            description=f"Expected dangerously hot temperatures: {alert['temperature']}°F",
+                            color=0xFF4500
+                        )
+                        embed.add_field(name="Time", value=alert['name'], inline=True)
+                        embed.add_field(name="Detailed Forecast", value=alert['detailedForecast'], inline=False)
+                        embed.set_footer(text="Stay cool and take necessary precautions.")
+                        deliveries.append(self.dm_sender.send(user, embed=embed))
+
+        alerts_sent = sum(1 for delivered in await asyncio.gather(*deliveries) if delivered)
+        if alerts_sent:
+            total_heat_alerts_sent = await self.config.total_heat_alerts_sent()
+            await self.config.total_heat_alerts_sent.set(total_heat_alerts_sent + alerts_sent)
 
     async def start_heat_alerts_task(self):
         while True:
@@ -0,0 +1,101 @@
+import csv
+import math
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+GRID_SIZE = 1.0  # Degrees per side of the cells used for nearest zip code lookups
+
+
+class ZipIndex:
+    """
+    Coordinates for every known zip code, loaded from the bundled CSV on first use.
+
+    Zip codes are kept as a sorted array of ints with float32 latitudes and
+    longitudes alongside, so a lookup is a binary search and the whole index
+    is a few hundred kilobytes. The handful of rows that are not plain five
+    digit zip codes are kept in a small dict instead.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._zips: Optional[array] = None
+        self._latitudes = array("f")
+        self._longitudes = array("f")
+        self._other: Dict[str, Tuple[float, float]] = {}
+        # (lat cell, lon cell) -> positions in the arrays, built on the first nearest lookup
+        self._grid: Optional[Dict[Tuple[int, int], List[int]]] = None
+
+    def load(self) -> None:
+        if self._zips is not None:
+            return
+        rows = []
+        with self.path.open(mode="r") as zip_code_file:
+            csv_reader = csv.reader(zip_code_file)
+            next(csv_reader, None)
+            for zip_code, latitude, longitude in csv_reader:
+                if len(zip_code) == 5 and zip_code.isdigit():
+                    rows.append((int(zip_code), float(latitude), float(longitude)))
+                else:
+                    self._other[zip_code] = (float(latitude), float(longitude))
+        rows.sort()
+        self._latitudes = array("f", (row[1] for row in rows))
+        self._longitudes = array("f", (row[2] for row in rows))
+        self._zips = array("i", (row[0] for row in rows))
+
+    def _position(self, zip_code: str) -> Optional[int]:
+        if len(zip_code) != 5 or not zip_code.isdigit():
+            return None
+        self.load()
+        number = int(zip_code)
+        position = bisect_left(self._zips, number)
+        if position < len(self._zips) and self._zips[position] == number:
+            return position
+        return None
+
+    def __contains__(self, zip_code) -> bool:
+        return self.coordinates(zip_code) is not None
+
+    def coordinates(self, zip_code: Optional[str]) -> Optional[Tuple[float, float]]:
+        """(latitude, longitude) of the zip code, or `None` if it is not known."""
+        if not isinstance(zip_code, str):
+            return None
+        position = self._position(zip_code)
+        if position is not None:
+            return self._latitudes[position], self._longitudes[position]
+        self.load()
+        return self._other.get(zip_code)
+
+    def nearest(self, latitude: float, longitude: float) -> Optional[str]:
+        """The known zip code closest to a point."""
+        self.load()
+        if self._grid is None:
+            grid = defaultdict(list)
+            for position, (lat, lon) in enumerate(zip(self._latitudes, self._longitudes)):
+                grid[int(lat // GRID_SIZE), int(lon // GRID_SIZE)].append(position)
+            self._grid = dict(grid)
+        if not self._zips:
+            return None
+
+        # Distances are in degrees of latitude, longitude shrinks towards the poles
+        scale = max(math.cos(math.radians(latitude)), 0.01)
+        cell_lat, cell_lon = int(latitude // GRID_SIZE), int(longitude // GRID_SIZE)
+        best, best_distance = None, math.inf
+        for ring in range(int(360 / GRID_SIZE)):
+            # Every cell in this ring is at least this far away
+            if (ring - 1) * GRID_SIZE * scale > best_distance:
+                break
+            for d_lat in range(-ring, ring + 1):
+                for d_lon in range(-ring, ring + 1):
+                    if max(abs(d_lat), abs(d_lon)) != ring:
+                        continue
+                    for position in self._grid.get((cell_lat + d_lat, cell_lon + d_lon), ()):
+                        distance = math.hypot(
+                            self._latitudes[position] - latitude,
+                            (self._longitudes[position] - longitude) * scale,
+                        )
+                        if distance < best_distance:
+                            best, best_distance = position, distance
+        return f"{self._zips[best]:05d}" if best is not None else None